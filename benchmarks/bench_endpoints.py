@@ -0,0 +1,206 @@
+"""
+Load-testing benchmark for the server endpoints.
+
+Starts the Flask app on a local threaded server with the response delay set to zero and a scratch
+SQLite database, then drives every inventory and transform endpoint at increasing concurrency and
+inventory sizes. Reports p50/p95/p99 latency and requests/s per scenario and compares them against
+a stored baseline to flag regressions.
+
+Usage:
+    python benchmarks/bench_endpoints.py                      # run and compare against baseline.json
+    python benchmarks/bench_endpoints.py --save-baseline      # run and store the results as the new baseline
+    python benchmarks/bench_endpoints.py --sizes 100 --concurrency 1,8 --requests 200
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.abspath(os.path.dirname(__file__))
+SERVER_DIR = os.path.join(BENCH_DIR, "..", "server")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+TRANSFORM = {
+    "name": "Cube",
+    "type": "MESH",
+    "position": {"x": 1.0, "y": 2.0, "z": 3.0},
+    "rotation": {"x": 0.1, "y": 0.2, "z": 0.3},
+    "scale": {"x": 1.0, "y": 1.0, "z": 1.0},
+}
+
+
+def percentile(values, fraction):
+    """Returns the value at the given fraction (0-1) of the sorted values, using the nearest rank."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def send(base_url, method, path, payload=None):
+    """Sends one request and returns its latency in seconds and status code."""
+    body = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(base_url + path, data=body, method=method)
+    if body is not None:
+        req.add_header("Content-Type", "application/json")
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    return time.perf_counter() - start, status
+
+
+def scenarios(size, count, run_id):
+    """
+    Builds the request list for every scenario.
+    Mutation scenarios work on their own names so that each one runs against an inventory of the given size.
+    """
+    added = [f"bench-{run_id}-{i}" for i in range(count)]
+    return {
+        "GET /get-items": [("GET", "/get-items", None)] * count,
+        "POST /add-item": [("POST", "/add-item", {"name": name, "quantity": 1}) for name in added],
+        "PUT /update-quantity": [
+            ("PUT", "/update-quantity", {"name": f"item-{i % size}", "quantity": i}) for i in range(count)
+        ],
+        "DELETE /remove-item": [("DELETE", "/remove-item", {"name": name}) for name in added],
+        "POST /transform": [("POST", "/transform", TRANSFORM)] * count,
+        "POST /translation": [("POST", "/translation", {"position": TRANSFORM["position"]})] * count,
+        "POST /rotation": [("POST", "/rotation", {"rotation": TRANSFORM["rotation"]})] * count,
+        "POST /scale": [("POST", "/scale", {"scale": TRANSFORM["scale"]})] * count,
+    }
+
+
+def run_scenario(base_url, requests_list, concurrency):
+    """Runs the requests with the given number of concurrent clients and summarizes the latencies."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda r: send(base_url, *r), requests_list))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _ in results]
+    errors = sum(1 for _, status in results if status >= 500)
+    return {
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "rps": round(len(results) / elapsed, 1),
+        "errors": errors,
+    }
+
+
+def seed_inventory(app, size):
+    """Replaces the inventory with size items named item-0 .. item-<size-1>."""
+    from database import db
+    from models.inventory import Inventory
+
+    with app.app_context():
+        db.session.query(Inventory).delete()
+        db.session.execute(
+            Inventory.__table__.insert(), [{"name": f"item-{i}", "quantity": i} for i in range(size)]
+        )
+        db.session.commit()
+
+
+def start_server(app):
+    """Serves the app on a free local port in a background thread and returns its base URL and server."""
+    from werkzeug.serving import make_server
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares results with the baseline.
+    A scenario regresses when its p95 latency grows or its throughput drops by more than tolerance.
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{key}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["rps"] < previous["rps"] * (1 - tolerance):
+            regressions.append(f"{key}: throughput {previous['rps']} -> {current['rps']} req/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the server endpoints.")
+    parser.add_argument("--sizes", default="100,1000,10000", help="Comma-separated inventory sizes.")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated numbers of concurrent clients.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file to compare against.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before flagging.")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(scratch, 'bench.db')}"
+    os.environ["RESPONSE_DELAY_SECONDS"] = "0"
+    sys.path.insert(0, os.path.abspath(SERVER_DIR))
+
+    import logging
+    from app import create_app
+
+    app = create_app()
+
+    logging.disable(logging.INFO)  # Keep request logging out of the measurements
+    base_url, server = start_server(app)
+
+    results = {}
+    run_id = 0
+    for size in [int(s) for s in args.sizes.split(",")]:
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            seed_inventory(app, size)
+            run_id += 1
+            for name, requests_list in scenarios(size, args.requests, run_id).items():
+                key = f"{name} | size={size} | concurrency={concurrency}"
+                results[key] = run_scenario(base_url, requests_list, concurrency)
+                r = results[key]
+                print(
+                    f"{key:<60} p50 {r['p50_ms']:>9.2f}ms  p95 {r['p95_ms']:>9.2f}ms  "
+                    f"p99 {r['p99_ms']:>9.2f}ms  {r['rps']:>8.1f} req/s  errors {r['errors']}"
+                )
+    server.shutdown()
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {"machine": f"{platform.system()} {platform.machine()} {platform.python_version()}", "results": results},
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found, run with --save-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No regressions against baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Throughput benchmark for the batch transform matrix computation.
+
+For every batch size, times the vectorized pass of services.matrices.compute_matrices, a per-object
+Python loop computing the same matrices and bounds (on at most --loop-max objects, the way consumers
+computed them before), and a whole /transform-matrices request including JSON decoding and encoding
+(up to --request-max objects). Reports objects/s for each.
+
+Usage:
+    python benchmarks/bench_matrices.py
+    python benchmarks/bench_matrices.py --sizes 1000,1000000 --repeat 5
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.abspath(os.path.dirname(__file__))
+SERVER_DIR = os.path.join(BENCH_DIR, "..", "server")
+LOCAL_BOUNDS = ((-1.0, -1.0, -1.0), (1.0, 1.0, 1.0))
+
+
+def random_transforms(count, seed=0):
+    """Returns (N, 3) position, rotation and scale arrays with random values."""
+    rng = np.random.default_rng(seed)
+    return (
+        rng.uniform(-100, 100, (count, 3)),
+        rng.uniform(-math.pi, math.pi, (count, 3)),
+        rng.uniform(0.1, 10, (count, 3)),
+    )
+
+
+def per_object(position, rotation, scale):
+    """Computes one world matrix, its inverse and its bounds with plain Python, as a reference."""
+    (sx, sy, sz), (cx, cy, cz) = [math.sin(a) for a in rotation], [math.cos(a) for a in rotation]
+    r = [
+        [cz * cy, cz * sy * sx - sz * cx, cz * sy * cx + sz * sx],
+        [sz * cy, sz * sy * sx + cz * cx, sz * sy * cx - cz * sx],
+        [-sy, cy * sx, cy * cx],
+    ]
+    linear = [[r[i][j] * scale[j] for j in range(3)] for i in range(3)]
+    matrix = [linear[i] + [position[i]] for i in range(3)] + [[0.0, 0.0, 0.0, 1.0]]
+    inverse_linear = [[r[j][i] / scale[i] for j in range(3)] for i in range(3)]
+    inverse = [
+        inverse_linear[i] + [-sum(inverse_linear[i][j] * position[j] for j in range(3))] for i in range(3)
+    ] + [[0.0, 0.0, 0.0, 1.0]]
+    extent = [sum(abs(linear[i][j]) for j in range(3)) for i in range(3)]  # Unit half extents
+    bounds = [[position[i] - extent[i] for i in range(3)], [position[i] + extent[i] for i in range(3)]]
+    return matrix, inverse, bounds
+
+
+def best_time(function, repeat):
+    """Returns the fastest of repeat runs of function, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the batch transform matrix computation.")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000", help="Comma-separated batch sizes.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the fastest is reported.")
+    parser.add_argument("--loop-max", type=int, default=100000, help="Most objects timed with the Python loop.")
+    parser.add_argument("--request-max", type=int, default=100000, help="Largest batch sent as a request.")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite://"
+    os.environ["RESPONSE_DELAY_SECONDS"] = "0"
+    sys.path.insert(0, os.path.abspath(SERVER_DIR))
+
+    import logging
+    from app import create_app
+    from services.matrices import compute_matrices
+
+    app = create_app()
+    logging.disable(logging.INFO)
+    client = app.test_client()
+    local_bounds = np.array(LOCAL_BOUNDS)
+
+    for size in [int(s) for s in args.sizes.split(",")]:
+        positions, rotations, scales = random_transforms(size)
+
+        elapsed = best_time(lambda: compute_matrices(positions, rotations, scales, local_bounds), args.repeat)
+        line = f"size={size:<9} vectorized {size / elapsed:>14,.0f} objects/s"
+
+        sample = min(size, args.loop_max)
+        rows = list(zip(positions[:sample].tolist(), rotations[:sample].tolist(), scales[:sample].tolist()))
+        elapsed = best_time(lambda: [per_object(*row) for row in rows], args.repeat)
+        line += f"  python loop {sample / elapsed:>12,.0f} objects/s"
+
+        if size <= args.request_max:
+            body = json.dumps(
+                {"positions": positions.tolist(), "rotations": rotations.tolist(), "scales": scales.tolist()}
+            )
+
+            def request():
+                response = client.post("/transform-matrices", data=body, content_type="application/json")
+                assert response.status_code == 200, response.get_data(as_text=True)
+
+            elapsed = best_time(request, args.repeat)
+            line += f"  request {size / elapsed:>12,.0f} objects/s"
+        print(line, flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
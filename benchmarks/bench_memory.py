@@ -0,0 +1,141 @@
+"""
+Memory and allocation benchmark for the inventory service.
+
+Fills a scratch SQLite inventory to each size, then measures every path under tracemalloc with
+utils.profiling.measure_allocations: the get_items() service call, serializing its result into a
+response, whole /get-items requests, single mutations and a transform request. Reports the peak
+memory per call, per row for the listing paths, and the top allocation sites of the memory held
+when the call returns.
+
+Usage:
+    python benchmarks/bench_memory.py                           # 1k, 100k and 1M rows
+    python benchmarks/bench_memory.py --sizes 1000 --top 10
+    python benchmarks/bench_memory.py --json memory-report.json  # also write the full report
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+
+BENCH_DIR = os.path.abspath(os.path.dirname(__file__))
+SERVER_DIR = os.path.join(BENCH_DIR, "..", "server")
+
+TRANSFORM = {
+    "name": "Cube",
+    "position": {"x": 1.0, "y": 2.0, "z": 3.0},
+    "rotation": {"x": 0.1, "y": 0.2, "z": 0.3},
+    "scale": {"x": 1.0, "y": 1.0, "z": 1.0},
+}
+
+
+def seed_inventory(app, size):
+    """Replaces the inventory with size items named item-0 .. item-<size-1>, using the bulk import path."""
+    from database import db
+    from models.inventory import Inventory
+    from services.inventory import import_items
+
+    with app.app_context():
+        db.session.query(Inventory).delete()
+        db.session.commit()
+        success, result = import_items((i + 1, f"item-{i}", i, None) for i in range(size))
+        if not success:
+            raise RuntimeError(result)
+
+
+def scenarios(app, client):
+    """
+    Returns the measured paths as (name, counts rows, setup, function) tuples.
+    setup is None or prepares the state of one call, outside of the measurement, and returns the arguments of the
+    function, so that every call, the warm-up included, does the same successful work: adds use a name not taken
+    yet and removals first add the item they remove.
+    """
+    from services.inventory import get_items
+    from utils.responses import success_response
+
+    names = itertools.count()
+
+    def listing():
+        with app.app_context():
+            return get_items()
+
+    def serialization():
+        _, items = listing()
+        with app.test_request_context():
+            return success_response("Items retrieved successfully", items)
+
+    def new_name():
+        return (f"bench-{next(names)}",)
+
+    def existing_name():
+        name = f"bench-{next(names)}"
+        add_item(name)
+        return (name,)
+
+    def add_item(name):
+        return client.post("/add-item", json={"name": name, "quantity": 1})
+
+    return [
+        ("get_items()", True, None, listing),
+        ("success_response(items)", True, None, serialization),
+        ("GET /get-items", True, None, lambda: client.get("/get-items")),
+        ("POST /add-item", False, new_name, add_item),
+        (
+            "PUT /update-quantity", False, None,
+            lambda: client.put("/update-quantity", json={"name": "item-0", "quantity": 7}),
+        ),
+        ("DELETE /remove-item", False, existing_name, lambda name: client.delete("/remove-item", json={"name": name})),
+        ("POST /transform", False, None, lambda: client.post("/transform", json=TRANSFORM)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory use and allocation sites of the inventory paths.")
+    parser.add_argument("--sizes", default="1000,100000,1000000", help="Comma-separated inventory sizes.")
+    parser.add_argument("--top", type=int, default=5, help="Allocation sites reported per path.")
+    parser.add_argument("--json", help="Also write the full report to this file.")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="bench-memory-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(scratch, 'bench.db')}"
+    os.environ["RESPONSE_DELAY_SECONDS"] = "0"
+    sys.path.insert(0, os.path.abspath(SERVER_DIR))
+
+    import logging
+    from app import create_app
+    from utils.profiling import measure_allocations
+
+    app = create_app()
+    logging.disable(logging.INFO)  # Keep request logging out of the measurements
+    client = app.test_client()
+
+    results = {}
+    for size in [int(s) for s in args.sizes.split(",")]:
+        seed_inventory(app, size)
+        for name, per_row, setup, fn in scenarios(app, client):
+            fn(*(setup() if setup else ()))  # Warm up caches and lazy imports so that they are not counted
+            call_args = setup() if setup else ()
+            response, report = measure_allocations(lambda: fn(*call_args), args.top)
+            status_code = getattr(response, "status_code", None)
+            if status_code is not None and status_code >= 400:
+                raise RuntimeError(f"{name} failed with {status_code}: {response.get_data(as_text=True)}")
+            key = f"{name} | size={size}"
+            results[key] = report
+            per_row_text = f"  {report['peak_bytes'] / size:>8.1f} B/row" if per_row else ""
+            print(
+                f"{key:<40} peak {report['peak_bytes'] / 1024:>12,.1f} KiB  "
+                f"held {report['retained_bytes'] / 1024:>12,.1f} KiB{per_row_text}"
+            )
+            for site in report["top_allocations"]:
+                print(f"    {site['size_bytes'] / 1024:>12,.1f} KiB  {site['count']:>9} blocks  {site['site']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Report written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Cold start benchmark for the server and the inventory UI.
+
+Starts each target in fresh interpreters under `python -X importtime` and reports the median time
+to ready (the server's create_app() returning against a database that is already migrated, and
+the UI window being shown), the total import time and the packages that cost the most to import.
+The server's first start, which runs the schema migrations, is reported separately. Results are
+compared against a stored baseline to flag regressions.
+
+The UI is started with Qt's offscreen platform and is skipped when PySide6 is not installed.
+
+Usage:
+    python benchmarks/bench_startup.py                      # run and compare against startup_baseline.json
+    python benchmarks/bench_startup.py --save-baseline      # run and store the results as the new baseline
+    python benchmarks/bench_startup.py --runs 10 --top 25
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.abspath(os.path.dirname(__file__))
+SERVER_DIR = os.path.join(BENCH_DIR, "..", "server")
+FRONTEND_DIR = os.path.join(BENCH_DIR, "..", "frontend")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "startup_baseline.json")
+
+# Each snippet prints its time to ready in seconds on the last line of stdout
+SERVER_SNIPPET = """
+import time
+start = time.perf_counter()
+from app import create_app
+create_app()
+print(time.perf_counter() - start)
+"""
+UI_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+from PySide6.QtWidgets import QApplication
+import inventory_ui
+app = QApplication(sys.argv)
+window = inventory_ui.InventoryApp()
+window.show()
+app.processEvents()
+print(time.perf_counter() - start)
+"""
+
+
+def parse_importtime(stderr):
+    """
+    Parses `-X importtime` output.
+
+    Returns:
+    - A list of (module, self_us, cumulative_us, depth) tuples in import order.
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        head, cumulative_us, name = line.split("|", 2)
+        self_us = head[len("import time:"):]
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def start_once(snippet, cwd, env):
+    """Runs the snippet in a fresh interpreter and returns its time to ready (s) and parsed import times."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", snippet], cwd=cwd, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed to start")
+    return float(result.stdout.strip().splitlines()[-1]), parse_importtime(result.stderr)
+
+
+def measure(snippet, cwd, env, runs, top):
+    """Starts the target runs times and summarizes the median start and the most expensive imports."""
+    starts, totals, packages = [], [], {}
+    for run in range(runs):
+        ready, modules = start_once(snippet, cwd, env)
+        starts.append(ready)
+        totals.append(sum(cum for _, _, cum, depth in modules if depth == 0))
+        # Self time summed per top-level package, so that e.g. all of sqlalchemy's submodules count together
+        for name, self_us, _, _ in modules:
+            packages.setdefault(name.split(".")[0], [0] * runs)[run] += self_us
+    slowest = sorted(((statistics.median(v), k) for k, v in packages.items()), reverse=True)[:top]
+    return {
+        "ready_ms": round(statistics.median(starts) * 1000, 1),
+        "imports_ms": round(statistics.median(totals) / 1000, 1),
+        "top_imports_ms": {name: round(us / 1000, 1) for us, name in slowest},
+    }
+
+
+def report(name, result):
+    """Prints one target's results as an importtime-style table."""
+    imports = f"  imports {result['imports_ms']:>8.1f}ms" if "imports_ms" in result else ""
+    print(f"{name:<14} ready {result['ready_ms']:>8.1f}ms{imports}")
+    for module, ms in result.get("top_imports_ms", {}).items():
+        print(f"    {ms:>8.1f}ms  {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cold start of the server and the UI.")
+    parser.add_argument("--runs", type=int, default=5, help="Starts per target; the median is reported.")
+    parser.add_argument("--top", type=int, default=15, help="Number of most expensive packages listed per target.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file to compare against.")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before flagging.")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="bench-startup-")
+    env = dict(os.environ, RESPONSE_DELAY_SECONDS="0", QT_QPA_PLATFORM="offscreen")
+    results = {}
+
+    # The first start against an empty database runs the migrations, later ones find the schema up to date
+    first = []
+    for run in range(args.runs):
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(scratch, f'first-{run}.db')}"
+        first.append(start_once(SERVER_SNIPPET, SERVER_DIR, env)[0])
+    results["server first start"] = {"ready_ms": round(statistics.median(first) * 1000, 1)}
+    report("server first", results["server first start"])
+
+    env["DATABASE_URL"] = f"sqlite:///{os.path.join(scratch, 'first-0.db')}"
+    results["server"] = measure(SERVER_SNIPPET, SERVER_DIR, env, args.runs, args.top)
+    report("server", results["server"])
+
+    try:
+        results["ui"] = measure(UI_SNIPPET, FRONTEND_DIR, env, args.runs, args.top)
+        report("ui", results["ui"])
+    except RuntimeError as e:
+        print(f"ui             skipped: {e}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(
+                {"machine": f"{platform.system()} {platform.machine()} {platform.python_version()}", "results": results},
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found, run with --save-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous and current["ready_ms"] > previous["ready_ms"] * (1 + args.tolerance):
+            regressions.append(f"{key}: ready {previous['ready_ms']}ms -> {current['ready_ms']}ms")
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No regressions against baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
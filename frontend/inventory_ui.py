@@ -1,11 +1,63 @@
 from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QPushButton, QTableView, QLabel, QLineEdit, QSizePolicy, QProgressBar, QHBoxLayout
 from PySide6.QtCore import Qt, QThread, Signal, QAbstractTableModel, QTimer
 from PySide6.QtGui import QFont
-import requests
 import sys
+import threading
+import uuid
 
 API_BASE_URL = "http://127.0.0.1:5000"
 TIMEOUT_SECONDS = 30  
+SEARCH_DEBOUNCE_MS = 300  # Wait for typing to pause before querying the server
+
+MUTATION_ATTEMPTS = 2  # Timed-out mutations are resent once, with the same Idempotency-Key
+
+_session = None
+_session_lock = threading.Lock()
+
+def http_session():
+    """
+    Returns the shared HTTP session, creating it on first use.
+    The session keeps connections to the server alive between requests. requests asks for gzip and deflate
+    compressed responses by default and decompresses them transparently. It is imported here, from the worker
+    threads, rather than at startup so that it does not delay showing the window.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+
+            _session = requests.Session()
+        return _session
+
+def send_mutation(method, path, payload, idempotency_key):
+    """
+    Sends an inventory mutation with an Idempotency-Key, resending it with the same key if it times out or the
+    connection fails. The server answers a resent request with the response of the first one instead of
+    applying it twice.
+
+    Parameters:
+    - method (str): The HTTP method.
+    - path (str): The endpoint path, e.g. "/add-item".
+    - payload (dict): The JSON body.
+    - idempotency_key (str): Key identifying the user action.
+
+    Returns:
+    - The requests.Response of the last attempt.
+    """
+    import requests
+
+    for attempt in range(MUTATION_ATTEMPTS):
+        try:
+            return http_session().request(
+                method,
+                f"{API_BASE_URL}{path}",
+                json=payload,
+                headers={"Idempotency-Key": idempotency_key},
+                timeout=TIMEOUT_SECONDS
+            )
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            if attempt == MUTATION_ATTEMPTS - 1:
+                raise
 
 # Model to handle inventory data in the table
 class InventoryModel(QAbstractTableModel):
@@ -61,8 +113,10 @@ class FetchInventoryThread(QThread):
         Executes the request to fetch inventory data from the server.
         Emits appropriate signals for success or failure.
         """
+        import requests  # Deferred: loaded by the worker thread rather than at startup
+
         try:
-            response = requests.get(f"{API_BASE_URL}/get-items", timeout=TIMEOUT_SECONDS)
+            response = http_session().get(f"{API_BASE_URL}/get-items", timeout=TIMEOUT_SECONDS)
             response.raise_for_status()
             data = response.json()
             if data.get("message") == "Items retrieved successfully":
@@ -76,6 +130,45 @@ class FetchInventoryThread(QThread):
         except Exception as e:
             self.error_occurred.emit(f"Unexpected error: {str(e)}")
 
+# Thread to search inventory items by name
+class SearchInventoryThread(QThread):
+    """
+    Thread for searching inventory items by name via the backend API.
+    Emits the matching items tagged with the query they belong to, or an error message.
+    """
+    data_fetched = Signal(str, list)
+    error_occurred = Signal(str)
+
+    def __init__(self, query):
+        super().__init__()
+        self.query = query
+
+    def run(self):
+        """
+        Executes the fuzzy search request for the query.
+        Emits appropriate signals for success or failure.
+        """
+        import requests  # Deferred: loaded by the worker thread rather than at startup
+
+        try:
+            response = http_session().get(
+                f"{API_BASE_URL}/search-items",
+                params={"q": self.query, "mode": "fuzzy"},
+                timeout=TIMEOUT_SECONDS
+            )
+            response.raise_for_status()
+            data = response.json()
+            if data.get("message") == "Items retrieved successfully":
+                self.data_fetched.emit(self.query, data["data"])
+            else:
+                self.error_occurred.emit("Error searching inventory.")
+        except requests.exceptions.Timeout:
+            self.error_occurred.emit("Request timed out. Try again later.")
+        except requests.exceptions.RequestException as e:
+            self.error_occurred.emit(f"Network error: {str(e)}")
+        except Exception as e:
+            self.error_occurred.emit(f"Unexpected error: {str(e)}")
+
 # Thread to add an item to the inventory
 class AddItemThread(QThread):
     """
@@ -84,18 +177,19 @@ class AddItemThread(QThread):
     """
     item_added = Signal(bool, str)
 
-    def __init__(self, name, quantity):
+    def __init__(self, name, quantity, idempotency_key):
         super().__init__()
         self.name = name
         self.quantity = quantity
+        self.idempotency_key = idempotency_key
 
     def run(self):
         """Sends a POST request to add the item to the inventory."""
+        import requests  # Deferred: loaded by the worker thread rather than at startup
+
         try:
-            response = requests.post(
-                f"{API_BASE_URL}/add-item",
-                json={"name": self.name, "quantity": int(self.quantity)},
-                timeout=TIMEOUT_SECONDS
+            response = send_mutation(
+                "POST", "/add-item", {"name": self.name, "quantity": int(self.quantity)}, self.idempotency_key
             )
             response.raise_for_status()
             data = response.json()
@@ -118,18 +212,19 @@ class UpdateItemThread(QThread):
     """
     item_updated = Signal(bool, str)
 
-    def __init__(self, name, quantity):
+    def __init__(self, name, quantity, idempotency_key):
         super().__init__()
         self.name = name
         self.quantity = quantity
+        self.idempotency_key = idempotency_key
 
     def run(self):
         """Sends a PUT request to update the quantity of an item."""
+        import requests  # Deferred: loaded by the worker thread rather than at startup
+
         try:
-            response = requests.put(
-                f"{API_BASE_URL}/update-quantity",
-                json={"name": self.name, "quantity": int(self.quantity)},
-                timeout=TIMEOUT_SECONDS
+            response = send_mutation(
+                "PUT", "/update-quantity", {"name": self.name, "quantity": int(self.quantity)}, self.idempotency_key
             )
             response.raise_for_status()
 
@@ -155,17 +250,18 @@ class DeleteItemThread(QThread):
     """
     item_deleted = Signal(bool, str)
 
-    def __init__(self, name):
+    def __init__(self, name, idempotency_key):
         super().__init__()
         self.name = name
+        self.idempotency_key = idempotency_key
 
     def run(self):
         """Sends a DELETE request to remove an item from the inventory."""
+        import requests  # Deferred: loaded by the worker thread rather than at startup
+
         try:
-            response = requests.delete(
-                f"{API_BASE_URL}/remove-item",
-                json={"name": self.name},
-                timeout=TIMEOUT_SECONDS
+            response = send_mutation(
+                "DELETE", "/remove-item", {"name": self.name}, self.idempotency_key
             )
             response.raise_for_status()
             data = response.json()
@@ -195,6 +291,21 @@ class InventoryApp(QWidget):
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(10, 10, 10, 10)
 
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search items...")
+        self.search_input.textChanged.connect(self.schedule_search)
+        self.layout.addWidget(self.search_input)
+
+        # Debounce typing so only the last query of a burst reaches the server
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.search_inventory)
+        self.search_workers = []
+
+        # Idempotency key of the mutation in flight per operation, reused when the same action is repeated
+        self.pending_actions = {}
+
         # Create a layout to center the table horizontally
         table_layout = QHBoxLayout()
         table_layout.addStretch()  # Adds flexible space before the table
@@ -263,7 +374,19 @@ class InventoryApp(QWidget):
         self.table.setColumnWidth(1, 300)
         self.table.horizontalHeader().setStretchLastSection(True)
 
-        self.load_inventory()
+        QTimer.singleShot(0, self.load_inventory)  # Fetch once the event loop runs, after the window is shown
+
+    def action_key(self, operation, *inputs):
+        """
+        Returns the Idempotency-Key for a mutation: the key of the same action if it is still in flight, e.g. after
+        a double click, so the server applies it once, or a new key otherwise.
+        """
+        pending = self.pending_actions.get(operation)
+        if pending is not None and pending[0] == inputs:
+            return pending[1]
+        key = uuid.uuid4().hex
+        self.pending_actions[operation] = (inputs, key)
+        return key
 
     def load_inventory(self):
         """
@@ -277,6 +400,42 @@ class InventoryApp(QWidget):
         self.worker.error_occurred.connect(self.handle_error)
         self.worker.start()
 
+    def schedule_search(self):
+        """
+        Restarts the debounce timer whenever the search text changes.
+        """
+        self.search_timer.start()
+
+    def search_inventory(self):
+        """
+        Searches the inventory for the current text of the search box.
+        An empty search box reloads the full inventory.
+        """
+        query = self.search_input.text().strip()
+        if not query:
+            self.load_inventory()
+            return
+
+        self.progress_bar.setVisible(True)
+        self.status_label.setText("Searching inventory...")
+        worker = SearchInventoryThread(query)
+        worker.data_fetched.connect(self.update_search_results)
+        worker.error_occurred.connect(self.handle_error)
+        worker.finished.connect(lambda: self.search_workers.remove(worker))
+        self.search_workers.append(worker)  # Keep running searches alive until they finish
+        worker.start()
+
+    def update_search_results(self, query, data):
+        """
+        Shows the results of a search, ignoring results for text that is no longer in the search box.
+        """
+        if query != self.search_input.text().strip():
+            return
+        self.progress_bar.setVisible(False)
+        self.status_label.setText(f"{len(data)} item(s) found.")
+        self.model.update_data(data)
+        self.table.resizeColumnsToContents()
+
     def update_table(self, data):
         """
         Updates the table with the fetched data after a successful API call.
@@ -310,7 +469,7 @@ class InventoryApp(QWidget):
 
         self.status_label.setText("Adding item...")
 
-        self.add_worker = AddItemThread(name, quantity)
+        self.add_worker = AddItemThread(name, quantity, self.action_key("add", name, quantity))
         self.add_worker.item_added.connect(self.handle_add_item_response)
         self.add_worker.start()
 
@@ -319,6 +478,7 @@ class InventoryApp(QWidget):
         Handles the response after adding an item.
         Updates the UI with the result and refreshes the inventory list.
         """
+        self.pending_actions.pop("add", None)
         self.status_label.setText(message)
         QTimer.singleShot(2000, lambda: self.status_label.clear())
         if success:
@@ -341,7 +501,7 @@ class InventoryApp(QWidget):
 
         self.status_label.setText("Updating item...")
 
-        self.update_worker = UpdateItemThread(name, quantity)
+        self.update_worker = UpdateItemThread(name, quantity, self.action_key("update", name, quantity))
         self.update_worker.item_updated.connect(self.handle_update_item_response)
         self.update_worker.start()
 
@@ -350,6 +510,7 @@ class InventoryApp(QWidget):
         Handles the response after updating an item.
         Updates the UI with the result and refreshes the inventory list.
         """
+        self.pending_actions.pop("update", None)
         self.status_label.setText(message)
         QTimer.singleShot(2000, lambda: self.status_label.clear())
         if success:
@@ -371,7 +532,7 @@ class InventoryApp(QWidget):
 
         self.status_label.setText("Deleting item...")
 
-        self.delete_worker = DeleteItemThread(name)
+        self.delete_worker = DeleteItemThread(name, self.action_key("delete", name))
         self.delete_worker.item_deleted.connect(self.handle_delete_item_response)
         self.delete_worker.start()
 
@@ -380,6 +541,7 @@ class InventoryApp(QWidget):
         Handles the response after deleting an item.
         Updates the UI with the result and refreshes the inventory list.
         """
+        self.pending_actions.pop("delete", None)
         self.status_label.setText(message)
         QTimer.singleShot(2000, lambda: self.status_label.clear())
         if success:
@@ -4,6 +4,12 @@ bl_info = {
     "category": "Object",  # Define which category this addon belongs to (e.g., Object, Mesh, etc.)
 }
 
+import queue
+import socket
+import struct
+import threading
+from urllib.parse import urljoin, urlsplit
+
 import bpy
 import requests
 
@@ -22,11 +28,257 @@ DATA_SEND_OPTIONS = {
     "Send Scale": "/scale"
 }
 
+# Ask the server to queue requests as jobs (202 Accepted) instead of holding the connection for the response delay
+ASYNC_HEADERS = {"Prefer": "respond-async"}
+REQUEST_TIMEOUT_SECONDS = 5
+# Long-poll of a queued job's result; a job is given up on after JOB_MAX_POLLS polls
+JOB_WAIT_SECONDS = 30
+JOB_MAX_POLLS = 10
+
+# Default port of the server's persistent transform stream (its TRANSFORM_STREAM_PORT), used by live sync instead of
+# one HTTP request per update; the panel's Stream Port setting overrides it
+STREAM_PORT = 5001
+STREAM_COMPONENT_MASKS = (("position", 1), ("rotation", 2), ("scale", 4))
+STREAM_MAX_FRAME_BYTES = 1048576  # The server's TRANSFORM_STREAM_MAX_FRAME_BYTES
+
 # List of server options for dropdown menu in the UI
 SERVER_ITEMS = [(key, key, "") for key in SERVER_OPTIONS.keys()]
 # List of data send options for dropdown menu in the UI
 DATA_SEND_ITEMS = [(key, key, "") for key in DATA_SEND_OPTIONS.keys()]
 
+class TransformStream:
+    """
+    A long-lived connection to the server's transform stream.
+    Updates are sent as compact binary frames (see server/services/transform_stream.py) by a background thread,
+    so that Blender's main thread never waits on the network. While a frame is being sent, newer updates are
+    queued with one transform per object, replacing the stale ones, and go out together in the next frame.
+    The server acks frames in batches, read on another background thread.
+    Attributes:
+        sequence (int): Sequence number of the last frame sent.
+        acked (int): Highest sequence number acknowledged by the server.
+        dropped (int): Stale object transforms replaced before they were sent.
+        connected (bool): Whether the connection is still open.
+    """
+    def __init__(self, host, port):
+        self.sock = socket.create_connection((host, port), timeout=REQUEST_TIMEOUT_SECONDS)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.settimeout(None)  # Only the sender and ack reader threads wait on the socket
+        self.sequence = 0
+        self.acked = 0
+        self.dropped = 0
+        self.connected = True
+        self._pending = {}  # Encoded object name: encoded transform not sent yet
+        self._wake = threading.Condition()
+        threading.Thread(target=self._read_acks, daemon=True).start()
+        threading.Thread(target=self._send_frames, daemon=True).start()
+
+    def send(self, objects):
+        """
+        Queues the transforms of the given objects for the next frame, without blocking.
+
+        Parameters:
+        - objects (iterable): Blender objects whose location, rotation and scale are sent.
+
+        Returns:
+        - None.
+
+        Raises:
+        - OSError: If the connection was closed.
+        """
+        if not self.connected:
+            raise OSError("Transform stream closed")
+        parts = {}
+        for obj in objects:
+            name = obj.name.encode("utf-8")[:255]
+            # Mask 7: position, rotation and scale
+            parts[name] = bytes((len(name),)) + name + bytes((7,)) + struct.pack(
+                "!9f", *obj.location, *obj.rotation_euler, *obj.scale
+            )
+        if not parts:
+            return
+        with self._wake:
+            self.dropped += len(self._pending.keys() & parts.keys())
+            self._pending.update(parts)
+            self._wake.notify()
+
+    def close(self):
+        """Closes the connection."""
+        self._disconnect()
+        self.sock.close()
+
+    def _send_frames(self):
+        try:
+            while True:
+                with self._wake:
+                    self._wake.wait_for(lambda: self._pending or not self.connected)
+                    if not self.connected:
+                        break
+                    parts, self._pending = list(self._pending.values()), {}
+                # Split so that no frame exceeds the server's frame size limit
+                while parts:
+                    size, count = 5, 0
+                    while count < len(parts) and size + len(parts[count]) <= STREAM_MAX_FRAME_BYTES:
+                        size += len(parts[count])
+                        count += 1
+                    self.sequence += 1
+                    body = struct.pack("!BI", 1, self.sequence) + b"".join(parts[:count])
+                    self.sock.sendall(struct.pack("!I", len(body)) + body)
+                    parts = parts[count:]
+        except OSError:
+            pass
+        self._disconnect()
+
+    def _read_acks(self):
+        try:
+            while True:
+                frame = self.sock.recv(13, socket.MSG_WAITALL)  # Length header and ack body
+                if len(frame) < 13:
+                    break
+                _, _, self.acked, _ = struct.unpack("!IBII", frame)
+        except OSError:
+            pass
+        self._disconnect()
+
+    def _disconnect(self):
+        with self._wake:
+            self.connected = False
+            self._wake.notify_all()
+
+
+# Open transform stream while live sync is on
+live_stream = None
+
+# Outcome of the last job sent, shown in the panel, and outcomes reported by the job watchers
+last_job_message = ""
+job_outcomes = queue.Queue()
+
+
+def watch_job(server_url, status_url):
+    """
+    Long-polls a queued job on a background thread, so that its outcome, including a request the server
+    rejected, is reported in Blender once the job finishes.
+
+    Parameters:
+    - server_url (str): URL of the server the job was queued on.
+    - status_url (str): The job's status URL, as returned in the Location header.
+
+    Returns:
+    - None.
+    """
+    def poll():
+        url = urljoin(server_url, status_url)
+        try:
+            for _ in range(JOB_MAX_POLLS):
+                response = requests.get(
+                    url, params={"wait": JOB_WAIT_SECONDS}, timeout=JOB_WAIT_SECONDS + REQUEST_TIMEOUT_SECONDS
+                )
+                response.raise_for_status()
+                job = response.json()["data"]
+                if job["status"] not in ("pending", "running"):
+                    break
+            else:
+                job_outcomes.put(("WARNING", f"Job {status_url} did not finish"))
+                return
+        except Exception as e:
+            job_outcomes.put(("ERROR", f"Failed to read job {status_url}: {str(e)}"))
+            return
+
+        result = job.get("result") or {}
+        if job["status_code"] is not None and job["status_code"] < 400:
+            job_outcomes.put(("INFO", result.get("message", "Job done")))
+        else:
+            job_outcomes.put(("ERROR", f"Server rejected the data ({job['status_code']}): {result.get('error', job)}"))
+
+    threading.Thread(target=poll, daemon=True).start()
+    if not bpy.app.timers.is_registered(report_job_outcomes):
+        bpy.app.timers.register(report_job_outcomes, first_interval=0.5)
+
+
+def report_job_outcomes():
+    """
+    Timer running on Blender's main thread that shows the outcomes of finished jobs in the panel and console.
+
+    Returns:
+    - The delay in seconds before the next run.
+    """
+    global last_job_message
+    while True:
+        try:
+            level, message = job_outcomes.get_nowait()
+        except queue.Empty:
+            break
+        last_job_message = message
+        print(f"Job {level.lower()}:", message)
+        for window in bpy.context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == "VIEW_3D":
+                    area.tag_redraw()
+    return 0.5
+
+
+def stream_updated_transforms(scene, depsgraph):
+    """
+    Streams the transforms of objects moved in the last depsgraph update, e.g. while dragging in the viewport.
+
+    Parameters:
+    - scene (bpy.types.Scene): The updated scene.
+    - depsgraph (bpy.types.Depsgraph): The evaluated dependency graph.
+
+    Returns:
+    - None.
+    """
+    objects = [
+        update.id.original for update in depsgraph.updates
+        if update.is_updated_transform and isinstance(update.id, bpy.types.Object)
+    ]
+    _stream(objects)
+
+
+def stream_selected_transforms(scene, *args):
+    """
+    Streams the transforms of the selected objects on every frame change, e.g. during playback.
+
+    Parameters:
+    - scene (bpy.types.Scene): The scene whose frame changed.
+
+    Returns:
+    - None.
+    """
+    _stream([obj for obj in scene.objects if obj.select_get()])
+
+
+def _stream(objects):
+    global live_stream
+    if live_stream is None or not objects:
+        return
+    try:
+        live_stream.send(objects)
+    except OSError as e:
+        print("Live sync stopped:", e)
+        stop_live_sync()
+
+
+def start_live_sync(server_url, port):
+    """Connects to the transform stream on port of the server at server_url and starts streaming transforms."""
+    global live_stream
+    live_stream = TransformStream(urlsplit(server_url).hostname or "localhost", port)
+    bpy.app.handlers.depsgraph_update_post.append(stream_updated_transforms)
+    bpy.app.handlers.frame_change_post.append(stream_selected_transforms)
+
+
+def stop_live_sync():
+    """Stops streaming transforms and closes the connection."""
+    global live_stream
+    for handlers, handler in (
+        (bpy.app.handlers.depsgraph_update_post, stream_updated_transforms),
+        (bpy.app.handlers.frame_change_post, stream_selected_transforms),
+    ):
+        if handler in handlers:
+            handlers.remove(handler)
+    if live_stream is not None:
+        live_stream.close()
+        live_stream = None
+
 # Property group for the panel's server selection
 class SimplePanelProperties(bpy.types.PropertyGroup):
     selected_server: bpy.props.EnumProperty(
@@ -35,6 +287,13 @@ class SimplePanelProperties(bpy.types.PropertyGroup):
         items=SERVER_ITEMS,  # Dropdown items populated with SERVER_ITEMS
         default="Server 1"  # Default value for the dropdown
     )  # type: ignore
+    stream_port: bpy.props.IntProperty(
+        name="Stream Port",  # Name displayed in the UI
+        description="Port of the selected server's transform stream, used by live sync",  # Tooltip for the field
+        default=STREAM_PORT,
+        min=1,
+        max=65535
+    )  # type: ignore
 
 # Property group for the panel's data send option selection
 class SimpleDataSendProperties(bpy.types.PropertyGroup):
@@ -91,6 +350,11 @@ class SimplePanel(bpy.types.Panel):
         layout.prop(scene.simple_data_send_props, "selected_data_option", text="Data Type")
         # Send data button
         layout.operator("wm.send_data_operator", text="Send Data")
+        if last_job_message:
+            layout.label(text=f"Last job: {last_job_message}")  # Outcome of the last queued request
+        # Live sync toggle, streaming transforms as they change to the server's stream port
+        layout.prop(scene.simple_panel_props, "stream_port", text="Stream Port")
+        layout.operator("wm.live_sync_operator", text="Stop Live Sync" if live_stream else "Start Live Sync")
 
 # Operator to send data to the selected server
 class SendDataOperator(bpy.types.Operator):
@@ -138,16 +402,51 @@ class SendDataOperator(bpy.types.Operator):
             data["scale"] = {"x": obj.scale.x, "y": obj.scale.y, "z": obj.scale.z}
 
         try:
-            # Send the data to the server via a POST request
-            response = requests.post(full_url, json=data)
-            self.report({'INFO'}, f"Response: {response.text}")  # Display server response
-            print("Server Response:", response.text)
+            # Send the data to the server via a POST request, queued as a job so Blender is not blocked
+            response = requests.post(full_url, json=data, headers=ASYNC_HEADERS, timeout=REQUEST_TIMEOUT_SECONDS)
+            if response.status_code == 202:
+                job_id = response.json()["data"]["job_id"]
+                self.report({'INFO'}, f"Queued as job {job_id}")
+                print("Server queued job:", job_id)
+                watch_job(selected_server_url, response.headers["Location"])  # Reports the result once it is done
+            else:
+                self.report({'INFO'}, f"Response: {response.text}")  # Display server response
+                print("Server Response:", response.text)
         except Exception as e:
             self.report({'ERROR'}, f"Failed to send data: {str(e)}")  # Handle errors
             print("Error:", e)
 
         return {'FINISHED'}  # Finish the operator execution
 
+# Operator to start or stop streaming transforms to the selected server
+class LiveSyncOperator(bpy.types.Operator):
+    bl_idname = "wm.live_sync_operator"  # Unique operator ID
+    bl_label = "Live Sync"  # Button label
+
+    def execute(self, context):
+        """
+        Toggles live sync over the server's persistent transform stream.
+
+        Parameters:
+        - context (bpy.context): The context of the current scene and object.
+
+        Returns:
+        - {'FINISHED'} (Operator result indicating success), or {'CANCELLED'} if the server cannot be reached
+        """
+        if live_stream is not None:
+            stop_live_sync()
+            self.report({'INFO'}, "Live sync stopped")
+            return {'FINISHED'}
+
+        props = context.scene.simple_panel_props
+        try:
+            start_live_sync(SERVER_OPTIONS[props.selected_server], props.stream_port)
+        except OSError as e:
+            self.report({'ERROR'}, f"Failed to connect: {str(e)}")  # Handle errors
+            return {'CANCELLED'}
+        self.report({'INFO'}, "Live sync started")
+        return {'FINISHED'}
+
 # Register the classes and properties
 def register():
     """
@@ -163,6 +462,7 @@ def register():
     bpy.utils.register_class(SimpleDataSendProperties)
     bpy.utils.register_class(SimplePanel)
     bpy.utils.register_class(SendDataOperator)
+    bpy.utils.register_class(LiveSyncOperator)
     bpy.types.Scene.simple_panel_props = bpy.props.PointerProperty(type=SimplePanelProperties)
     bpy.types.Scene.simple_data_send_props = bpy.props.PointerProperty(type=SimpleDataSendProperties)
 
@@ -181,6 +481,10 @@ def unregister():
     bpy.utils.unregister_class(SimpleDataSendProperties)
     bpy.utils.unregister_class(SimplePanelProperties)
     bpy.utils.unregister_class(SendDataOperator)
+    bpy.utils.unregister_class(LiveSyncOperator)
+    stop_live_sync()
+    if bpy.app.timers.is_registered(report_job_outcomes):
+        bpy.app.timers.unregister(report_job_outcomes)
     del bpy.types.Scene.simple_panel_props
     del bpy.types.Scene.simple_data_send_props
 
@@ -1,14 +1,60 @@
 from flask import Flask
 from config import Config
-from database import db, init_app
+from database import init_app, create_schema
 from routes import register_blueprints
+from utils.metrics import init_metrics
+from utils.profiling import init_profiling
+from utils.log import configure_logging
+from utils.admission import init_admission
+from utils.scheduler import init_scheduler
+from utils.jobs import init_jobs
+from utils.idempotency import init_idempotency
+from utils.responses import init_compression
 
-app = Flask(__name__)
-app.config.from_object(Config)  # Load configuration
 
-init_app(app)  # Initialize database
+def create_app(config=Config):
+    """
+    Creates and configures a Flask application instance.
+
+    Parameters:
+    - config (object): The configuration object to load, Config by default.
+
+    Returns:
+    - The configured Flask application. Its database schema is created unless SCHEMA_SETUP_ON_STARTUP is False,
+      as in the workers of the production runner, where serve.py sets it up once before forking.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config)  # Load configuration
+
+    configure_logging(app)  # Log through a background queue
+
+    init_app(app)  # Initialize database
+    if app.config.get("SCHEMA_SETUP_ON_STARTUP", True):
+        create_schema(app)
+
+    register_blueprints(app)  # Register route blueprints
+
+    init_compression(app)  # Registered first so that it runs after every other after_request hook
+
+    init_metrics(app)  # Record request and SQL metrics
+
+    init_idempotency(app)  # Replay stored responses to retried mutations, before job mode queues them
+
+    init_jobs(app)  # Answer 'Prefer: respond-async' requests with 202 and run them in the background
+
+    init_admission(app)  # Bound concurrent work per route group, after metrics so rejections are counted
+
+    init_scheduler(app)  # Serve interactive requests ahead of bulk ones
+
+    init_profiling(app)  # Profile requests on demand when enabled
+
+    return app
 
-register_blueprints(app)  # Register route blueprints
 
 if __name__ == "__main__":
-    app.run()  # Run the Flask app
+    app = create_app()
+    if app.config.get("TRANSFORM_STREAM_ENABLED", True):
+        from services.transform_stream import start_transform_stream
+
+        start_transform_stream(app)  # Serve the persistent transform channel next to HTTP
+    app.run()  # Run the Flask development server
@@ -4,6 +4,136 @@ BASE_DIR = os.path.abspath(os.path.dirname(__file__))  # Get the absolute path o
 
 class Config:
     # Configure the database URI for SQLite, using a file called 'database.db' in the base directory
-    SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(BASE_DIR, 'database.db')}"
+    # DATABASE_URL overrides it, e.g. to point benchmarks at a scratch database
+    SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL", f"sqlite:///{os.path.join(BASE_DIR, 'database.db')}")
+    # Sharded storage: with SHARD_COUNT above 1 the inventory is hash-partitioned by name across that many SQLite
+    # files named by SHARD_DATABASE_URI_TEMPLATE, replacing SQLALCHEMY_DATABASE_URI. Changing the count needs a re-import
+    SHARD_COUNT = int(os.environ.get("SHARD_COUNT", "1"))
+    SHARD_DATABASE_URI_TEMPLATE = os.environ.get(
+        "SHARD_DATABASE_URL_TEMPLATE", f"sqlite:///{os.path.join(BASE_DIR, 'database-{shard}.db')}"
+    )
     # Disable tracking modifications to save resources
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Create the schema when an app is created; the production runner does it once before forking instead
+    SCHEMA_SETUP_ON_STARTUP = True
+    # Simulated delay applied to every delayed response, set to 0 for tests and benchmarks
+    RESPONSE_DELAY_SECONDS = float(os.environ.get("RESPONSE_DELAY_SECONDS", "10"))
+
+    # Opt-in request profiling: requests carrying PROFILING_HEADER, or a random PROFILING_SAMPLE_RATE
+    # fraction of requests, run under cProfile and leave a pstats file in PROFILING_DIR
+    PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_HEADER = "X-Profile"
+    PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+    PROFILING_DIR = os.environ.get("PROFILING_DIR", os.path.join(BASE_DIR, "profiles"))
+    PROFILING_MAX_FILES = 100  # Oldest profiles are deleted beyond this count
+
+    # Opt-in memory profiling: requests carrying MEMORY_PROFILING_HEADER run under tracemalloc, one at a time, and
+    # their peak memory and top allocation sites are kept for /profiles/memory
+    MEMORY_PROFILING_ENABLED = os.environ.get("MEMORY_PROFILING_ENABLED", "false").lower() == "true"
+    MEMORY_PROFILING_HEADER = "X-Memory-Profile"
+    MEMORY_PROFILING_TOP = 10  # Allocation sites per report
+    MEMORY_PROFILING_MAX_REPORTS = 100
+
+    # Logging goes through a background queue as JSON records, payloads longer than
+    # LOG_PAYLOAD_MAX_CHARS are truncated and LOG_SAMPLE_RATES keeps a fraction of a route's request logs
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+    LOG_QUEUE_SIZE = 10000  # Records are dropped rather than blocking requests when the queue is full
+    LOG_PAYLOAD_MAX_CHARS = 1024
+    LOG_SAMPLE_RATES = {"/transform": 1.0, "/translation": 1.0, "/rotation": 1.0, "/scale": 1.0}
+
+    # Group commit: single-item mutations are applied by a collector thread in one transaction per batch of
+    # up to WRITE_BATCH_MAX_OPS writes, made of the writes that queued up while the previous batch committed
+    WRITE_PIPELINE_ENABLED = True
+    WRITE_BATCH_MAX_OPS = 256
+
+    # Rows per transaction when importing, and per cursor fetch when exporting
+    BULK_CHUNK_SIZE = 5000
+
+    # Admission control: requests of each route group run at most `limit` at a time, with up to
+    # `queue_size` more waiting up to ADMISSION_QUEUE_TIMEOUT seconds; the rest get a 503 with Retry-After
+    ADMISSION_LIMITS = {"reads": (32, 64), "writes": (16, 32), "transforms": (32, 64)}  # group: (limit, queue_size)
+    ADMISSION_QUEUE_TIMEOUT = 30
+    ADMISSION_ROUTE_GROUPS = {
+        "/get-items": "reads",
+        "/search-items": "reads",
+        "/export-items": "reads",
+        "/import-items": "writes",
+        "/add-item": "writes",
+        "/remove-item": "writes",
+        "/update-quantity": "writes",
+        "/transform": "transforms",
+        "/translation": "transforms",
+        "/rotation": "transforms",
+        "/scale": "transforms",
+        "/transform-matrices": "transforms",
+    }
+
+    # Priority lanes: admitted requests share SCHEDULER_CONCURRENCY slots, handed out by weighted fair
+    # queuing between the classes below. The class comes from PRIORITY_HEADER or else from the route
+    SCHEDULER_CONCURRENCY = 32
+    PRIORITY_CLASSES = {"interactive": 8, "bulk": 1}  # class: weight
+    PRIORITY_HEADER = "X-Priority"
+    PRIORITY_ROUTE_CLASSES = {
+        "/get-items": "interactive",
+        "/search-items": "interactive",
+        "/transform": "interactive",
+        "/translation": "interactive",
+        "/rotation": "interactive",
+        "/scale": "interactive",
+        "/transform-matrices": "bulk",
+        "/add-item": "bulk",
+        "/import-items": "bulk",
+        "/export-items": "bulk",
+        "/remove-item": "bulk",
+        "/update-quantity": "bulk",
+    }
+
+    # Job mode: requests to JOB_ROUTES sent with "Prefer: respond-async" get 202 Accepted and run on JOB_WORKERS
+    # threads. Up to JOB_MAX_JOBS jobs are kept; finished ones expire after JOB_TTL_SECONDS
+    JOB_ROUTES = (
+        "/get-items", "/search-items", "/add-item", "/remove-item", "/update-quantity",
+        "/transform", "/translation", "/rotation", "/scale", "/transform-matrices",
+    )
+    JOB_WORKERS = 32
+    JOB_MAX_JOBS = 10000
+    JOB_TTL_SECONDS = 300
+    JOB_PENDING_TTL_SECONDS = 600  # Jobs unfinished after this long, e.g. in a killed worker, fail as abandoned
+    JOB_MAX_WAIT_SECONDS = 30  # Longest long-poll on /jobs
+    JOB_POLL_SECONDS = 0.05  # Interval at which long-polls check for jobs finished by other worker processes
+
+    # Idempotency keys: responses to IDEMPOTENCY_ROUTES requests sent with an Idempotency-Key header are kept for
+    # IDEMPOTENCY_TTL_SECONDS (up to IDEMPOTENCY_MAX_KEYS keys) and replayed to retries with the same key
+    IDEMPOTENCY_ROUTES = ("/add-item", "/update-quantity", "/remove-item")
+    IDEMPOTENCY_MAX_KEYS = 10000
+    IDEMPOTENCY_TTL_SECONDS = 3600
+    IDEMPOTENCY_WAIT_SECONDS = 30  # Longest wait of a retry for the response of the request still running
+    IDEMPOTENCY_CLAIM_TTL_SECONDS = 600  # Claims whose request never completed, e.g. in a killed worker, are released
+    IDEMPOTENCY_EVICT_SECONDS = 60  # Interval between two deletions of expired keys from the database
+    IDEMPOTENCY_POLL_SECONDS = 0.05  # Interval at which a retry checks for a response stored by another worker
+
+    # Transform updates are coalesced per object and handled once per tick of this many milliseconds
+    TRANSFORM_TICK_MS = 50
+
+    # Asset resolution for /file-path: project roots as "name=path" pairs separated by ";", indexed in memory and
+    # checked for changed directories at most every ASSET_INDEX_REFRESH_SECONDS
+    PROJECT_ROOTS = dict(
+        pair.split("=", 1) for pair in os.environ.get("PROJECT_ROOTS", "").split(";") if "=" in pair
+    )
+    ASSET_INDEX_REFRESH_SECONDS = float(os.environ.get("ASSET_INDEX_REFRESH_SECONDS", "2"))
+
+    # Responses of at least COMPRESSION_MIN_BYTES with one of these mimetypes are gzip or deflate compressed
+    # when the client accepts it. Streamed responses, such as CSV and NDJSON exports, are never compressed
+    COMPRESSION_MIN_BYTES = 1024
+    COMPRESSION_LEVEL = 6
+    COMPRESSION_MIMETYPES = ("application/json", "text/plain")
+
+    # Persistent TCP channel for streaming transforms (see services/transform_stream.py), served next to HTTP
+    TRANSFORM_STREAM_ENABLED = os.environ.get("TRANSFORM_STREAM_ENABLED", "true").lower() == "true"
+    TRANSFORM_STREAM_HOST = os.environ.get("TRANSFORM_STREAM_HOST", "127.0.0.1")
+    TRANSFORM_STREAM_PORT = int(os.environ.get("TRANSFORM_STREAM_PORT", "5001"))
+    TRANSFORM_STREAM_MAX_FRAME_BYTES = 1048576
+
+    # Batch matrix computation: largest accepted batch, and the local box bounded per object when the request
+    # gives none (Blender's default cube)
+    TRANSFORM_BATCH_MAX_OBJECTS = 1000000
+    TRANSFORM_LOCAL_BOUNDS = ((-1.0, -1.0, -1.0), (1.0, 1.0, 1.0))
@@ -1,9 +1,215 @@
+import zlib
+from contextlib import contextmanager
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
 
 db = SQLAlchemy()  # Initialize SQLAlchemy instance
 
 def init_app(app):
+    configure_shards(app)  # Add an engine bind per extra shard before the engines are created
     db.init_app(app)  # Initialize the app with SQLAlchemy
     with app.app_context():
-        from models import inventory  # Import the models
-        db.create_all()  # Create all database tables based on the models
+        from models import idempotency, inventory, jobs, transforms  # Import the models
+
+def configure_shards(app):
+    """
+    Configures hash-partitioned storage when SHARD_COUNT is above 1.
+    Shard 0 is the default database and shards 1..N-1 are added as engine binds, each a separate SQLite file
+    named by SHARD_DATABASE_URI_TEMPLATE, so that writers to different shards do not share a write lock.
+
+    Parameters:
+    - app (Flask): The Flask application to configure.
+
+    Returns:
+    - None.
+    """
+    count = app.config.get("SHARD_COUNT", 1)
+    if count <= 1:
+        return
+
+    template = app.config["SHARD_DATABASE_URI_TEMPLATE"]
+    app.config["SQLALCHEMY_DATABASE_URI"] = template.format(shard=0)
+    binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+    binds.update({f"shard{i}": template.format(shard=i) for i in range(1, count)})
+    app.config["SQLALCHEMY_BINDS"] = binds
+
+def shard_engines():
+    """
+    Returns the engines of all inventory shards of the current app, shard 0 first.
+    Unsharded apps have a single shard, the default engine.
+
+    Parameters:
+    - None.
+
+    Returns:
+    - A list of SQLAlchemy engines.
+    """
+    from flask import current_app
+
+    count = current_app.config.get("SHARD_COUNT", 1)
+    return [db.engine] + [db.engines[f"shard{i}"] for i in range(1, count)]
+
+def shard_index(name, count):
+    """
+    Maps an item name to its shard with a hash that is stable across processes and restarts.
+
+    Parameters:
+    - name (str): The item name.
+    - count (int): The number of shards.
+
+    Returns:
+    - The shard index (int), from 0 to count - 1.
+    """
+    return zlib.crc32(name.encode("utf-8")) % count if count > 1 else 0
+
+def conflict_insert(bind):
+    """
+    Returns the INSERT construct of a bind's dialect that supports ON CONFLICT clauses.
+
+    Parameters:
+    - bind (Engine or Connection): The engine or connection the statement will run on.
+
+    Returns:
+    - The dialect's insert() function for SQLite and PostgreSQL, or None for backends without ON CONFLICT,
+      which callers handle with plain statements.
+    """
+    if bind.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    return insert
+
+def create_schema(app):
+    """
+    Brings the schema of every shard to SCHEMA_VERSION, running each pending migration once.
+    The version reached is stored in the database (SQLite's user_version), so later startups only read it back
+    and check that the search index triggers are in place instead of re-creating the schema. Other backends do not
+    record a version and run the migrations, which are idempotent, on every startup.
+
+    Parameters:
+    - app (Flask): The Flask application whose database is set up.
+
+    Returns:
+    - None.
+    """
+    with app.app_context():
+        for engine in shard_engines():
+            if engine.dialect.name != "sqlite":
+                for _, migration in MIGRATIONS:
+                    migration(engine)
+                continue
+
+            with engine.connect() as connection:
+                version = connection.execute(text("PRAGMA user_version")).scalar()
+                index_missing = _search_index_missing(connection)
+            if version >= SCHEMA_VERSION:
+                if index_missing:
+                    create_search_index(engine)  # Restore dropped triggers and index the rows written without them
+                continue
+
+            for migration_version, migration in MIGRATIONS:
+                if migration_version > version:
+                    migration(engine)
+            with engine.begin() as connection:
+                connection.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
+
+def _create_tables(engine):
+    db.metadata.create_all(engine)
+    create_search_index(engine)  # Create the name search index next to the inventory table
+
+def _create_jobs_table(engine):
+    from models.jobs import Job
+
+    Job.__table__.create(engine, checkfirst=True)
+
+def _create_transforms_table(engine):
+    from models.transforms import Transform
+
+    Transform.__table__.create(engine, checkfirst=True)
+
+def _create_idempotency_table(engine):
+    from models.idempotency import IdempotencyKey
+
+    IdempotencyKey.__table__.create(engine, checkfirst=True)
+
+# Schema migrations as (version, function of the engine), applied in order to shards below that version
+MIGRATIONS = [
+    (1, _create_tables),
+    (2, _create_jobs_table),
+    (3, _create_transforms_table),
+    (4, _create_idempotency_table),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def _search_index_missing(connection):
+    from models.inventory import SEARCH_INDEX_TABLE, SEARCH_INDEX_TRIGGERS
+
+    names = [SEARCH_INDEX_TABLE] + SEARCH_INDEX_TRIGGERS
+    existing = connection.execute(
+        text(f"SELECT COUNT(*) FROM sqlite_master WHERE name IN ({', '.join(f':n{i}' for i in range(len(names)))})"),
+        {f"n{i}": name for i, name in enumerate(names)},
+    ).scalar()
+    return existing < len(names)
+
+def create_search_index(engine):
+    """
+    Creates the trigram search index over inventory names and the triggers that keep it in sync.
+    The index is rebuilt from the existing rows when it is first created, and whenever its triggers were missing, so
+    rows written without them are indexed too. Only SQLite databases are indexed; other backends fall back to plain
+    queries when searching.
+
+    Parameters:
+    - engine (Engine): The engine of the shard to index.
+
+    Returns:
+    - None.
+    """
+    from models.inventory import SEARCH_INDEX_TABLE, SEARCH_INDEX_DDL
+
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as connection:
+        missing = _search_index_missing(connection)
+        for statement in SEARCH_INDEX_DDL.values():
+            connection.execute(text(statement))
+        if missing:
+            # Index rows that were stored while the search index or its triggers did not exist
+            connection.execute(text(f"INSERT INTO {SEARCH_INDEX_TABLE}({SEARCH_INDEX_TABLE}) VALUES ('rebuild')"))
+
+@contextmanager
+def deferred_search_index(engine):
+    """
+    Indexes the inventory rows inserted into a shard within the block in one statement at its end, instead of row by
+    row through the insert trigger, which is several times slower for bulk writes.
+    The block runs in a write transaction begun here and committed by the caller. The trigger is dropped and
+    recreated inside it, so writers on other connections never see it missing, and a block that fails rolls back
+    with the trigger in place. Rows inserted by the block get ids above the largest one when it starts; updates to
+    existing rows must not change their names. Only SQLite databases are indexed; elsewhere the block runs as is.
+
+    Parameters:
+    - engine (Engine): The engine of the shard written to, with no transaction open on it in the session.
+
+    Returns:
+    - A context manager.
+    """
+    from models.inventory import SEARCH_INDEX_TABLE, SEARCH_INDEX_INSERT_TRIGGER, SEARCH_INDEX_DDL
+
+    if engine.dialect.name != "sqlite":
+        yield
+        return
+
+    bind = {"bind": engine}
+    # pysqlite only begins transactions before DML, so begin one explicitly for the trigger to be dropped inside it
+    db.session.execute(text("BEGIN IMMEDIATE"), bind_arguments=bind)
+    db.session.execute(text(f"DROP TRIGGER {SEARCH_INDEX_INSERT_TRIGGER}"), bind_arguments=bind)
+    last_id = db.session.execute(text("SELECT COALESCE(MAX(id), 0) FROM inventory"), bind_arguments=bind).scalar()
+    yield
+    db.session.execute(
+        text(f"INSERT INTO {SEARCH_INDEX_TABLE}(rowid, name) SELECT id, name FROM inventory WHERE id > :last_id"),
+        {"last_id": last_id},
+        bind_arguments=bind,
+    )
+    db.session.execute(text(SEARCH_INDEX_DDL[SEARCH_INDEX_INSERT_TRIGGER]), bind_arguments=bind)
@@ -0,0 +1,82 @@
+"""
+Command line bulk import and export of the inventory, working directly on the configured database.
+
+Usage:
+    python inventory_cli.py import catalogue.csv
+    python inventory_cli.py import catalogue.ndjson --chunk-size 20000
+    python inventory_cli.py export inventory.csv
+    python inventory_cli.py export - --format ndjson > inventory.ndjson
+"""
+import argparse
+import sys
+import time
+from contextlib import nullcontext
+from app import create_app
+from config import Config
+from services.inventory import import_items, export_items
+from utils.bulk_formats import BULK_FORMATS, parse_rows, format_rows
+
+
+def detect_format(path, fmt):
+    """Returns the explicit format, or the one implied by the file extension (NDJSON by default)."""
+    if fmt:
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "ndjson"
+
+
+def run_import(args):
+    fmt = detect_format(args.path, args.format)
+    start = time.perf_counter()
+
+    def report(imported):
+        rate = imported / max(time.perf_counter() - start, 1e-9)
+        print(f"\rImported {imported} rows ({rate:,.0f} rows/s)", end="", file=sys.stderr, flush=True)
+
+    # Only files opened here are closed, not stdin
+    with nullcontext(sys.stdin.buffer) if args.path == "-" else open(args.path, "rb") as stream:
+        success, result = import_items(parse_rows(stream, fmt), args.chunk_size, report)
+    print(file=sys.stderr)
+
+    if not success:
+        print(result, file=sys.stderr)
+        return 1
+    print(
+        f"Imported {result['imported']} rows in {result['chunks']} chunks, skipped {result['skipped']} "
+        f"in {time.perf_counter() - start:.1f}s",
+        file=sys.stderr,
+    )
+    for error in result["errors"]:
+        print(f"  line {error['line']}: {error['error']}", file=sys.stderr)
+    return 0
+
+
+def run_export(args):
+    fmt = detect_format(args.path, args.format)
+    # Only files opened here are closed; stdout is flushed and left open
+    with nullcontext(sys.stdout) if args.path == "-" else open(args.path, "w", newline="", encoding="utf-8") as stream:
+        for chunk in format_rows(export_items(args.chunk_size), fmt):
+            stream.write(chunk)
+        stream.flush()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import and export of inventory items.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, description in (("import", "Upsert items from a CSV or NDJSON file."), ("export", "Write all items to a file.")):
+        subparser = subparsers.add_parser(name, help=description)
+        subparser.add_argument("path", help="File to read or write, '-' for stdin/stdout.")
+        subparser.add_argument("--format", choices=BULK_FORMATS, help="File format, by default from the extension.")
+        subparser.add_argument("--chunk-size", type=int, default=Config.BULK_CHUNK_SIZE, help="Rows per transaction or fetch.")
+    args = parser.parse_args()
+
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size must be positive")
+
+    app = create_app()
+    with app.app_context():
+        return run_import(args) if args.command == "import" else run_export(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
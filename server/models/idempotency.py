@@ -0,0 +1,25 @@
+from database import db
+
+class IdempotencyKey(db.Model):
+    """
+    Represents the idempotency_keys table: the claim and stored response of every idempotency key, kept in the
+    default database so that a retry reaching any worker process finds them.
+    Attributes:
+        key (str): Primary key, hash of the client's key, the method and the route.
+        fingerprint (str): Hash of the body of the request that claimed the key.
+        status_code (int): Status code of the stored response, or None while the request is in progress.
+        body (bytes): Body of the stored response.
+        headers (str): JSON list of the stored response headers.
+        created (float): Time the key was claimed; claims never completed are released after a timeout.
+        completed (float): Time the response was stored, or None; indexed so that expired keys are found from
+            the front.
+    """
+    __tablename__ = 'idempotency_keys'
+
+    key = db.Column(db.String(64), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer)
+    body = db.Column(db.LargeBinary)
+    headers = db.Column(db.Text)
+    created = db.Column(db.Float, nullable=False, index=True)
+    completed = db.Column(db.Float, index=True)
@@ -12,4 +12,29 @@ class Inventory(db.Model):
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True, nullable=False)
     name = db.Column(db.String(255), nullable=False, unique=True)
-    quantity = db.Column(db.Integer, nullable=False, default=0)
\ No newline at end of file
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Name of the SQLite FTS5 table used to search inventory names
+SEARCH_INDEX_TABLE = "inventory_search"
+
+# Triggers that keep the search index in sync; bulk imports replace the insert trigger per chunk
+SEARCH_INDEX_INSERT_TRIGGER = f"{SEARCH_INDEX_TABLE}_ai"
+SEARCH_INDEX_TRIGGERS = [SEARCH_INDEX_INSERT_TRIGGER, f"{SEARCH_INDEX_TABLE}_ad", f"{SEARCH_INDEX_TABLE}_au"]
+
+# Trigram full-text index over inventory names and the triggers that keep it in sync, by object name, in creation order
+SEARCH_INDEX_DDL = {
+    SEARCH_INDEX_TABLE:
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_INDEX_TABLE} USING fts5("
+        "name, content='inventory', content_rowid='id', tokenize='trigram')",
+    SEARCH_INDEX_INSERT_TRIGGER:
+        f"CREATE TRIGGER IF NOT EXISTS {SEARCH_INDEX_INSERT_TRIGGER} AFTER INSERT ON inventory BEGIN "
+        f"INSERT INTO {SEARCH_INDEX_TABLE}(rowid, name) VALUES (new.id, new.name); END",
+    f"{SEARCH_INDEX_TABLE}_ad":
+        f"CREATE TRIGGER IF NOT EXISTS {SEARCH_INDEX_TABLE}_ad AFTER DELETE ON inventory BEGIN "
+        f"INSERT INTO {SEARCH_INDEX_TABLE}({SEARCH_INDEX_TABLE}, rowid, name) VALUES ('delete', old.id, old.name); END",
+    f"{SEARCH_INDEX_TABLE}_au":
+        f"CREATE TRIGGER IF NOT EXISTS {SEARCH_INDEX_TABLE}_au AFTER UPDATE OF name ON inventory BEGIN "
+        f"INSERT INTO {SEARCH_INDEX_TABLE}({SEARCH_INDEX_TABLE}, rowid, name) VALUES ('delete', old.id, old.name); "
+        f"INSERT INTO {SEARCH_INDEX_TABLE}(rowid, name) VALUES (new.id, new.name); END",
+}
@@ -0,0 +1,25 @@
+from database import db
+
+class Job(db.Model):
+    """
+    Represents the jobs table, kept in the default database so that every worker process sees every job.
+    Attributes:
+        id (str): Unique job identifier.
+        method (str): HTTP method of the queued request.
+        path (str): Path and query string of the queued request.
+        status (str): "pending", "running", "done" or "failed".
+        status_code (int): HTTP status code of the executed request, once finished.
+        result (str): JSON body of the executed request, once finished.
+        created (float): Time the job was accepted; indexed so that abandoned jobs are found from the front.
+        finished (float): Time the job finished, or None; indexed so that expired jobs are found from the front.
+    """
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.String(32), primary_key=True)
+    method = db.Column(db.String(16), nullable=False)
+    path = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(16), nullable=False)
+    status_code = db.Column(db.Integer)
+    result = db.Column(db.Text)
+    created = db.Column(db.Float, nullable=False, index=True)
+    finished = db.Column(db.Float, index=True)
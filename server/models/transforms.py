@@ -0,0 +1,20 @@
+from database import db
+
+class Transform(db.Model):
+    """
+    Represents the transforms table: the latest coalesced transform of every object, kept in the default
+    database so that every worker process serves the same state.
+    Attributes:
+        name (str): Primary key, the object name.
+        position (str): JSON of the latest position, or None if none was received.
+        rotation (str): JSON of the latest rotation, or None if none was received.
+        scale (str): JSON of the latest scale, or None if none was received.
+        updated (float): Time the object was last written.
+    """
+    __tablename__ = 'transforms'
+
+    name = db.Column(db.String(255), primary_key=True)
+    position = db.Column(db.Text)
+    rotation = db.Column(db.Text)
+    scale = db.Column(db.Text)
+    updated = db.Column(db.Float, nullable=False)
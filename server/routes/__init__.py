@@ -17,7 +17,13 @@ def register_blueprints(app):
     from routes.inventory import inventory_bp
     from routes.file import file_bp
     from routes.transforms import transforms_bp
+    from routes.metrics import metrics_bp
+    from routes.profiles import profiles_bp
+    from routes.jobs import jobs_bp
 
     app.register_blueprint(inventory_bp)
     app.register_blueprint(file_bp)
     app.register_blueprint(transforms_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(profiles_bp)
+    app.register_blueprint(jobs_bp)
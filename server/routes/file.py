@@ -1,20 +1,42 @@
-from flask import Blueprint, request
-from utils.responses import success_response
+from flask import Blueprint, current_app, request
+from services.assets import resolve_file, resolve_project, UNCONFIGURED_FILE_PATH, UNCONFIGURED_PROJECT_PATH
+from utils.responses import success_response, error_response
 
 file_bp = Blueprint("file", __name__)
 
 @file_bp.route('/file-path', methods=['GET'])
 def file_path():
     """
-    Retrieves the file path based on the query parameter 'projectpath'.
-    
+    Resolves a project folder or a DCC file under the configured project roots.
+    Files are looked up in an in-memory index of the roots that is refreshed incrementally, not by walking them.
+    Without any PROJECT_ROOTS, the placeholder folder or file path is returned for any request, as before.
+
     Parameters:
-    - projectpath (query parameter): A boolean value passed as a query parameter in the GET request to determine 
-      if the file path should point to a project folder ('true') or a DCC file ('false').
-    
+    - projectpath (query parameter): 'true' to retrieve the folder of the project, 'false' (default) to resolve
+      the file given by 'name'.
+    - name (query parameter): The file name to resolve, e.g. 'shot010.blend'.
+    - project (query parameter, optional): The project to resolve in; all projects by default for files, and the
+      first configured project for folders.
+    - hash (query parameter, optional): 'false' to skip the content hash, computed on first use and cached.
+
     Returns:
-    - A JSON response containing a success message and the corresponding file path.
+    - A JSON response containing a success message and the file path with its project, and for files its size,
+      mtime, SHA-256 hash and number of matching files, or an error message.
     """
     projectpath = request.args.get("projectpath", "false").lower() == "true"
-    path = "/path/to/project/folder" if projectpath else "/path/to/dcc/file"
-    return success_response("File path retrieved", {"file_path": path})
+    if not current_app.config.get("PROJECT_ROOTS"):
+        path = UNCONFIGURED_PROJECT_PATH if projectpath else UNCONFIGURED_FILE_PATH
+        return success_response("File path retrieved", {"file_path": path})
+
+    project = request.args.get("project") or None
+    if projectpath:
+        success, result = resolve_project(project)
+        return success_response("File path retrieved", result) if success else error_response(result, 404)
+
+    name = request.args.get("name", "").strip()
+    if not name:
+        return error_response("Missing name")
+
+    with_hash = request.args.get("hash", "true").lower() != "false"
+    success, result = resolve_file(name, project, with_hash)
+    return success_response("File path retrieved", result) if success else error_response(result, 404)
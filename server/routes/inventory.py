@@ -1,15 +1,17 @@
-from flask import Blueprint, request, jsonify
-from services.inventory import add_item, remove_item, update_quantity, get_items
-from utils.responses import success_response, error_response
+from flask import Blueprint, Response, current_app, request, stream_with_context, jsonify
+from services.inventory import add_item, remove_item, update_quantity, get_items, search_items, import_items, export_items
+from utils.bulk_formats import BULK_FORMATS, BULK_MIMETYPES, parse_rows, format_rows
+from utils.responses import success_response, shared_success_response, error_response
 from utils.delayed_response import delayed_response
+from utils.log import log_request
 import logging
 
 inventory_bp = Blueprint("inventory", __name__)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MAX_SEARCH_LIMIT = 100  # Upper bound on the number of results returned by /search-items
+
 @inventory_bp.route("/add-item", methods=["POST"])
 def add_item_route():
     """
@@ -25,7 +27,7 @@ def add_item_route():
     try:
         data = request.json
         name, quantity = data.get("name"), data.get("quantity")
-        logger.info(f"Received request at /add-item with data: {data}")
+        log_request(logger, "/add-item", data)
     except Exception as e:
         return delayed_response(error_response(f"Invalid JSON: {str(e)}"))
 
@@ -57,7 +59,7 @@ def remove_item_route():
     try:
         data = request.json
         name = data.get("name")
-        logger.info(f"Received request at /remove-item with data: {data}")
+        log_request(logger, "/remove-item", data)
     except Exception as e:
         return delayed_response(error_response(f"Invalid JSON: {str(e)}"))
 
@@ -87,7 +89,7 @@ def update_quantity_route():
     try:
         data = request.json
         name, quantity = data.get("name"), data.get("quantity")
-        logger.info(f"Received request at /update-quantity with data: {data}")
+        log_request(logger, "/update-quantity", data)
     except Exception as e:
         return delayed_response(error_response(f"Invalid JSON: {str(e)}"))
 
@@ -118,7 +120,111 @@ def get_items_route():
     """
     success, result = get_items()
     return delayed_response(
-        success_response("Items retrieved successfully", result)
+        shared_success_response("Items retrieved successfully", result)
         if success
         else error_response(result, 404)
     )
+
+
+@inventory_bp.route("/search-items", methods=["GET"])
+def search_items_route():
+    """
+    Searches the inventory by item name.
+
+    Parameters:
+    - q (query parameter): The text to search for.
+    - mode (query parameter): "prefix" (default) to match names starting with q, or "fuzzy" for typo-tolerant matching.
+    - limit (query parameter): The maximum number of items to return (default 20, at most 100).
+
+    Returns:
+    - A JSON response containing the matching items ordered by relevance or an error message if there was an issue.
+    """
+    query = request.args.get("q", "")
+    mode = request.args.get("mode", "prefix").lower()
+    log_request(logger, "/search-items", {"q": query, "mode": mode})
+
+    try:
+        limit = int(request.args.get("limit", 20))
+    except ValueError:
+        return delayed_response(error_response("Limit must be an integer"))
+
+    if limit <= 0:
+        return delayed_response(error_response("Limit must be positive"))
+
+    success, result = search_items(query, mode, min(limit, MAX_SEARCH_LIMIT))
+    return delayed_response(
+        shared_success_response("Items retrieved successfully", result)
+        if success
+        else error_response(result)
+    )
+
+
+def _bulk_format():
+    """Returns the bulk format named by the 'format' query parameter or implied by the Content-Type, or None."""
+    fmt = request.args.get("format")
+    if fmt is None:
+        mimetype = request.mimetype
+        fmt = next((name for name, value in BULK_MIMETYPES.items() if value == mimetype), "ndjson")
+    fmt = fmt.lower()
+    return fmt if fmt in BULK_FORMATS else None
+
+
+@inventory_bp.route("/import-items", methods=["POST"])
+def import_items_route():
+    """
+    Imports items from a CSV or NDJSON request body, upserting them in chunked transactions.
+    The body is parsed as it is received, so large catalogues are imported with flat memory.
+
+    Parameters:
+    - format (query parameter): "csv" or "ndjson". Defaults to the format implied by the Content-Type, else NDJSON.
+    - chunk_size (query parameter): Rows written per transaction (default BULK_CHUNK_SIZE).
+    - Body: CSV with a "name,quantity" header, or one {"name": ..., "quantity": ...} object per line.
+
+    Returns:
+    - A JSON response with the imported, skipped and chunk counts and the first invalid rows,
+      or an error message if there was an issue.
+    """
+    fmt = _bulk_format()
+    log_request(logger, "/import-items", {"format": fmt, "content_length": request.content_length})
+    if fmt is None:
+        return delayed_response(error_response("Format must be csv or ndjson"))
+
+    try:
+        chunk_size = int(request.args.get("chunk_size", current_app.config.get("BULK_CHUNK_SIZE", 5000)))
+    except ValueError:
+        return delayed_response(error_response("Chunk size must be an integer"))
+
+    if chunk_size <= 0:
+        return delayed_response(error_response("Chunk size must be positive"))
+
+    def report(imported):
+        logger.info("Imported %d rows", imported, extra={"route": "/import-items"})
+
+    success, result = import_items(parse_rows(request.stream, fmt), chunk_size, report)
+    return delayed_response(
+        success_response("Items imported successfully", result)
+        if success
+        else error_response(result, 500)
+    )
+
+
+@inventory_bp.route("/export-items", methods=["GET"])
+def export_items_route():
+    """
+    Exports all items as CSV or NDJSON, streamed straight from the database cursor.
+
+    Parameters:
+    - format (query parameter): "csv" or "ndjson" (default).
+
+    Returns:
+    - A streamed CSV or NDJSON response, or an error message if the format is not supported.
+    """
+    fmt = request.args.get("format", "ndjson").lower()
+    log_request(logger, "/export-items", {"format": fmt})
+    if fmt not in BULK_FORMATS:
+        return delayed_response(error_response("Format must be csv or ndjson"))
+
+    rows = export_items(current_app.config.get("BULK_CHUNK_SIZE", 5000))
+    return delayed_response(
+        Response(stream_with_context(format_rows(rows, fmt)), mimetype=BULK_MIMETYPES[fmt])
+    )
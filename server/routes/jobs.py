@@ -0,0 +1,65 @@
+from flask import Blueprint, current_app, request
+from utils.jobs import job_registry
+from utils.responses import success_response, error_response
+
+jobs_bp = Blueprint("jobs", __name__)
+
+
+def _wait_seconds():
+    """Returns the long-poll wait requested by the 'wait' query parameter, capped at JOB_MAX_WAIT_SECONDS."""
+    try:
+        wait = float(request.args.get("wait", 0))
+    except ValueError:
+        return None
+    return min(max(wait, 0.0), current_app.config.get("JOB_MAX_WAIT_SECONDS", 30))
+
+
+@jobs_bp.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    """
+    Retrieves the state of a job, optionally waiting for it to finish.
+    Served without the simulated delay; the delay is paid by the job itself.
+
+    Parameters:
+    - job_id (str): The id returned when the job was accepted.
+    - wait (query parameter): Seconds to wait for the job to finish before answering (long-poll, default 0).
+
+    Returns:
+    - A JSON response with the job's status and, once finished, the status code and body of its request,
+      or a 404 error if the job is unknown or expired.
+    """
+    wait = _wait_seconds()
+    if wait is None:
+        return error_response("Wait must be a number")
+
+    job = job_registry().wait([job_id], wait)[job_id]
+    if job is None:
+        return error_response("Job not found", 404)
+    return success_response("Job retrieved successfully", job)
+
+
+@jobs_bp.route("/jobs", methods=["GET"])
+def get_jobs():
+    """
+    Retrieves the state of several jobs at once, optionally waiting until all of them have finished.
+
+    Parameters:
+    - ids (query parameter): Comma-separated job ids.
+    - wait (query parameter): Seconds to wait for the jobs to finish before answering (default 0).
+
+    Returns:
+    - A JSON response with one entry per id; unknown or expired ids have the status "unknown".
+    """
+    wait = _wait_seconds()
+    if wait is None:
+        return error_response("Wait must be a number")
+
+    ids = [job_id for job_id in request.args.get("ids", "").split(",") if job_id]
+    if not ids:
+        return error_response("Missing ids")
+
+    jobs = job_registry().wait(ids, wait)  # One query per poll for all the ids
+    return success_response(
+        "Jobs retrieved successfully",
+        [job or {"id": job_id, "status": "unknown"} for job_id, job in jobs.items()],
+    )
@@ -0,0 +1,19 @@
+from flask import Blueprint, Response
+from utils.metrics import render_metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """
+    Exposes request, latency and SQL metrics for scraping.
+    Served without the simulated delay so monitoring stays responsive.
+
+    Parameters:
+    - None.
+
+    Returns:
+    - A plain text response in the Prometheus exposition format.
+    """
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
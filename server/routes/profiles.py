@@ -0,0 +1,56 @@
+from flask import Blueprint, current_app, send_from_directory
+from utils.profiling import list_profiles, list_memory_profiles
+from utils.responses import success_response, error_response
+
+profiles_bp = Blueprint("profiles", __name__)
+
+
+@profiles_bp.route("/profiles", methods=["GET"])
+def profiles():
+    """
+    Lists the request profiles recorded by the profiling mode.
+
+    Parameters:
+    - None.
+
+    Returns:
+    - A JSON response containing the profiles, newest first, or a 404 error if profiling is disabled.
+    """
+    if not current_app.config.get("PROFILING_ENABLED"):
+        return error_response("Profiling is disabled", 404)
+    return success_response("Profiles retrieved successfully", list_profiles(current_app.config["PROFILING_DIR"]))
+
+
+@profiles_bp.route("/profiles/memory", methods=["GET"])
+def memory_profiles():
+    """
+    Lists the memory reports of recent requests sent with the MEMORY_PROFILING_HEADER.
+
+    Parameters:
+    - None.
+
+    Returns:
+    - A JSON response containing the reports, newest first, each with the peak and retained bytes and the top
+      allocation sites, or a 404 error if memory profiling is disabled.
+    """
+    if not current_app.config.get("MEMORY_PROFILING_ENABLED"):
+        return error_response("Memory profiling is disabled", 404)
+    return success_response("Memory profiles retrieved successfully", list_memory_profiles())
+
+
+@profiles_bp.route("/profiles/<name>", methods=["GET"])
+def download_profile(name):
+    """
+    Downloads a recorded profile as a pstats file, readable with `python -m pstats` or snakeviz.
+
+    Parameters:
+    - name (str): The profile file name as returned by /profiles.
+
+    Returns:
+    - The pstats file, or a 404 error if profiling is disabled or the profile does not exist.
+    """
+    if not current_app.config.get("PROFILING_ENABLED"):
+        return error_response("Profiling is disabled", 404)
+    if not name.endswith(".pstats"):
+        return error_response("Profile not found", 404)
+    return send_from_directory(current_app.config["PROFILING_DIR"], name, as_attachment=True)
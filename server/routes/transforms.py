@@ -1,13 +1,12 @@
-from flask import Blueprint, request
-from utils.responses import success_response
+from flask import Blueprint, current_app, request
+from services.transforms import submit_transform, get_transforms
+from utils.responses import success_response, error_response
 from utils.delayed_response import delayed_response
-import logging
 
 transforms_bp = Blueprint("transforms", __name__)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+# Named updates are coalesced per object and handled, logged and stored once per TRANSFORM_TICK_MS by
+# services.transforms, under the route of the object's latest update
 
 
 @transforms_bp.route("/transform", methods=["POST"])
@@ -22,7 +21,7 @@ def transform():
     - A JSON response with a success message and the received data.
     """
     data = request.json
-    logger.info(f"Received request at /transform with data: {data}")
+    submit_transform(data, "/transform")
     return delayed_response(success_response("Transform received", {"data": data}))
 
 
@@ -38,7 +37,7 @@ def translation():
     - A JSON response with a success message and the received position.
     """
     position = request.json.get("position")
-    logger.info(f"Received request at /translation with position: {position}")
+    submit_transform({"name": request.json.get("name"), "position": position}, "/translation")
     return delayed_response(
         success_response("Translation received", {"position": position})
     )
@@ -56,7 +55,7 @@ def rotation():
     - A JSON response with a success message and the received rotation.
     """
     rotation = request.json.get("rotation")
-    logger.info(f"Received request at /rotation with rotation: {rotation}")
+    submit_transform({"name": request.json.get("name"), "rotation": rotation}, "/rotation")
     return delayed_response(
         success_response("Rotation received", {"rotation": rotation})
     )
@@ -74,5 +73,53 @@ def scale():
     - A JSON response with a success message and the received scale.
     """
     scale = request.json.get("scale")
-    logger.info(f"Received request at /scale with scale: {scale}")
+    submit_transform({"name": request.json.get("name"), "scale": scale}, "/scale")
     return delayed_response(success_response("Scale received", {"scale": scale}))
+
+
+@transforms_bp.route("/transforms", methods=["GET"])
+def transforms():
+    """
+    Retrieves the latest coalesced transform of every object.
+
+    Parameters:
+    - None.
+
+    Returns:
+    - A JSON response mapping object names to their latest position, rotation and scale.
+    """
+    success, result = get_transforms()
+    return delayed_response(success_response("Transforms retrieved successfully", result))
+
+
+@transforms_bp.route("/transform-matrices", methods=["POST"])
+def transform_matrices():
+    """
+    Computes world matrices, inverse matrices and bounds for a batch of transforms.
+
+    Parameters:
+    - objects (list): Transforms with "position", "rotation" (Euler radians) and "scale" x/y/z dictionaries, or
+      positions, rotations and scales (lists): The same components as lists of [x, y, z] triples.
+    - local_bounds (list, optional): The local box bounded per object, [[min x, y, z], [max x, y, z]].
+
+    Returns:
+    - A JSON response with the 4x4 row-major matrices, their inverses, per-object bounds and combined bounds,
+      or an error message.
+    """
+    from services.matrices import batch_matrices  # Deferred: NumPy is only loaded once matrices are requested
+
+    try:
+        data = request.get_json()
+    except Exception as e:
+        return delayed_response(error_response(f"Invalid JSON: {str(e)}"))
+
+    success, result = batch_matrices(
+        data,
+        current_app.config.get("TRANSFORM_LOCAL_BOUNDS", ((-1.0, -1.0, -1.0), (1.0, 1.0, 1.0))),
+        current_app.config.get("TRANSFORM_BATCH_MAX_OBJECTS", 1000000),
+    )
+    return delayed_response(
+        success_response("Matrices computed successfully", result)
+        if success
+        else error_response(result)
+    )
@@ -0,0 +1,185 @@
+"""
+Production entry point that serves the app from several pre-forked worker processes.
+
+The parent process sets up the database schema once, opens the listening sockets and forks the
+workers. Every worker builds its own app, and therefore its own database engine, and serves the
+shared HTTP socket with a threaded WSGI server, and the shared transform stream socket when
+TRANSFORM_STREAM_ENABLED is set. Workers that exit are restarted, with an exponential backoff
+while they fail right after starting, and the runner exits with status 1 after repeated failed
+starts; SIGINT or SIGTERM stops them all.
+
+Usage:
+    python serve.py --workers 4 --host 0.0.0.0 --port 5000
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+from werkzeug.serving import make_server
+from app import create_app
+from config import Config
+from database import db
+from services.transform_stream import start_transform_stream
+
+
+# A worker exiting sooner than this after it started counts as a failed start; respawns after failed starts
+# back off exponentially up to RESPAWN_MAX_BACKOFF_SECONDS, and the runner gives up after MAX_FAILED_STARTS in a row
+MIN_WORKER_UPTIME_SECONDS = 5
+RESPAWN_MAX_BACKOFF_SECONDS = 30
+MAX_FAILED_STARTS = 5
+
+
+class WorkerConfig(Config):
+    # The parent process has already created the schema
+    SCHEMA_SETUP_ON_STARTUP = False
+
+
+def setup_schema():
+    """
+    Creates the database schema once, before any worker is forked.
+
+    Parameters:
+    - None.
+
+    Returns:
+    - None.
+    """
+    app = create_app(Config)
+    with app.app_context():
+        db.engine.dispose()  # Workers must not inherit open database connections
+
+
+def run_worker(sock, stream_sock=None):
+    """
+    Serves requests from the shared listening sockets until the process is terminated.
+
+    Parameters:
+    - sock (socket.socket): The HTTP listening socket opened by the parent process.
+    - stream_sock (socket.socket, optional): The transform stream listening socket opened by the parent process.
+
+    Returns:
+    - None. The worker process exits when it stops serving.
+    """
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    app = create_app(WorkerConfig)
+    if stream_sock is not None:
+        start_transform_stream(app, stream_sock)
+    host, port = sock.getsockname()[:2]
+    server = make_server(host, port, app, threaded=True, fd=sock.fileno())
+    server.serve_forever()
+
+
+def spawn_worker(sock, stream_sock=None):
+    """
+    Forks a worker process serving sock, and stream_sock if given, and returns its pid.
+    The worker exits with status 0 when it is stopped, and prints the traceback and exits with status 1 when it
+    fails, e.g. on an import error or an exception in create_app().
+    """
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            run_worker(sock, stream_sock)
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else 1
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(status)
+    return pid
+
+
+def listen(host, port):
+    """Opens a listening TCP socket that forked workers inherit."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(128)
+    sock.set_inheritable(True)
+    return sock
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the app from pre-forked worker processes.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on.")
+    parser.add_argument("--port", type=int, default=5000, help="Port to listen on.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of worker processes.")
+    args = parser.parse_args()
+
+    setup_schema()
+
+    sock = listen(args.host, args.port)
+    stream_sock = None
+    if Config.TRANSFORM_STREAM_ENABLED:
+        stream_sock = listen(Config.TRANSFORM_STREAM_HOST, Config.TRANSFORM_STREAM_PORT)
+
+    if not hasattr(os, "fork"):
+        # Platforms without fork serve from a single threaded process
+        run_worker(sock, stream_sock)
+        return 0
+
+    workers = {spawn_worker(sock, stream_sock): time.monotonic() for _ in range(args.workers)}  # pid: start time
+    print(f"Serving on http://{args.host}:{args.port} with {len(workers)} workers", flush=True)
+
+    stopping = False
+    exit_code = 0
+    failed_starts = 0
+    respawns = []  # Times at which replacement workers are due
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while not stopping:
+        try:
+            pid, wait_status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            pid = 0
+        if pid and pid in workers:
+            # Replace workers that exited unexpectedly, backing off while they keep failing to start
+            uptime = time.monotonic() - workers.pop(pid)
+            failed_starts = failed_starts + 1 if uptime < MIN_WORKER_UPTIME_SECONDS else 0
+            print(
+                f"Worker {pid} exited with status {os.waitstatus_to_exitcode(wait_status)} after {uptime:.1f}s",
+                file=sys.stderr,
+                flush=True,
+            )
+            if failed_starts >= MAX_FAILED_STARTS:
+                print(f"Workers failed to start {failed_starts} times in a row, stopping", file=sys.stderr, flush=True)
+                exit_code = 1
+                break
+            backoff = min(RESPAWN_MAX_BACKOFF_SECONDS, 0.2 * 2 ** failed_starts) if failed_starts else 0
+            respawns.append(time.monotonic() + backoff)
+        for due in [due for due in respawns if due <= time.monotonic()]:
+            respawns.remove(due)
+            workers[spawn_worker(sock, stream_sock)] = time.monotonic()
+        time.sleep(0.2)
+
+    for pid in workers:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    for pid in workers:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+    sock.close()
+    if stream_sock is not None:
+        stream_sock.close()
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+import hashlib
+import os
+import threading
+import time
+from flask import current_app
+
+_index_lock = threading.Lock()
+
+# Paths /file-path answers with while no project roots are configured, as it did before it resolved assets
+UNCONFIGURED_PROJECT_PATH = "/path/to/project/folder"
+UNCONFIGURED_FILE_PATH = "/path/to/dcc/file"
+
+
+class AssetEntry:
+    """
+    A file found under a project root.
+    Attributes:
+        project (str): The project whose root contains the file.
+        path (str): Absolute path of the file.
+        size (int): Size in bytes when last checked.
+        mtime_ns (int): Modification time in nanoseconds when last checked.
+        hash (str): SHA-256 of the content, or None until it is first requested.
+    """
+    def __init__(self, project, path, size, mtime_ns):
+        self.project = project
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.hash = None
+
+    def to_dict(self):
+        """Returns the entry's public metadata."""
+        return {
+            "file_path": self.path,
+            "project": self.project,
+            "size": self.size,
+            "mtime": self.mtime_ns / 1e9,
+            "hash": self.hash,
+        }
+
+
+class AssetIndex:
+    """
+    In-memory index of the files under the configured project roots, keyed by file name and project.
+    Built with os.scandir and refreshed incrementally: only directories whose mtime changed since they were last
+    scanned are read again, which is when files were added, removed or renamed in them. Content changes do not
+    touch the directory, so the metadata of a file is re-checked with a single stat when it is looked up.
+    Attributes:
+        roots (dict): Project names mapped to their root directories.
+        refresh_seconds (float): Minimum time between two refreshes.
+    """
+    def __init__(self, roots, refresh_seconds):
+        self.roots = {project: os.path.abspath(root) for project, root in roots.items()}
+        self.refresh_seconds = refresh_seconds
+        self._dirs = {}  # Directory path: (project, mtime_ns, subdirectory paths, file paths)
+        self._files = {}  # File path: AssetEntry
+        self._names = {}  # File name: {project: sorted file paths}
+        self._refreshed = None
+        self._lock = threading.Lock()
+
+    def lookup(self, name, project=None, with_hash=True):
+        """
+        Resolves a file name to its entry.
+
+        Parameters:
+        - name (str): The file name, e.g. "shot010.blend".
+        - project (str, optional): Only resolve within this project.
+        - with_hash (bool): Whether to compute the content hash if it is not cached yet.
+
+        Returns:
+        - A tuple (entry, matches) with the AssetEntry of the first matching path in path order, or None, and the
+          number of matching files.
+        """
+        with self._lock:
+            self._refresh_if_stale()
+            by_project = self._names.get(name, {})
+            paths = by_project.get(project, []) if project is not None else sorted(
+                path for paths in by_project.values() for path in paths
+            )
+            entry = self._files[paths[0]] if paths else None
+            if entry is not None and not self._check(entry):
+                self._remove_file(entry.path)
+                self._refreshed = None  # The tree changed under the index, rescan on the next lookup
+                return None, 0
+        if entry is not None and with_hash and entry.hash is None:
+            entry.hash = _file_hash(entry.path)  # Outside the lock, hashing large files can take a while
+        return entry, len(paths)
+
+    def refresh(self):
+        """
+        Brings the index up to date, rescanning only the directories whose mtime changed and the roots that are
+        not indexed yet.
+
+        Returns:
+        - None.
+        """
+        with self._lock:
+            self._refresh()
+
+    def _refresh_if_stale(self):
+        if self._refreshed is None or time.monotonic() - self._refreshed >= self.refresh_seconds:
+            self._refresh()
+
+    def _refresh(self):
+        for directory, (project, mtime_ns, _, _) in list(self._dirs.items()):
+            if directory not in self._dirs:
+                continue  # Removed along with its parent
+            try:
+                changed = os.stat(directory).st_mtime_ns != mtime_ns
+            except OSError:
+                self._remove_dir(directory)
+                continue
+            if changed:
+                self._scan(project, directory)
+        for project, root in self.roots.items():
+            if root not in self._dirs:
+                self._scan(project, root)
+        self._refreshed = time.monotonic()
+
+    def _scan(self, project, directory):
+        # Reads one directory, indexing new files and subdirectories (recursively) and dropping vanished ones
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                entries = list(entries)
+        except OSError:
+            self._remove_dir(directory)
+            return
+
+        _, _, old_dirs, old_files = self._dirs.get(directory, (project, None, set(), set()))
+        dirs, files = set(), set()
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.add(entry.path)
+                elif entry.is_file():
+                    files.add(entry.path)
+                    if entry.path not in self._files:
+                        stat = entry.stat()
+                        self._add_file(AssetEntry(project, entry.path, stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                continue
+        self._dirs[directory] = (project, mtime_ns, dirs, files)
+
+        for path in old_files - files:
+            self._remove_file(path)
+        for path in old_dirs - dirs:
+            self._remove_dir(path)
+        for path in dirs - old_dirs:
+            self._scan(project, path)
+
+    def _remove_dir(self, directory):
+        _, _, dirs, files = self._dirs.pop(directory, (None, None, (), ()))
+        for path in files:
+            self._remove_file(path)
+        for path in dirs:
+            self._remove_dir(path)
+
+    def _add_file(self, entry):
+        self._files[entry.path] = entry
+        paths = self._names.setdefault(os.path.basename(entry.path), {}).setdefault(entry.project, [])
+        paths.append(entry.path)
+        paths.sort()
+
+    def _remove_file(self, path):
+        entry = self._files.pop(path, None)
+        if entry is None:
+            return
+        name = os.path.basename(path)
+        by_project = self._names[name]
+        by_project[entry.project].remove(path)
+        if not by_project[entry.project]:
+            del by_project[entry.project]
+        if not by_project:
+            del self._names[name]
+
+    def _check(self, entry):
+        # Re-reads the metadata of a file about to be returned, dropping its cached hash if the content changed
+        try:
+            stat = os.stat(entry.path)
+        except OSError:
+            return False
+        if (stat.st_size, stat.st_mtime_ns) != (entry.size, entry.mtime_ns):
+            entry.size, entry.mtime_ns, entry.hash = stat.st_size, stat.st_mtime_ns, None
+        return True
+
+
+def resolve_file(name, project=None, with_hash=True):
+    """
+    Resolves a file name under the configured project roots.
+
+    Parameters:
+    - name (str): The file name to resolve.
+    - project (str, optional): Only resolve within this project.
+    - with_hash (bool): Whether to include the content hash, computed on first use and cached.
+
+    Returns:
+    - A tuple (success, result):
+      - success (bool): True if the file was found, False otherwise.
+      - result (dict or str): The path, project, size, mtime, hash and number of matches if found, or an error
+        message if not.
+    """
+    index = _asset_index(current_app._get_current_object())
+    if project is not None and project not in index.roots:
+        return False, f"Unknown project '{project}'"
+
+    entry, matches = index.lookup(name, project, with_hash)
+    if entry is None:
+        return False, f"File '{name}' not found"
+    return True, {**entry.to_dict(), "matches": matches}
+
+
+def resolve_project(project=None):
+    """
+    Resolves the root folder of a project.
+
+    Parameters:
+    - project (str, optional): The project name; the first configured project by default.
+
+    Returns:
+    - A tuple (success, result):
+      - success (bool): True if the project is configured, False otherwise.
+      - result (dict or str): The project and its folder path if found, or an error message if not.
+    """
+    index = _asset_index(current_app._get_current_object())
+    if not index.roots:
+        return False, "No project roots configured"
+    project = project if project is not None else next(iter(index.roots))
+    if project not in index.roots:
+        return False, f"Unknown project '{project}'"
+    return True, {"file_path": index.roots[project], "project": project}
+
+
+def _asset_index(app):
+    """Returns the app's asset index, created on first use."""
+    with _index_lock:
+        if "asset_index" not in app.extensions:
+            app.extensions["asset_index"] = AssetIndex(
+                app.config.get("PROJECT_ROOTS", {}), app.config.get("ASSET_INDEX_REFRESH_SECONDS", 2)
+            )
+        return app.extensions["asset_index"]
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
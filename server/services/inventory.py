@@ -1,5 +1,37 @@
-from database import db
-from models.inventory import Inventory
+import math
+import threading
+from contextlib import nullcontext
+from itertools import product
+from sqlalchemy import select, text
+from sqlalchemy.exc import IntegrityError
+from flask import current_app
+from database import db, conflict_insert, deferred_search_index, shard_engines, shard_index
+from models.inventory import Inventory, SEARCH_INDEX_TABLE
+from services.write_pipeline import WritePipeline
+from utils.singleflight import SingleFlight
+
+SEARCH_MODES = ("prefix", "fuzzy")  # Supported name search modes
+FUZZY_MIN_OVERLAP = 0.5  # Share of the query's trigrams a fuzzy match must contain
+FUZZY_MAX_CANDIDATES = 100  # Rows read from the search index per shard and fuzzy query, and counted per trigram
+MAX_IMPORT_ERRORS = 20  # Invalid rows reported individually by import_items
+
+# Concurrent identical reads share one query; results handed out by it must not be mutated
+_reads = SingleFlight()
+# Bumped after every committed write, so that reads never join a query started before the write
+_write_generation = 0
+_write_generation_lock = threading.Lock()
+_write_pipeline_lock = threading.Lock()
+
+
+def _read_key(*parts):
+    """Builds the single-flight key of a read on the current database at the current write generation."""
+    return (str(db.engine.url), _write_generation) + parts
+
+
+def _bump_write_generation():
+    global _write_generation
+    with _write_generation_lock:
+        _write_generation += 1
 
 
 def get_items():
@@ -14,13 +46,22 @@ def get_items():
       - success (bool): True if the operation was successful, False if an error occurred.
       - result (list or str): A list of dictionaries containing item names and quantities if successful,
                               or an error message if there was an issue.
+    Items of a sharded inventory are listed shard by shard. Concurrent calls share a single query and the same result list,
+    which routes serialize once with utils.responses.shared_success_response.
     """
-    try:
-        items = Inventory.query.all()
+    return _reads.do(_read_key("get_items"), _get_items)
+
 
-        items_list = [{"name": item.name, "quantity": item.quantity} for item in items]
+def _get_items():
+    try:
+        items_list = []
+        for engine in shard_engines():
+            rows = db.session.execute(
+                select(Inventory.name, Inventory.quantity).order_by(Inventory.id), bind_arguments={"bind": engine}
+            )
+            items_list.extend({"name": name, "quantity": quantity} for name, quantity in rows)
 
-        return True, items_list if items_list else []
+        return True, items_list
     except Exception as e:
         return False, f"Error getting items: {str(e)}"
 
@@ -39,19 +80,33 @@ def add_item(name, quantity):
       - result (dict or str): A dictionary containing the item's name and quantity if successful,
                               or an error message if there was an issue.
     """
-    try:
-        if not isinstance(quantity, int):
-            return False, "Quantity must be an integer"
+    if not isinstance(quantity, int):
+        return False, "Quantity must be an integer"
 
-        if Inventory.query.filter_by(name=name).first():
-            return False, "Item already exists"
+    return _write(_add_item, name, (quantity,), "Error adding item")
 
-        new_item = Inventory(name=name, quantity=quantity)
-        db.session.add(new_item)
-        db.session.commit()
-        return True, {"name": name, "quantity": quantity}
-    except Exception as e:
-        return False, f"Error adding item: {str(e)}"
+
+def _add_item(bind, name, quantity):
+    # Single statements keyed on the unique name index; the row count tells whether the item existed
+    insert = conflict_insert(bind)
+    if insert is not None:
+        inserted = db.session.execute(
+            insert(Inventory.__table__).values(name=name, quantity=quantity).on_conflict_do_nothing(),
+            bind_arguments={"bind": bind},
+        ).rowcount
+    else:
+        # Without ON CONFLICT, a savepoint keeps a duplicate from failing the other writes of the batch
+        try:
+            with db.session.begin_nested():
+                db.session.execute(
+                    Inventory.__table__.insert().values(name=name, quantity=quantity), bind_arguments={"bind": bind}
+                )
+            inserted = 1
+        except IntegrityError:
+            inserted = 0
+    if not inserted:
+        return False, "Item already exists"
+    return True, {"name": name, "quantity": quantity}
 
 
 def remove_item(name):
@@ -67,16 +122,14 @@ def remove_item(name):
       - result (dict or str): A dictionary containing the item's name if successful,
                               or an error message if there was an issue.
     """
-    try:
-        item = Inventory.query.filter_by(name=name).first()
-        if not item:
-            return False, "Item not found"
+    return _write(_remove_item, name, (), "Error removing item")
 
-        db.session.delete(item)
-        db.session.commit()
-        return True, {"name": name}
-    except Exception as e:
-        return False, f"Error removing item: {str(e)}"
+
+def _remove_item(bind, name):
+    table = Inventory.__table__
+    if not db.session.execute(table.delete().where(table.c.name == name), bind_arguments={"bind": bind}).rowcount:
+        return False, "Item not found"
+    return True, {"name": name}
 
 
 def update_quantity(name, quantity):
@@ -93,16 +146,327 @@ def update_quantity(name, quantity):
       - result (dict or str): A dictionary containing the item's name and updated quantity if successful,
                               or an error message if there was an issue.
     """
+    if not isinstance(quantity, int):
+        return False, "Quantity must be an integer"
+
+    return _write(_update_quantity, name, (quantity,), "Error updating quantity")
+
+
+def _update_quantity(bind, name, quantity):
+    table = Inventory.__table__
+    statement = table.update().where(table.c.name == name).values(quantity=quantity)
+    if not db.session.execute(statement, bind_arguments={"bind": bind}).rowcount:
+        return False, "Item not found"
+    return True, {"name": name, "quantity": quantity}
+
+
+def _write(fn, name, args, error_prefix):
+    """
+    Applies a mutation of the named item on its shard and commits it, through the shard's group-commit write
+    pipeline when WRITE_PIPELINE_ENABLED is set, otherwise in a transaction of its own.
+    """
+    app = current_app._get_current_object()
+    engines = shard_engines()
+    shard = shard_index(name, len(engines))
+    args = (engines[shard], name) + args
+    if app.config.get("WRITE_PIPELINE_ENABLED", True):
+        return _write_pipeline(app, shard).submit(fn, args, error_prefix)
+
     try:
-        if not isinstance(quantity, int):
-            return False, "Quantity must be an integer"
+        result = fn(*args)
+        db.session.commit()
+        _bump_write_generation()
+        return result
+    except Exception as e:
+        db.session.rollback()
+        return False, f"{error_prefix}: {str(e)}"
+
+
+def _write_pipeline(app, shard):
+    """Returns the write pipeline of a shard of the app, starting its collector thread on first use."""
+    pipelines = app.extensions.setdefault("write_pipelines", {})
+    pipeline = pipelines.get(shard)
+    if pipeline is None:
+        with _write_pipeline_lock:
+            pipeline = pipelines.get(shard)
+            if pipeline is None:
+                pipeline = pipelines[shard] = WritePipeline(
+                    app, app.config.get("WRITE_BATCH_MAX_OPS", 256), _bump_write_generation
+                )
+    return pipeline
+
 
-        item = Inventory.query.filter_by(name=name).first()
-        if not item:
-            return False, "Item not found"
+def search_items(query, mode="prefix", limit=20):
+    """
+    Searches inventory items by name using the database indexes.
+
+    Parameters:
+    - query (str): The text to search for.
+    - mode (str): "prefix" for a case-sensitive prefix match on the unique name index, or
+                  "fuzzy" for a typo-tolerant match on the trigram search index. Fuzzy queries shorter
+                  than three characters match as case-insensitive prefixes.
+    - limit (int): The maximum number of items to return.
 
-        item.quantity = quantity
+    Returns:
+    - A tuple (success, result):
+      - success (bool): True if the search was successful, False if an error occurred.
+      - result (list or str): A list of dictionaries containing item names and quantities ordered by relevance,
+                              or an error message if there was an issue.
+    Concurrent identical searches share a single query and the same result list.
+    """
+    return _reads.do(_read_key("search_items", query, mode, limit), lambda: _search_items(query, mode, limit))
+
+
+def _search_items(query, mode, limit):
+    try:
+        if mode not in SEARCH_MODES:
+            return False, "Invalid search mode"
+
+        query = (query or "").strip()
+        if not query:
+            return True, []
+
+        if mode == "prefix":
+            return True, _prefix_items([query], limit)
+        # Trigram matching needs at least three characters, shorter queries are served as prefixes in any case
+        if len(query) < 3:
+            return True, _prefix_items(_case_variants(query), limit)
+
+        rows = []
+        for engine in shard_engines():
+            rows.extend(_fuzzy_candidates(engine, query, limit))
+        rows.sort()
+        return True, [{"name": name, "quantity": quantity} for *_, name, quantity in rows[:limit]]
+    except Exception as e:
+        db.session.rollback()
+        return False, f"Error searching items: {str(e)}"
+
+
+def _prefix_items(prefixes, limit):
+    """
+    Fetches the items whose names start with any of the prefixes, with one range scan of the unique name index per
+    prefix, all in one statement per shard, ordered by name regardless of case.
+    """
+    # A textual statement skips building and cache-keying an expression tree per call, which costs more than the scans
+    statement = text(" UNION ALL ".join(
+        "SELECT * FROM (SELECT name, quantity FROM inventory "
+        f"WHERE name >= :prefix{i} AND name < :end{i} ORDER BY name LIMIT :limit)"
+        for i in range(len(prefixes))
+    ))
+    params = {"limit": limit}
+    for i, prefix in enumerate(prefixes):
+        params[f"prefix{i}"], params[f"end{i}"] = prefix, prefix + "\U0010ffff"
+    rows = []
+    for engine in shard_engines():
+        rows.extend(db.session.execute(statement, params, bind_arguments={"bind": engine}))
+    rows.sort(key=lambda row: (row[0].lower(), row[0]))
+    return [{"name": name, "quantity": quantity} for name, quantity in rows[:limit]]
+
+
+def _case_variants(text):
+    """Returns every upper and lower case spelling of a short text, e.g. "st", "sT", "St" and "ST"."""
+    return sorted({"".join(chars) for chars in product(*({char.lower(), char.upper()} for char in text))})
+
+
+def _trigrams(text):
+    lowered = text.lower()
+    return {lowered[i:i + 3] for i in range(len(lowered) - 2)}
+
+
+def _fuzzy_candidates(engine, query, limit):
+    """
+    Fetches up to limit items of a shard sharing the most trigrams with the query, best matches first, as
+    (-overlap, not containing the query, length difference, name, quantity) tuples that order the same across shards.
+    The candidates are bounded before they are ranked. The item named as the query and names containing the query
+    are looked up first; if there are too few, so are names containing every trigram of the query, then every trigram
+    found in the index, and only if those are still too few, names containing the query's rarest trigrams, of which
+    every name sharing at least FUZZY_MIN_OVERLAP of the trigrams holds one. All lookups together read at most FUZZY_MAX_CANDIDATES rows, and
+    trigrams are counted up to as many rows, so trigrams common to most names cost no more than rare ones.
+    Falls back to a substring scan when the database has no trigram search index.
+    """
+    if engine.dialect.name != "sqlite":
+        statement = select(Inventory.name, Inventory.quantity).where(Inventory.name.ilike(f"%{query}%")).limit(limit)
+        return [(0, False, abs(len(name) - len(query)), name, quantity)
+                for name, quantity in db.session.execute(statement, bind_arguments={"bind": engine})]
+
+    needle = query.lower()
+    trigrams = sorted(_trigrams(query))
+    min_overlap = max(1, math.ceil(len(trigrams) * FUZZY_MIN_OVERLAP))
+    # Names containing the query are the best matches, and usually enough while it is typed correctly
+    candidates = _index_rows(engine, _match_term(query), limit, name=query)
+    if len(candidates) < limit:
+        # Followed by the names containing every trigram of the query, apart or in another order
+        candidates.update(_index_rows(engine, " AND ".join(_match_term(trigram) for trigram in trigrams), limit))
+    if len(candidates) < limit:
+        # Trigrams missing from the index cannot be shared, so the next best matches hold every present one, and
+        # any match holds at least one of the rarest present ones
+        counts = _index_counts(engine, trigrams)
+        present = sorted((trigram for trigram in trigrams if counts[trigram]), key=lambda t: (counts[t], t))
+        if len(present) < min_overlap:
+            return []
+        if len(present) < len(trigrams):
+            candidates.update(_index_rows(engine, " AND ".join(_match_term(trigram) for trigram in present), limit))
+        for trigram in present[:len(present) - min_overlap + 1]:
+            if len(candidates) >= limit or len(candidates) >= FUZZY_MAX_CANDIDATES:
+                break
+            candidates.update(_index_rows(engine, _match_term(trigram), FUZZY_MAX_CANDIDATES - len(candidates)))
+
+    scored = []
+    for name, quantity in candidates.items():
+        lowered = name.lower()
+        overlap = sum(trigram in lowered for trigram in trigrams)
+        if overlap >= min_overlap:
+            scored.append((-overlap, needle not in lowered, abs(len(name) - len(query)), name, quantity))
+    scored.sort()
+    return scored[:limit]
+
+
+def _match_term(trigram):
+    return '"' + trigram.replace('"', '""') + '"'
+
+
+def _index_counts(engine, trigrams):
+    """Counts the rows of the search index containing each trigram, up to FUZZY_MAX_CANDIDATES, in one statement."""
+    trigrams = sorted(trigrams)
+    counts = db.session.execute(
+        text("SELECT " + ", ".join(
+            f"(SELECT COUNT(*) FROM (SELECT rowid FROM {SEARCH_INDEX_TABLE} WHERE {SEARCH_INDEX_TABLE} MATCH :t{i} "
+            "LIMIT :limit))"
+            for i in range(len(trigrams))
+        )),
+        {"limit": FUZZY_MAX_CANDIDATES, **{f"t{i}": _match_term(trigram) for i, trigram in enumerate(trigrams)}},
+        bind_arguments={"bind": engine},
+    ).one()
+    return dict(zip(trigrams, counts))
+
+
+def _index_rows(engine, match, limit, name=None):
+    """
+    Returns the names and quantities of up to limit items matching an FTS5 query, unranked, and of the item named
+    name if there is one, whichever rows the limit leaves out.
+    """
+    matches = f"SELECT rowid FROM {SEARCH_INDEX_TABLE} WHERE {SEARCH_INDEX_TABLE} MATCH :match LIMIT :limit"
+    if name is not None:
+        matches = f"SELECT id AS rowid FROM inventory WHERE name = :name UNION SELECT * FROM ({matches})"
+    result = db.session.execute(
+        text(f"SELECT inventory.name, inventory.quantity FROM ({matches}) AS matches "
+             "JOIN inventory ON inventory.id = matches.rowid"),
+        {"match": match, "limit": limit, "name": name},
+        bind_arguments={"bind": engine},
+    )
+    return {name: quantity for name, quantity in result}
+
+
+def import_items(rows, chunk_size=5000, progress=None):
+    """
+    Upserts inventory items from an iterable of rows, one transaction per chunk.
+    Existing items get the imported quantity; invalid rows are skipped and reported.
+    Rows are consumed incrementally, so memory use does not grow with the input size. Chunks after the first are
+    search indexed in one statement each rather than row by row, which is several times faster; the index stays in
+    sync with every committed chunk and with concurrent writes.
+    In a sharded inventory every shard collects its own chunks.
+
+    Parameters:
+    - rows (iterable): (line_number, name, quantity, error) tuples, as produced by utils.bulk_formats.parse_rows.
+    - chunk_size (int): The number of rows written per transaction.
+    - progress (callable): Optional function called with the number of rows imported so far after each chunk.
+
+    Returns:
+    - A tuple (success, result):
+      - success (bool): True if all rows were processed, False if a database error stopped the import.
+      - result (dict or str): A dictionary with the imported, skipped and chunk counts and the first errors if successful,
+                              or an error message, including the number of rows already committed, if there was an issue.
+    """
+    engines = shard_engines()
+    imported, skipped, chunks, errors = 0, 0, 0, []
+    shard_chunks = [[] for _ in engines]
+
+    def flush(shard):
+        nonlocal imported, chunks
+        chunk = shard_chunks[shard]
+        # The first chunk is indexed by the trigger, so that small imports do not change the schema
+        with deferred_search_index(engines[shard]) if chunks else nullcontext():
+            _upsert(engines[shard], chunk)
         db.session.commit()
-        return True, {"name": name, "quantity": quantity}
+        _bump_write_generation()
+        imported += len(chunk)
+        chunks += 1
+        chunk.clear()
+        if progress:
+            progress(imported)
+
+    try:
+        for line_number, name, quantity, error in rows:
+            error = error or _validate_import_row(name, quantity)
+            if error is None:
+                shard = shard_index(name, len(engines))
+                shard_chunks[shard].append({"name": name, "quantity": int(quantity)})
+                if len(shard_chunks[shard]) >= chunk_size:
+                    flush(shard)
+                continue
+
+            skipped += 1
+            if len(errors) < MAX_IMPORT_ERRORS:
+                errors.append({"line": line_number, "error": error})
+
+        for shard, chunk in enumerate(shard_chunks):
+            if chunk:
+                flush(shard)
+        return True, {"imported": imported, "skipped": skipped, "chunks": chunks, "errors": errors}
     except Exception as e:
-        return False, f"Error updating quantity: {str(e)}"
+        db.session.rollback()
+        return False, f"Error importing items after {imported} rows: {str(e)}"
+
+
+def _upsert(engine, rows):
+    """Inserts rows of name and quantity into a shard, setting the quantity of the items that already exist."""
+    table = Inventory.__table__
+    insert = conflict_insert(engine)
+    if insert is not None:
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.name], set_={"quantity": statement.excluded.quantity}
+        )
+        db.session.execute(statement, rows, bind_arguments={"bind": engine})
+        return
+
+    # Without ON CONFLICT, existing items are updated and the rest inserted, row by row
+    for row in rows:
+        statement = table.update().where(table.c.name == row["name"]).values(quantity=row["quantity"])
+        if not db.session.execute(statement, bind_arguments={"bind": engine}).rowcount:
+            db.session.execute(table.insert().values(**row), bind_arguments={"bind": engine})
+
+
+def _validate_import_row(name, quantity):
+    """Returns why an imported row is invalid, or None if it can be stored."""
+    if not name or not isinstance(name, str):
+        return "Missing name"
+    if len(name) > 255:
+        return "Name is too long"
+    if isinstance(quantity, str):
+        try:
+            quantity = int(quantity.strip())
+        except ValueError:
+            return "Quantity must be an integer"
+    if quantity is None:
+        return "Missing quantity"
+    if isinstance(quantity, bool) or not isinstance(quantity, int):
+        return "Quantity must be an integer"
+    return None
+
+
+def export_items(batch_size=5000):
+    """
+    Streams every inventory item from the database in id order, shard by shard.
+    Rows are fetched from the cursor in batches instead of being loaded all at once.
+
+    Parameters:
+    - batch_size (int): The number of rows fetched from the cursor at a time.
+
+    Returns:
+    - A generator of (name, quantity) tuples.
+    """
+    statement = select(Inventory.name, Inventory.quantity).order_by(Inventory.id).execution_options(yield_per=batch_size)
+    for engine in shard_engines():
+        for name, quantity in db.session.execute(statement, bind_arguments={"bind": engine}):
+            yield name, quantity
@@ -0,0 +1,157 @@
+import numpy as np
+
+TRANSFORM_DEFAULTS = {"position": 0.0, "rotation": 0.0, "scale": 1.0}  # Value of missing components
+AXES = ("x", "y", "z")
+
+
+def compute_matrices(positions, rotations, scales, local_bounds):
+    """
+    Computes world matrices, their inverses and world-space bounds for N objects in one vectorized pass.
+    Matrices are translation @ rotation @ scale, with rotations as XYZ Euler angles in radians (Blender's default
+    order), so that a local point p maps to matrix @ [p, 1]. Objects with a zero scale component have no inverse.
+
+    Parameters:
+    - positions (ndarray): Shape (N, 3) translations.
+    - rotations (ndarray): Shape (N, 3) Euler angles in radians.
+    - scales (ndarray): Shape (N, 3) scale factors.
+    - local_bounds (ndarray): Shape (2, 3) local min and max corners of the box bounded per object.
+
+    Returns:
+    - A dictionary with:
+      - matrices (ndarray): Shape (N, 4, 4) row-major world matrices.
+      - inverse_matrices (ndarray): Shape (N, 4, 4) inverses, NaN where the matrix is singular.
+      - bounds (ndarray): Shape (N, 2, 3) world-space axis-aligned min and max corners.
+      - combined_bounds (ndarray): Shape (2, 3) corners enclosing all objects, NaN when N is 0.
+    """
+    count = len(positions)
+    sx, sy, sz = np.sin(rotations).T
+    cx, cy, cz = np.cos(rotations).T
+
+    # Rz @ Ry @ Rx, expanded so that every element is one array expression over all objects
+    rotation = np.empty((count, 3, 3))
+    rotation[:, 0, 0] = cz * cy
+    rotation[:, 0, 1] = cz * sy * sx - sz * cx
+    rotation[:, 0, 2] = cz * sy * cx + sz * sx
+    rotation[:, 1, 0] = sz * cy
+    rotation[:, 1, 1] = sz * sy * sx + cz * cx
+    rotation[:, 1, 2] = sz * sy * cx - cz * sx
+    rotation[:, 2, 0] = -sy
+    rotation[:, 2, 1] = cy * sx
+    rotation[:, 2, 2] = cy * cx
+
+    linear = rotation * scales[:, None, :]  # Scale the columns
+    matrices = np.zeros((count, 4, 4))
+    matrices[:, :3, :3] = linear
+    matrices[:, :3, 3] = positions
+    matrices[:, 3, 3] = 1.0
+
+    # (T R S)^-1 = S^-1 R^T T^-1, which avoids a general matrix inversion per object
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inverse_linear = rotation.transpose(0, 2, 1) / scales[:, :, None]  # Scale the rows
+    inverse_linear[(scales == 0).any(axis=1)] = np.nan
+    inverse_matrices = np.zeros((count, 4, 4))
+    inverse_matrices[:, :3, :3] = inverse_linear
+    inverse_matrices[:, :3, 3] = -np.einsum("nij,nj->ni", inverse_linear, positions)
+    inverse_matrices[:, 3, 3] = 1.0
+
+    # The world box of a transformed local box is its transformed center plus |linear| times its half extents
+    center = (local_bounds[0] + local_bounds[1]) / 2
+    half_extent = (local_bounds[1] - local_bounds[0]) / 2
+    world_center = linear @ center + positions
+    world_half_extent = np.abs(linear) @ half_extent
+    bounds = np.stack([world_center - world_half_extent, world_center + world_half_extent], axis=1)
+
+    if count:
+        combined_bounds = np.stack([bounds[:, 0].min(axis=0), bounds[:, 1].max(axis=0)])
+    else:
+        combined_bounds = np.full((2, 3), np.nan)
+
+    return {
+        "matrices": matrices,
+        "inverse_matrices": inverse_matrices,
+        "bounds": bounds,
+        "combined_bounds": combined_bounds,
+    }
+
+
+def batch_matrices(data, default_bounds, max_objects):
+    """
+    Computes world matrices, inverse matrices and bounds for a batch of transforms.
+    Transforms are given either as "objects", a list of {"position", "rotation", "scale"} dictionaries with
+    x/y/z keys as sent by the plugin, or as "positions", "rotations" and "scales" lists of [x, y, z] triples.
+    Missing components default to no translation, no rotation and unit scale.
+
+    Parameters:
+    - data (dict): The request data, optionally with "local_bounds" as [[min x, y, z], [max x, y, z]].
+    - default_bounds (sequence): Local bounds used when the request gives none.
+    - max_objects (int): Largest accepted batch.
+
+    Returns:
+    - A tuple (success, result):
+      - success (bool): True if the batch was computed, False otherwise.
+      - result (dict or str): The count, matrices, inverse matrices (None where singular), per-object bounds and
+        combined bounds (None for an empty batch) if successful, or an error message if not.
+    """
+    if not isinstance(data, dict):
+        return False, "Request body must be a JSON object"
+
+    try:
+        if "objects" in data:
+            objects = data["objects"]
+            if not isinstance(objects, list) or not all(isinstance(obj, dict) for obj in objects):
+                return False, "Objects must be a list of transforms"
+            if len(objects) > max_objects:
+                return False, f"At most {max_objects} objects per batch"
+            components = {
+                component: _vectors([obj.get(component) for obj in objects], default)
+                for component, default in TRANSFORM_DEFAULTS.items()
+            }
+        else:
+            count = len(data.get("positions") or data.get("rotations") or data.get("scales") or ())
+            if count > max_objects:
+                return False, f"At most {max_objects} objects per batch"
+            components = {
+                component: _array(data.get(f"{component}s"), count, default)
+                for component, default in TRANSFORM_DEFAULTS.items()
+            }
+        local_bounds = np.asarray(data.get("local_bounds", default_bounds), dtype=float)
+    except (AttributeError, TypeError, ValueError) as e:
+        return False, f"Invalid transforms: {str(e)}"
+
+    if local_bounds.shape != (2, 3):
+        return False, "Local bounds must be [[min x, y, z], [max x, y, z]]"
+    if not all(np.isfinite(array).all() for array in [local_bounds, *components.values()]):
+        return False, "Transforms must be finite numbers"
+
+    result = compute_matrices(components["position"], components["rotation"], components["scale"], local_bounds)
+    inverse_matrices = result["inverse_matrices"].tolist()
+    singular = np.isnan(result["inverse_matrices"][:, 0, 0])
+    for index in np.flatnonzero(singular):
+        inverse_matrices[index] = None
+    combined = result["combined_bounds"]
+    return True, {
+        "count": len(inverse_matrices),
+        "matrices": result["matrices"].tolist(),
+        "inverse_matrices": inverse_matrices,
+        "bounds": result["bounds"].tolist(),
+        "combined_bounds": None if np.isnan(combined).any() else combined.tolist(),
+    }
+
+
+def _vectors(values, default):
+    # {"x", "y", "z"} dictionaries to an (N, 3) array, missing axes and components taking the default
+    flat = []
+    for value in values:
+        value = value or {}
+        flat.extend(value.get(axis, default) for axis in AXES)
+    return np.array(flat, dtype=float).reshape(len(values), 3)
+
+
+def _array(values, count, default):
+    # [x, y, z] triples to an (N, 3) array, the whole component taking the default when it is missing
+    if values is None:
+        return np.full((count, 3), default)
+    array = np.asarray(values, dtype=float)
+    if array.shape != (count, 3):
+        raise ValueError("positions, rotations and scales must be lists of the same number of [x, y, z] triples")
+    return array
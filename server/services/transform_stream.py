@@ -0,0 +1,188 @@
+"""
+Persistent TCP channel for streaming transform updates, e.g. per frame from the Blender plugin.
+
+Clients keep one connection open and send length-prefixed binary frames instead of an HTTP request per
+update. Every frame is a 4-byte big-endian body length followed by the body:
+
+    update frame (client -> server): type 1 (u8), sequence number (u32), then one record per object:
+        name length (u8), UTF-8 name, component mask (u8: 1 position, 2 rotation, 4 scale),
+        and x, y, z as float32 for every component in the mask, in that order
+    ack frame (server -> client): type 2 (u8), highest sequence number applied (u32),
+        number of object updates applied since the previous ack (u32)
+
+The server feeds the updates to the transform coalescer, like the HTTP transform routes, and answers with
+one ack per batch of frames read from the socket, so acks get rarer as the client sends faster.
+All integers and floats are in network byte order.
+"""
+import logging
+import socket
+import socketserver
+import struct
+import threading
+from services.transforms import submit_transforms
+from utils.metrics import TRANSFORM_STREAM_CONNECTIONS
+
+logger = logging.getLogger(__name__)
+
+FRAME_HEADER = struct.Struct("!I")
+UPDATE_HEADER = struct.Struct("!BI")
+ACK = struct.Struct("!BII")
+VECTOR = struct.Struct("!3f")
+FRAME_UPDATE = 1
+FRAME_ACK = 2
+COMPONENT_MASKS = (("position", 1), ("rotation", 2), ("scale", 4))
+AXES = ("x", "y", "z")
+
+
+def encode_updates(sequence, updates):
+    """
+    Encodes transform updates as one update frame, header included.
+
+    Parameters:
+    - sequence (int): The frame's sequence number.
+    - updates (list): (name, update) pairs, update mapping any of "position", "rotation" and "scale" to x/y/z
+      dictionaries.
+
+    Returns:
+    - The frame (bytes).
+    """
+    parts = [UPDATE_HEADER.pack(FRAME_UPDATE, sequence)]
+    for name, update in updates:
+        encoded = name.encode("utf-8")[:255]
+        mask = sum(bit for component, bit in COMPONENT_MASKS if component in update)
+        parts.append(bytes((len(encoded),)) + encoded + bytes((mask,)))
+        for component, bit in COMPONENT_MASKS:
+            if mask & bit:
+                parts.append(VECTOR.pack(*(update[component].get(axis, 0.0) for axis in AXES)))
+    body = b"".join(parts)
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+def decode_updates(body):
+    """
+    Decodes the body of an update frame.
+
+    Parameters:
+    - body (bytes): The frame body, without the length header.
+
+    Returns:
+    - A tuple (sequence, updates) with the frame's sequence number and its (name, update) pairs.
+
+    Raises:
+    - ValueError: If the body is not a well-formed update frame.
+    """
+    try:
+        frame_type, sequence = UPDATE_HEADER.unpack_from(body)
+        if frame_type != FRAME_UPDATE:
+            raise ValueError(f"Unexpected frame type {frame_type}")
+        updates = []
+        offset = UPDATE_HEADER.size
+        while offset < len(body):
+            length = body[offset]
+            name = body[offset + 1:offset + 1 + length].decode("utf-8")
+            mask = body[offset + 1 + length]
+            offset += 2 + length
+            update = {}
+            for component, bit in COMPONENT_MASKS:
+                if mask & bit:
+                    update[component] = dict(zip(AXES, VECTOR.unpack_from(body, offset)))
+                    offset += VECTOR.size
+            updates.append((name, update))
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise ValueError(f"Malformed update frame: {str(e)}")
+    return sequence, updates
+
+
+def encode_ack(sequence, count):
+    """Encodes an ack frame, header included, for updates applied up to the given sequence number."""
+    return FRAME_HEADER.pack(ACK.size) + ACK.pack(FRAME_ACK, sequence, count)
+
+
+class TransformStreamHandler(socketserver.BaseRequestHandler):
+    """
+    Serves one streaming connection: reads update frames until the client disconnects and acks each batch.
+    """
+    def handle(self):
+        self.server.connection_opened()
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        buffer = bytearray()
+        try:
+            while True:
+                chunk = self.request.recv(65536)
+                if not chunk:
+                    return
+                buffer += chunk
+
+                # Apply every complete frame received so far, then ack them together
+                sequence, applied = None, 0
+                while len(buffer) >= FRAME_HEADER.size:
+                    (length,) = FRAME_HEADER.unpack_from(buffer)
+                    if length > self.server.max_frame_bytes:
+                        logger.warning("Closing transform stream from %s: frame of %d bytes", self.client_address, length)
+                        return
+                    if len(buffer) < FRAME_HEADER.size + length:
+                        break
+                    body = bytes(buffer[FRAME_HEADER.size:FRAME_HEADER.size + length])
+                    del buffer[:FRAME_HEADER.size + length]
+                    sequence, updates = decode_updates(body)
+                    applied += submit_transforms(self.server.app, updates)
+
+                if sequence is not None:
+                    self.request.sendall(encode_ack(sequence, applied))
+        except ValueError as e:
+            logger.warning("Closing transform stream from %s: %s", self.client_address, e)
+        except OSError:
+            pass  # The client went away
+        finally:
+            self.server.connection_closed()
+
+
+class TransformStreamServer(socketserver.ThreadingTCPServer):
+    """
+    Threaded TCP server for the transform stream, one thread per connection.
+    Attributes:
+        app (Flask): The application whose transform coalescer receives the updates.
+        max_frame_bytes (int): Largest accepted frame body; larger frames close the connection.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, app, address, sock=None):
+        self.app = app
+        self.max_frame_bytes = app.config.get("TRANSFORM_STREAM_MAX_FRAME_BYTES", 1048576)
+        self._connections = 0
+        self._lock = threading.Lock()
+        super().__init__(address, TransformStreamHandler, bind_and_activate=sock is None)
+        if sock is not None:
+            self.socket.close()
+            self.socket = sock  # Listening socket opened by the parent of pre-forked workers
+
+    def connection_opened(self):
+        """Counts a new connection."""
+        with self._lock:
+            self._connections += 1
+            TRANSFORM_STREAM_CONNECTIONS.set(self._connections)
+
+    def connection_closed(self):
+        """Counts a closed connection."""
+        with self._lock:
+            self._connections -= 1
+            TRANSFORM_STREAM_CONNECTIONS.set(self._connections)
+
+
+def start_transform_stream(app, sock=None):
+    """
+    Serves the transform stream in a background thread.
+
+    Parameters:
+    - app (Flask): The application whose transforms are updated.
+    - sock (socket.socket, optional): An already listening socket to serve; by default a socket is bound to
+      TRANSFORM_STREAM_HOST and TRANSFORM_STREAM_PORT.
+
+    Returns:
+    - The running TransformStreamServer; call shutdown() to stop it.
+    """
+    address = (app.config.get("TRANSFORM_STREAM_HOST", "127.0.0.1"), app.config.get("TRANSFORM_STREAM_PORT", 5001))
+    server = TransformStreamServer(app, address, sock)
+    threading.Thread(target=server.serve_forever, name="transform-stream", daemon=True).start()
+    return server
@@ -0,0 +1,248 @@
+import json
+import logging
+import threading
+import time
+from flask import current_app
+from sqlalchemy import func, select
+from database import conflict_insert, db
+from models.transforms import Transform
+from utils.log import log_request
+from utils.metrics import TRANSFORMS_RECEIVED, TRANSFORMS_FLUSHED
+
+logger = logging.getLogger(__name__)
+
+TRANSFORM_FIELDS = ("position", "rotation", "scale")  # Components merged per object
+
+_coalescer_lock = threading.Lock()
+
+
+class TransformCoalescer:
+    """
+    Coalesces high-frequency transform updates per object.
+    Updates received within a tick are merged into one pending state per object, the latest value of each
+    component winning; every tick the pending states are handed to the downstream handler once per object,
+    so downstream load is bounded by the number of objects rather than by the clients' send rate.
+    Attributes:
+        tick_seconds (float): Length of the coalescing window.
+        handler (callable): Called with (name, state, route) for every object updated during a tick, route being
+            the route of the object's latest update.
+        on_flush (callable): Called without arguments after the objects of a tick were handled, or None.
+    """
+    def __init__(self, tick_seconds, handler, on_flush=None):
+        self.tick_seconds = tick_seconds
+        self.handler = handler
+        self.on_flush = on_flush
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, name, update, route="/transform"):
+        """
+        Merges an update into the pending state of an object.
+
+        Parameters:
+        - name (str): The object name.
+        - update (dict): The transform components received, e.g. {"position": {...}}.
+        - route (str): The route that received the update.
+
+        Returns:
+        - None.
+        """
+        self.submit_many([(name, update)], route)
+
+    def submit_many(self, updates, route="/transform"):
+        """
+        Merges a batch of updates into the pending states under a single lock acquisition.
+
+        Parameters:
+        - updates (list): (name, update) pairs.
+        - route (str): The route that received the updates.
+
+        Returns:
+        - None.
+        """
+        with self._lock:
+            for name, update in updates:
+                pending = self._pending.setdefault(name, [route, {}])
+                pending[0] = route
+                pending[1].update(update)
+            TRANSFORMS_RECEIVED.inc(amount=len(updates))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="transform-coalescer", daemon=True)
+                self._thread.start()
+
+    def flush(self):
+        """
+        Hands the pending state of every updated object to the handler and clears it.
+
+        Returns:
+        - The number of objects flushed.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for name, (route, state) in pending.items():
+            try:
+                self.handler(name, state, route)
+            except Exception:
+                logger.exception("Error handling transform of %s", name)
+        if pending and self.on_flush is not None:
+            try:
+                self.on_flush()
+            except Exception:
+                logger.exception("Error completing the transform tick")
+        TRANSFORMS_FLUSHED.inc(amount=len(pending))
+        return len(pending)
+
+    def _run(self):
+        while True:
+            time.sleep(self.tick_seconds)
+            self.flush()
+
+
+class TransformStore:
+    """
+    Latest known transform of every object, kept in the transforms table of the default database so that every
+    worker process serves the same state. The states delivered by the coalescer during a tick are written in one
+    transaction when the tick ends, each component overwriting only the component stored for the object.
+    """
+    def __init__(self, app):
+        self.app = app
+        self._updated = {}
+        self._lock = threading.Lock()
+
+    def apply(self, name, state, route):
+        """Records the coalesced components of an object and logs the update once, under the route it came from."""
+        with self._lock:
+            self._updated.setdefault(name, {}).update(state)
+        log_request(logger, route, {"name": name, **state})
+
+    def write(self):
+        """Writes the states recorded since the last write to the transforms table."""
+        with self._lock:
+            updated, self._updated = self._updated, {}
+        if not updated:
+            return
+
+        table = Transform.__table__
+        now = time.time()
+        rows = [
+            {"name": name, "updated": now, **{
+                field: json.dumps(state[field]) if field in state else None for field in TRANSFORM_FIELDS
+            }}
+            for name, state in updated.items()
+        ]
+        with self._engine().begin() as connection:
+            insert = conflict_insert(connection)
+            if insert is not None:
+                statement = insert(table)
+                statement = statement.on_conflict_do_update(index_elements=[table.c.name], set_={
+                    "updated": statement.excluded.updated,
+                    **{
+                        field: func.coalesce(statement.excluded[field], table.c[field])
+                        for field in TRANSFORM_FIELDS
+                    },
+                })
+                connection.execute(statement, rows)
+                return
+
+            # Without ON CONFLICT, existing objects are updated and the rest inserted, row by row
+            for row in rows:
+                values = {key: value for key, value in row.items() if value is not None}
+                if not connection.execute(table.update().where(table.c.name == row["name"]).values(**values)).rowcount:
+                    connection.execute(table.insert().values(**row))
+
+    def get_all(self):
+        """Returns the stored transforms keyed by object name."""
+        table = Transform.__table__
+        with self._engine().connect() as connection:
+            rows = connection.execute(select(table.c.name, *(table.c[field] for field in TRANSFORM_FIELDS)))
+            return {
+                row.name: {
+                    field: json.loads(getattr(row, field)) for field in TRANSFORM_FIELDS
+                    if getattr(row, field) is not None
+                }
+                for row in rows
+            }
+
+    def _engine(self):
+        with self.app.app_context():
+            return db.engine
+
+
+def submit_transform(data, route):
+    """
+    Queues a transform update for coalescing.
+    Updates without an object name, or without any transform component, cannot be merged per object: they are
+    only logged, at once, under the route that received them.
+
+    Parameters:
+    - data (dict): The request data: the object "name" and any of "position", "rotation" and "scale".
+    - route (str): The route that received the update, under which it is logged.
+
+    Returns:
+    - None.
+    """
+    name = data.get("name") if isinstance(data, dict) else None
+    update = {field: data[field] for field in TRANSFORM_FIELDS if data.get(field) is not None} if name else None
+    if not update:
+        log_request(logger, route, data)
+        return
+    _coalescer(current_app._get_current_object()).submit(str(name), update, route)
+
+
+def submit_transforms(app, updates):
+    """
+    Queues a batch of transform updates for coalescing outside of a request, e.g. from the transform stream.
+    As in submit_transform, updates without an object name or without any transform component are only logged.
+
+    Parameters:
+    - app (Flask): The application whose transforms are updated.
+    - updates (list): (name, update) pairs, update holding any of "position", "rotation" and "scale".
+
+    Returns:
+    - The number of updates queued (int).
+    """
+    queued = [(name, update) for name, update in updates if name and update]
+    if len(queued) < len(updates):
+        for name, update in updates:
+            if not (name and update):
+                log_request(logger, "/transform", {"name": name, **update})
+    if queued:
+        _coalescer(app).submit_many(queued)
+    return len(queued)
+
+
+def get_transforms():
+    """
+    Retrieves the latest coalesced transform of every object.
+
+    Parameters:
+    - None.
+
+    Returns:
+    - A tuple (success, result):
+      - success (bool): Always True.
+      - result (dict): Object names mapped to their latest position, rotation and scale.
+    """
+    return True, _store(current_app._get_current_object()).get_all()
+
+
+def _store(app):
+    with _coalescer_lock:
+        if "transform_store" not in app.extensions:
+            app.extensions["transform_store"] = TransformStore(app)
+        return app.extensions["transform_store"]
+
+
+def _coalescer(app):
+    """Returns the app's transform coalescer, created on first use."""
+    coalescer = app.extensions.get("transform_coalescer")
+    if coalescer is None:
+        store = _store(app)
+        with _coalescer_lock:
+            coalescer = app.extensions.get("transform_coalescer")
+            if coalescer is None:
+                coalescer = app.extensions["transform_coalescer"] = TransformCoalescer(
+                    app.config.get("TRANSFORM_TICK_MS", 50) / 1000, store.apply, store.write
+                )
+    return coalescer
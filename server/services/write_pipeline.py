@@ -0,0 +1,87 @@
+import queue
+import threading
+from concurrent.futures import Future
+from database import db
+
+
+class _Write:
+    """
+    A queued mutation and the future its caller waits on.
+    """
+    def __init__(self, fn, args, error_prefix):
+        self.fn = fn
+        self.args = args
+        self.error_prefix = error_prefix
+        self.future = Future()
+
+
+class WritePipeline:
+    """
+    Group-commits concurrent inventory mutations.
+    Callers enqueue a mutation and wait; a collector thread applies every mutation queued so far, up to max_ops,
+    in one transaction. A lone writer is committed at once, and batches form only from writes that queue up while
+    a commit is in flight, so a burst of writes costs one commit (and one fsync) per batch instead of one per write
+    without delaying writes that arrive alone. Each mutation still sees the effects of the ones before it and
+    returns its own result. If the batch fails to commit, its mutations are retried one transaction each so a
+    single failing write cannot fail its neighbours.
+    Attributes:
+        app (Flask): The application whose database the collector writes to.
+        max_ops (int): Maximum number of mutations per transaction.
+        on_commit (callable): Called after every committed transaction.
+    """
+    def __init__(self, app, max_ops, on_commit=None):
+        self.app = app
+        self.max_ops = max_ops
+        self.on_commit = on_commit
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="write-pipeline", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, args, error_prefix):
+        """
+        Queues a mutation and waits for the transaction that applies it to commit.
+
+        Parameters:
+        - fn (callable): Applies the mutation in the current session without committing and returns (success, result).
+        - args (tuple): Arguments passed to fn.
+        - error_prefix (str): Prefix of the error message returned if the mutation raises.
+
+        Returns:
+        - The (success, result) tuple returned by fn, or (False, error message) if it could not be committed.
+        """
+        write = _Write(fn, args, error_prefix)
+        self._queue.put(write)
+        return write.future.result()
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                batch = [self._queue.get()]
+                # Take what queued up during the previous commit, without waiting for more
+                while len(batch) < self.max_ops:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                try:
+                    self._apply(batch)
+                finally:
+                    db.session.remove()
+
+    def _apply(self, batch):
+        try:
+            results = [write.fn(*write.args) for write in batch]
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            if len(batch) > 1:
+                for write in batch:
+                    self._apply([write])  # Isolate the failing write
+                return
+            results = [(False, f"{batch[0].error_prefix}: {str(e)}")]
+        else:
+            if self.on_commit:
+                self.on_commit()
+
+        for write, result in zip(batch, results):
+            write.future.set_result(result)
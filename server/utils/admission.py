@@ -0,0 +1,128 @@
+import math
+import threading
+import time
+from flask import current_app, g, request
+from utils.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUED, ADMISSION_REJECTED_TOTAL
+from utils.responses import error_response
+
+
+class AdmissionGate:
+    """
+    Bounds the number of requests of a route group that run at once.
+    Requests beyond the concurrency limit wait in a bounded queue; requests that find the queue full,
+    or that wait longer than the timeout, are rejected instead of piling up.
+    Attributes:
+        group (str): Name of the route group, used as the metrics label.
+        limit (int): Maximum number of requests running at once.
+        queue_size (int): Maximum number of requests waiting for admission.
+        timeout (float): Maximum time in seconds a request waits for admission.
+    """
+    def __init__(self, group, limit, queue_size, timeout):
+        self.group = group
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.active = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """
+        Admits the calling request, waiting in the queue if the group is at its limit.
+
+        Returns:
+        - None if the request was admitted, otherwise the rejection reason ("queue_full" or "timeout").
+        """
+        with self._cond:
+            if self.active < self.limit and self.waiting == 0:
+                self.active += 1
+                self._publish()
+                return None
+
+            if self.waiting >= self.queue_size:
+                ADMISSION_REJECTED_TOTAL.inc(self.group, "queue_full")
+                return "queue_full"
+
+            self.waiting += 1
+            self._publish()
+            deadline = time.monotonic() + self.timeout
+            try:
+                while self.active >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        ADMISSION_REJECTED_TOTAL.inc(self.group, "timeout")
+                        self._cond.notify()  # Pass on a wakeup this request may have consumed
+                        return "timeout"
+                    self._cond.wait(remaining)
+                self.active += 1
+                return None
+            finally:
+                self.waiting -= 1
+                self._publish()
+
+    def release(self):
+        """Releases the slot of an admitted request and wakes the next waiting one."""
+        with self._cond:
+            self.active -= 1
+            self._publish()
+            self._cond.notify()
+
+    def retry_after(self, delay):
+        """
+        Estimates how many seconds a rejected client should wait before retrying.
+
+        Parameters:
+        - delay (float): The time one request occupies its slot, i.e. the simulated response delay.
+
+        Returns:
+        - The suggested wait in whole seconds, at least 1.
+        """
+        backlog = (self.active + self.waiting) / max(self.limit, 1)
+        return max(1, math.ceil(delay * backlog))
+
+    def _publish(self):
+        ADMISSION_IN_FLIGHT.set(self.active, self.group)
+        ADMISSION_QUEUED.set(self.waiting, self.group)
+
+
+def init_admission(app):
+    """
+    Installs admission control for the route groups configured in ADMISSION_ROUTE_GROUPS.
+    Each group gets its own gate sized by ADMISSION_LIMITS; routes outside the groups are not limited.
+
+    Parameters:
+    - app (Flask): The Flask application instance to protect.
+
+    Returns:
+    - None.
+    """
+    timeout = app.config.get("ADMISSION_QUEUE_TIMEOUT", 30)
+    app.extensions["admission"] = {
+        group: AdmissionGate(group, limit, queue_size, timeout)
+        for group, (limit, queue_size) in app.config.get("ADMISSION_LIMITS", {}).items()
+    }
+    app.before_request(_admit)
+    app.teardown_request(_release)
+
+
+def _admit():
+    rule = request.url_rule.rule if request.url_rule else None
+    group = current_app.config.get("ADMISSION_ROUTE_GROUPS", {}).get(rule)
+    gate = current_app.extensions["admission"].get(group)
+    if gate is None:
+        return None
+
+    reason = gate.acquire()
+    if reason is None:
+        g.admission_gate = gate
+        return None
+
+    response, status_code = error_response("Server is busy, retry later", 503)
+    response.headers["Retry-After"] = str(gate.retry_after(current_app.config.get("RESPONSE_DELAY_SECONDS", 10)))
+    return response, status_code
+
+
+def _release(exc):
+    gate = g.pop("admission_gate", None)
+    if gate is not None:
+        gate.release()
@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+
+BULK_FORMATS = ("csv", "ndjson")  # Supported bulk import and export formats
+BULK_MIMETYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def parse_rows(stream, fmt):
+    """
+    Parses inventory rows incrementally from a binary stream.
+
+    Parameters:
+    - stream (binary file-like): The CSV or NDJSON input. CSV input needs a header with name and quantity columns.
+    - fmt (str): "csv" or "ndjson".
+
+    Returns:
+    - A generator of (line_number, name, quantity, error) tuples. Values are returned as read and error is None,
+      except for rows that cannot be parsed at all, which yield (line_number, None, None, error_message).
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    return _parse_csv(text) if fmt == "csv" else _parse_ndjson(text)
+
+
+def _parse_csv(text):
+    reader = csv.DictReader(text)
+    for row in reader:
+        yield reader.line_num, row.get("name"), row.get("quantity"), None
+
+
+def _parse_ndjson(text):
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, None, f"Invalid JSON: {str(e)}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, None, "Row must be a JSON object"
+            continue
+        yield line_number, record.get("name"), record.get("quantity"), None
+
+
+def format_rows(rows, fmt):
+    """
+    Formats inventory rows incrementally.
+
+    Parameters:
+    - rows (iterable): (name, quantity) tuples.
+    - fmt (str): "csv" or "ndjson".
+
+    Returns:
+    - A generator of text chunks of many rows each, starting with the header line for CSV.
+    """
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(("name", "quantity"))
+        for name, quantity in rows:
+            writer.writerow((name, quantity))
+            if buffer.tell() >= 65536:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        lines = []
+        for name, quantity in rows:
+            lines.append(json.dumps({"name": name, "quantity": quantity}))
+            if len(lines) >= 1000:
+                yield "\n".join(lines) + "\n"
+                lines = []
+        if lines:
+            yield "\n".join(lines) + "\n"
@@ -1,5 +1,6 @@
 import time
-from flask import jsonify
+from flask import current_app
+from utils.metrics import record_delay
 
 def delayed_response(response):
     """
@@ -9,7 +10,11 @@ def delayed_response(response):
     - response (dict or Flask Response): The response to be returned after the delay.
     
     Returns:
-    - The same response passed to the function, after a 10-second delay.
+    - The same response passed to the function, after the configured delay (RESPONSE_DELAY_SECONDS, 10 seconds by default).
     """
-    time.sleep(10)  # Introduces a 10-second delay
+    delay = current_app.config.get("RESPONSE_DELAY_SECONDS", 10)
+    if delay > 0:
+        start = time.perf_counter()
+        time.sleep(delay)  # Introduces the simulated delay
+        record_delay(time.perf_counter() - start)  # Reported separately from handler time
     return response  # Returns the response after the delay
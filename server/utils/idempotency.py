@@ -0,0 +1,279 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from flask import Response, current_app, g, request
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from database import conflict_insert, db
+from models.idempotency import IdempotencyKey
+from utils.jobs import JOB_ENVIRON_KEY
+from utils.metrics import IDEMPOTENT_REPLAYS_TOTAL
+from utils.responses import error_response
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+# Response headers kept with a stored response; the rest are recomputed when it is replayed
+STORED_HEADERS = ("Content-Type", "Location", "Retry-After")
+
+
+class IdempotencyStore:
+    """
+    A bounded store of mutation responses keyed by client-supplied idempotency keys, kept in the idempotency_keys
+    table of the default database so that every worker process shares the claims and responses. A key is claimed
+    with an INSERT that does nothing on conflict, so exactly one request runs for it whichever worker receives it.
+    Sharing costs a first request with a key two short write transactions on the default database, one to claim
+    the key and one to store the response, which queue on its write lock with the other writes to shard 0.
+    Responses completed or replayed in this process are also kept in memory, so that a retry reaching the same
+    worker is replayed without touching the database.
+    Completed responses expire after ttl seconds and claims that never completed after claim_ttl seconds. Both
+    are deleted from the front of their time index every evict_seconds, in a transaction of their own, along with
+    the oldest completed responses when the store is full; keys whose first request is still running are not
+    evicted.
+    Attributes:
+        max_keys (int): Maximum number of keys kept, in the table and in memory.
+        ttl (float): Seconds a completed response is kept.
+        claim_ttl (float): Seconds after which a claim whose request never completed is released.
+        evict_seconds (float): Interval between two evictions of expired keys from the table.
+        poll_seconds (float): Interval at which waits check for responses stored by other worker processes.
+    """
+    def __init__(self, app, max_keys, ttl, claim_ttl, evict_seconds, poll_seconds):
+        self.app = app
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self.claim_ttl = claim_ttl
+        self.evict_seconds = evict_seconds
+        self.poll_seconds = poll_seconds
+        self._completed = threading.Condition()
+        self._generation = 0  # Bumped whenever a key of this process completes, to wake its waiters at once
+        self._local = OrderedDict()  # Key: (fingerprint, response, completion time), oldest completion first
+        self._lock = threading.Lock()
+        self._next_evict = 0.0
+
+    def cached(self, key):
+        """
+        Looks up a completed key in the responses kept in memory by this process.
+
+        Parameters:
+        - key (str): The idempotency key, scoped by method and route.
+
+        Returns:
+        - A tuple (fingerprint, response) with the stored response as (status_code, body, headers), or None if
+          the key did not complete in, or was not replayed by, this process.
+        """
+        now = time.monotonic()
+        with self._lock:
+            while self._local and now - next(iter(self._local.values()))[2] > self.ttl:
+                self._local.popitem(last=False)
+            entry = self._local.get(key)
+        return entry[:2] if entry is not None else None
+
+    def claim(self, key, fingerprint):
+        """
+        Claims a key for a request, or finds the request that claimed it first.
+
+        Parameters:
+        - key (str): The idempotency key, scoped by method and route.
+        - fingerprint (str): Hash of the request body, to detect a key reused for a different request.
+
+        Returns:
+        - A tuple (fingerprint, owner): the fingerprint of the request holding the key, and True if the caller
+          claimed it and must complete it.
+        """
+        if time.monotonic() >= self._next_evict:
+            self._evict()
+        while True:
+            if self._insert(key, fingerprint):
+                return fingerprint, True
+            table = IdempotencyKey.__table__
+            with self._engine().connect() as connection:
+                stored = connection.execute(select(table.c.fingerprint).where(table.c.key == key)).scalar()
+            if stored is not None:
+                return stored, False
+            # The claim was released in between, try to take it
+
+    def wait(self, key, fingerprint, timeout):
+        """
+        Waits for the response of a key claimed by another request, and keeps it in memory once found. Keys
+        completed in this process wake the wait at once; responses stored by other worker processes are noticed
+        by polling the table every poll_seconds.
+
+        Parameters:
+        - key (str): The idempotency key.
+        - fingerprint (str): Hash of the body of the request holding the key.
+        - timeout (float): Longest wait in seconds.
+
+        Returns:
+        - The stored response as (status_code, body, headers), or None if the request is still running or its
+          claim was released.
+        """
+        table = IdempotencyKey.__table__
+        query = select(table.c.status_code, table.c.body, table.c.headers).where(table.c.key == key)
+        end = time.monotonic() + timeout
+        while True:
+            generation = self._generation
+            with self._engine().connect() as connection:
+                row = connection.execute(query).first()
+            if row is None:
+                return None
+            if row.status_code is not None:
+                response = (row.status_code, row.body, json.loads(row.headers))
+                self._remember(key, fingerprint, response)
+                return response
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return None
+            with self._completed:
+                self._completed.wait_for(lambda: self._generation != generation, min(remaining, self.poll_seconds))
+
+    def complete(self, key, fingerprint, response):
+        """Stores the response of a claimed key, or releases the key when response is None, and wakes waiters."""
+        table = IdempotencyKey.__table__
+        with self._engine().begin() as connection:
+            if response is None:
+                # Let a retry run the request again
+                connection.execute(delete(table).where(table.c.key == key, table.c.completed.is_(None)))
+            else:
+                status_code, body, headers = response
+                connection.execute(update(table).where(table.c.key == key).values(
+                    status_code=status_code, body=body, headers=json.dumps(headers), completed=time.time()
+                ))
+        if response is not None:
+            self._remember(key, fingerprint, response)
+        with self._completed:
+            self._generation += 1
+            self._completed.notify_all()
+
+    def _remember(self, key, fingerprint, response):
+        with self._lock:
+            self._local[key] = (fingerprint, response, time.monotonic())
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_keys:
+                self._local.popitem(last=False)
+
+    def _insert(self, key, fingerprint):
+        # Returns whether the key was claimed
+        table = IdempotencyKey.__table__
+        now = time.time()
+        engine = self._engine()
+        insert = conflict_insert(engine)
+        row = {"key": key, "fingerprint": fingerprint, "created": now}
+        try:
+            with engine.begin() as connection:
+                if insert is not None:
+                    statement = insert(table).values(**row).on_conflict_do_nothing(index_elements=[table.c.key])
+                    return connection.execute(statement).rowcount == 1
+                connection.execute(table.insert().values(**row))
+                return True
+        except IntegrityError:
+            return False
+
+    def _evict(self):
+        # Runs at most once per evict_seconds in this process, outside of the claims' transactions
+        with self._lock:
+            if time.monotonic() < self._next_evict:
+                return
+            self._next_evict = time.monotonic() + self.evict_seconds
+        table = IdempotencyKey.__table__
+        now = time.time()
+        with self._engine().begin() as connection:
+            connection.execute(delete(table).where(table.c.completed < now - self.ttl))
+            connection.execute(
+                delete(table).where(table.c.completed.is_(None), table.c.created < now - self.claim_ttl)
+            )
+            count = connection.execute(select(func.count()).select_from(table)).scalar()
+            if count > self.max_keys:
+                oldest = (
+                    select(table.c.key).where(table.c.completed.is_not(None))
+                    .order_by(table.c.completed).limit(count - self.max_keys)
+                )
+                connection.execute(delete(table).where(table.c.key.in_(oldest)))
+
+    def _engine(self):
+        with self.app.app_context():
+            return db.engine
+
+
+def init_idempotency(app):
+    """
+    Lets clients retry the routes listed in IDEMPOTENCY_ROUTES safely by sending an Idempotency-Key header.
+    The response of the first request with a key is stored, and later requests with the same key, method and route
+    get it back at once, marked with an Idempotent-Replayed header, without running the handler or its delay again.
+    A request arriving while the first one is still running waits for its response. Reusing a key for a different
+    body is rejected with 422. Keys and responses are shared by all worker processes through the database.
+    Registered before job mode, so that a retried async request gets its original job.
+
+    Parameters:
+    - app (Flask): The Flask application instance.
+
+    Returns:
+    - None.
+    """
+    app.extensions["idempotency"] = IdempotencyStore(
+        app,
+        app.config.get("IDEMPOTENCY_MAX_KEYS", 10000),
+        app.config.get("IDEMPOTENCY_TTL_SECONDS", 3600),
+        app.config.get("IDEMPOTENCY_CLAIM_TTL_SECONDS", 600),
+        app.config.get("IDEMPOTENCY_EVICT_SECONDS", 60),
+        app.config.get("IDEMPOTENCY_POLL_SECONDS", 0.05),
+    )
+    app.before_request(_replay_or_claim)
+    app.after_request(_store_response)
+    app.teardown_request(_release)
+
+
+def _replay_or_claim():
+    client_key = request.headers.get(IDEMPOTENCY_HEADER)
+    rule = request.url_rule.rule if request.url_rule else None
+    if not client_key or request.environ.get(JOB_ENVIRON_KEY):
+        return None
+    if rule not in current_app.config.get("IDEMPOTENCY_ROUTES", ()):
+        return None
+
+    store = current_app.extensions["idempotency"]
+    key = hashlib.sha256(json.dumps([client_key, request.method, rule]).encode("utf-8")).hexdigest()
+    fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+    claimed_fingerprint, stored = store.cached(key) or (None, None)
+    if stored is None:
+        claimed_fingerprint, owner = store.claim(key, fingerprint)
+        if owner:
+            g.idempotency = (store, key, fingerprint)
+            return None
+
+    if claimed_fingerprint != fingerprint:
+        return error_response(f"{IDEMPOTENCY_HEADER} was already used for a different request", 422)
+    if stored is None:
+        stored = store.wait(key, claimed_fingerprint, current_app.config.get("IDEMPOTENCY_WAIT_SECONDS", 30))
+    if stored is None:
+        response, status_code = error_response(f"A request with this {IDEMPOTENCY_HEADER} is still in progress", 409)
+        response.headers["Retry-After"] = "1"
+        return response, status_code
+
+    status_code, body, headers = stored
+    IDEMPOTENT_REPLAYS_TOTAL.inc(rule)
+    response = Response(body, status=status_code, headers=headers)
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+def _store_response(response):
+    claim = g.pop("idempotency", None)
+    if claim is None:
+        return response
+
+    store, key, fingerprint = claim
+    if response.status_code >= 500 or response.is_streamed:
+        store.complete(key, fingerprint, None)  # Server errors are not final, a retry runs the request again
+        return response
+    headers = [(name, value) for name, value in response.headers.items() if name in STORED_HEADERS]
+    store.complete(key, fingerprint, (response.status_code, response.get_data(), headers))
+    return response
+
+
+def _release(exc):
+    # The handler raised before a response was stored
+    claim = g.pop("idempotency", None)
+    if claim is not None:
+        store, key, fingerprint = claim
+        store.complete(key, fingerprint, None)
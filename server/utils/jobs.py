@@ -0,0 +1,269 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, request
+from sqlalchemy import delete, func, insert, or_, select, update
+from werkzeug.test import EnvironBuilder
+from database import db
+from models.jobs import Job
+from utils.responses import success_response, error_response
+
+logger = logging.getLogger(__name__)
+
+# Marks requests replayed by a job worker so they are executed instead of being queued again
+JOB_ENVIRON_KEY = "inventory.job_id"
+
+# Outcome of a job left pending or running past its TTL, e.g. because the worker running it was killed
+ABANDONED_JOB = {"status": "failed", "status_code": 500, "result": {"error": "Job was abandoned by its worker"}}
+
+
+class JobRegistry:
+    """
+    A bounded registry of jobs, stored in the jobs table of the default database so that a job accepted by one
+    worker process can be polled through any other. Finished jobs expire after ttl seconds and are deleted from
+    the front of the index on their finish time, and the oldest finished jobs are evicted the same way when the
+    registry is full; when every slot holds an unfinished job, new jobs are refused. Jobs still unfinished
+    pending_ttl seconds after they were accepted are failed as abandoned, so that jobs of a killed worker neither
+    keep their slot nor keep their pollers waiting.
+    Attributes:
+        max_jobs (int): Maximum number of jobs kept.
+        ttl (float): Seconds a finished job's result is kept.
+        pending_ttl (float): Seconds after which a job that has not finished is failed as abandoned.
+        poll_seconds (float): Interval at which waits check for jobs finished by other worker processes.
+    """
+    def __init__(self, app, max_jobs, ttl, pending_ttl, poll_seconds):
+        self.app = app
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.pending_ttl = pending_ttl
+        self.poll_seconds = poll_seconds
+        self._finished = threading.Condition()
+        self._generation = 0  # Bumped whenever a job of this process finishes, to wake its waiters at once
+
+    def add(self, method, path):
+        """
+        Registers a new pending job.
+
+        Parameters:
+        - method (str): HTTP method of the queued request.
+        - path (str): Path and query string of the queued request.
+
+        Returns:
+        - The id (str) of the new job, or None if the registry is full of unfinished jobs.
+        """
+        jobs = Job.__table__
+        now = time.time()
+        with self._engine().begin() as connection:
+            connection.execute(
+                update(jobs).where(jobs.c.finished.is_(None), jobs.c.created < now - self.pending_ttl).values(
+                    finished=jobs.c.created + self.pending_ttl,
+                    status=ABANDONED_JOB["status"],
+                    status_code=ABANDONED_JOB["status_code"],
+                    result=json.dumps(ABANDONED_JOB["result"]),
+                )
+            )
+            connection.execute(delete(jobs).where(jobs.c.finished < now - self.ttl))
+            count = connection.execute(select(func.count()).select_from(jobs)).scalar()
+            if count >= self.max_jobs:
+                oldest = (
+                    select(jobs.c.id).where(jobs.c.finished.is_not(None))
+                    .order_by(jobs.c.finished).limit(count - self.max_jobs + 1)
+                )
+                if count - connection.execute(delete(jobs).where(jobs.c.id.in_(oldest))).rowcount >= self.max_jobs:
+                    return None
+            job_id = uuid.uuid4().hex
+            connection.execute(
+                insert(jobs).values(id=job_id, method=method, path=path, status="pending", created=now)
+            )
+        return job_id
+
+    def start(self, job_id):
+        """Marks a job as running."""
+        jobs = Job.__table__
+        with self._engine().begin() as connection:
+            connection.execute(update(jobs).where(jobs.c.id == job_id).values(status="running"))
+
+    def finish(self, job_id, status, status_code, result):
+        """
+        Stores the outcome of a job and wakes the requests of this process waiting for it.
+
+        Parameters:
+        - job_id (str): The job's id.
+        - status (str): "done" or "failed".
+        - status_code (int): HTTP status code of the executed request.
+        - result (any): JSON body of the executed request.
+
+        Returns:
+        - None.
+        """
+        jobs = Job.__table__
+        with self._engine().begin() as connection:
+            connection.execute(
+                update(jobs).where(jobs.c.id == job_id).values(
+                    status=status, status_code=status_code, result=json.dumps(result), finished=time.time()
+                )
+            )
+        with self._finished:
+            self._generation += 1
+            self._finished.notify_all()
+
+    def get_many(self, job_ids):
+        """
+        Looks up several jobs with one query.
+
+        Parameters:
+        - job_ids (list): The ids to look up.
+
+        Returns:
+        - A dict mapping each id to the job's public state (dict), or None if it is unknown or expired.
+        """
+        jobs = Job.__table__
+        now = time.time()
+        query = select(jobs).where(
+            jobs.c.id.in_(job_ids), or_(jobs.c.finished.is_(None), jobs.c.finished >= now - self.ttl)
+        )
+        found = {}
+        with self._engine().connect() as connection:
+            for row in connection.execute(query):
+                job = found[row.id] = _job_dict(row)
+                if row.finished is None and row.created < now - self.pending_ttl:
+                    # Abandoned by its worker: reported the way add() stores it
+                    job.update(ABANDONED_JOB, finished=row.created + self.pending_ttl)
+        return {job_id: found.get(job_id) for job_id in job_ids}
+
+    def wait(self, job_ids, timeout):
+        """
+        Waits until none of the given jobs is pending or running, or until timeout seconds have passed.
+        Jobs finished in this process wake the wait at once; jobs run by other worker processes are noticed by
+        polling the table every poll_seconds.
+
+        Parameters:
+        - job_ids (list): The ids to wait for.
+        - timeout (float): Longest wait in seconds; 0 looks the jobs up once.
+
+        Returns:
+        - The jobs' state, as returned by get_many().
+        """
+        end = time.monotonic() + timeout
+        while True:
+            generation = self._generation
+            jobs = self.get_many(job_ids)
+            remaining = end - time.monotonic()
+            if remaining <= 0 or not any(job and job["status"] in ("pending", "running") for job in jobs.values()):
+                return jobs
+            with self._finished:
+                self._finished.wait_for(
+                    lambda: self._generation != generation, min(remaining, self.poll_seconds)
+                )
+
+    def _engine(self):
+        with self.app.app_context():
+            return db.engine
+
+
+def _job_dict(row):
+    """Returns the public state of a job row."""
+    return {
+        "id": row.id,
+        "method": row.method,
+        "path": row.path,
+        "status": row.status,
+        "status_code": row.status_code,
+        "result": json.loads(row.result) if row.result is not None else None,
+        "created": row.created,
+        "finished": row.finished,
+    }
+
+
+def init_jobs(app):
+    """
+    Lets clients run the routes listed in JOB_ROUTES as jobs by sending a "Prefer: respond-async" header.
+    Such requests are answered at once with 202 Accepted and a job id, and executed on a pool of JOB_WORKERS
+    threads; the result is fetched from /jobs/<id>. Registered before admission control, so accepted requests
+    only take a slot once they run.
+
+    Parameters:
+    - app (Flask): The Flask application instance.
+
+    Returns:
+    - None.
+    """
+    app.extensions["jobs"] = {
+        "registry": JobRegistry(
+            app,
+            app.config.get("JOB_MAX_JOBS", 10000),
+            app.config.get("JOB_TTL_SECONDS", 300),
+            app.config.get("JOB_PENDING_TTL_SECONDS", 600),
+            app.config.get("JOB_POLL_SECONDS", 0.05),
+        ),
+        "executor": None,
+        "lock": threading.Lock(),
+    }
+    app.before_request(_accept_job)
+
+
+def job_registry():
+    """Returns the job registry of the current app."""
+    return current_app.extensions["jobs"]["registry"]
+
+
+def _executor(app):
+    # Created on first use, so that forked worker processes start their own threads
+    jobs = app.extensions["jobs"]
+    with jobs["lock"]:
+        if jobs["executor"] is None:
+            jobs["executor"] = ThreadPoolExecutor(app.config.get("JOB_WORKERS", 32), thread_name_prefix="job")
+        return jobs["executor"]
+
+
+def _accept_job():
+    if request.environ.get(JOB_ENVIRON_KEY) or "respond-async" not in request.headers.get("Prefer", ""):
+        return None
+    rule = request.url_rule.rule if request.url_rule else None
+    if rule not in current_app.config.get("JOB_ROUTES", ()):
+        return None
+
+    app = current_app._get_current_object()
+    job_id = job_registry().add(request.method, request.full_path.rstrip("?"))
+    if job_id is None:
+        response, status_code = error_response("Too many pending jobs, retry later", 503)
+        response.headers["Retry-After"] = str(max(1, int(app.config.get("RESPONSE_DELAY_SECONDS", 10))))
+        return response, status_code
+
+    # The job result is stored decoded, so the replayed request asks for an uncompressed body
+    headers = [
+        (key, value) for key, value in request.headers.items()
+        if key.lower() not in ("prefer", "content-length", "accept-encoding")
+    ]
+    builder = EnvironBuilder(
+        path=request.path,
+        method=request.method,
+        query_string=request.query_string,
+        headers=headers,
+        data=request.get_data(),
+    )
+    environ = builder.get_environ()
+    environ[JOB_ENVIRON_KEY] = job_id
+    _executor(app).submit(_run_job, app, job_id, environ)
+
+    response, status_code = success_response("Job accepted", {"job_id": job_id, "status_url": f"/jobs/{job_id}"}, 202)
+    response.headers["Location"] = f"/jobs/{job_id}"
+    return response, status_code
+
+
+def _run_job(app, job_id, environ):
+    registry = app.extensions["jobs"]["registry"]
+    try:
+        registry.start(job_id)
+        with app.request_context(environ):
+            response = app.make_response(app.full_dispatch_request())
+        outcome = ("done", response.status_code, response.get_json(silent=True))
+    except Exception as e:
+        outcome = ("failed", 500, {"error": f"Job failed: {str(e)}"})
+    try:
+        registry.finish(job_id, *outcome)
+    except Exception:
+        logger.exception("Could not store the result of job %s", job_id)
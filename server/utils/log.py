@@ -0,0 +1,193 @@
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+_listener = None
+_settings = None  # The LOG_* settings the running listener was configured with
+
+
+def _reset_after_fork():
+    # The listener thread does not survive a fork, so forked workers configure their own pipeline
+    global _listener, _settings
+    _listener, _settings = None, None
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()  # Flush pending records on shutdown
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+atexit.register(_stop_listener)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats log records as single-line JSON objects.
+    Request payloads attached to a record are serialized here, on the listener thread, and truncated to
+    max_payload_chars; serialization stops at the limit, so large payloads are never encoded in full.
+    """
+    def __init__(self, max_payload_chars=1024):
+        super().__init__()
+        self.max_payload_chars = max_payload_chars
+        self._encoder = json.JSONEncoder(default=str)
+
+    def format(self, record):
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        route = getattr(record, "route", None)
+        if route:
+            entry["route"] = route
+        if hasattr(record, "payload"):
+            payload, truncated = self._encode_payload(record.payload)
+            if truncated:
+                entry["payload"] = payload
+                entry["payload_truncated"] = True
+            else:
+                entry["payload"] = record.payload
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, default=str)
+
+    def _encode_payload(self, payload):
+        # The encoder yields the JSON text piece by piece, so encoding stops once the limit is passed
+        parts, size = [], 0
+        for part in self._encoder.iterencode(payload):
+            parts.append(part)
+            size += len(part)
+            if size > self.max_payload_chars:
+                return "".join(parts)[:self.max_payload_chars], True
+        return "".join(parts), False
+
+
+class RouteSampler(logging.Filter):
+    """
+    Keeps a configured fraction of the INFO records logged for high-volume routes.
+    Warnings, errors and records without a route are always kept.
+    """
+    def __init__(self, sample_rates):
+        super().__init__()
+        self.sample_rates = sample_rates
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.sample_rates.get(getattr(record, "route", None), 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class _MessageFormatter(logging.Formatter):
+    """
+    Formats the message of a record, and its exception as text, leaving the stack and payload to JsonFormatter.
+    """
+    def format(self, record):
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        return record.message
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread without blocking, and without serializing their payloads.
+    Records are dropped, and counted, when the queue is full.
+    """
+    dropped = 0
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.setFormatter(_MessageFormatter())
+
+    def prepare(self, record):
+        # The base class merges the arguments into the message and drops the exception, whose traceback holds live
+        # frames, on the logging thread. Its text and the stack text, both plain strings, are carried over, and the
+        # payload is copied so that the caller changing its data after logging does not race with its serialization
+        prepared = super().prepare(record)
+        prepared.exc_text = record.exc_text
+        prepared.stack_info = record.stack_info
+        if hasattr(record, "payload"):
+            prepared.payload = copy.deepcopy(record.payload)
+        return prepared
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
+
+
+def configure_logging(app):
+    """
+    Routes all logging through a bounded queue drained by a background listener thread
+    that writes structured JSON records to stderr.
+    Logging is set up once per process: a later call with the same LOG_* settings keeps the running pipeline, and one
+    with different settings, e.g. from another app, replaces it, flushing the records queued so far.
+
+    Parameters:
+    - app (Flask): The Flask application whose configuration provides LOG_LEVEL, LOG_QUEUE_SIZE,
+                   LOG_PAYLOAD_MAX_CHARS and LOG_SAMPLE_RATES.
+
+    Returns:
+    - None.
+    """
+    global _listener, _settings
+
+    settings = (
+        app.config.get("LOG_LEVEL", "INFO"),
+        app.config.get("LOG_QUEUE_SIZE", 10000),
+        app.config.get("LOG_PAYLOAD_MAX_CHARS", 1024),
+        dict(app.config.get("LOG_SAMPLE_RATES", {})),
+    )
+    if _listener is not None and settings == _settings:
+        return
+    level, queue_size, max_payload_chars, sample_rates = settings
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter(max_payload_chars))
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(RouteSampler(sample_rates))
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+
+    previous, _listener, _settings = _listener, listener, settings
+    if previous is not None:
+        previous.stop()  # Writes what the replaced pipeline still holds
+        logging.getLogger(__name__).info("Logging reconfigured")
+
+
+def log_request(logger, route, payload):
+    """
+    Logs a received request with its payload attached as a structured field.
+    The payload is not formatted on the calling thread.
+
+    Parameters:
+    - logger (logging.Logger): The logger of the calling route module.
+    - route (str): The route that received the request.
+    - payload (any): The JSON-serializable request data.
+
+    Returns:
+    - None.
+    """
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Received request at %s", route, extra={"route": route, "payload": payload})
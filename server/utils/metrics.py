@@ -0,0 +1,287 @@
+import threading
+import time
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Histogram bucket upper bounds in seconds, wide enough to cover the simulated response delay
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0)
+
+
+class Counter:
+    """
+    A monotonically increasing value per label set.
+    Attributes:
+        name (str): Metric name.
+        help (str): Description shown in the exposition output.
+        labelnames (tuple): Names of the labels identifying each series.
+    """
+    def __init__(self, name, help, labelnames):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        """Adds amount to the series identified by labels."""
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        """Returns the metric in Prometheus text format as a list of lines."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Gauge:
+    """
+    A value that can go up and down per label set.
+    Attributes:
+        name (str): Metric name.
+        help (str): Description shown in the exposition output.
+        labelnames (tuple): Names of the labels identifying each series.
+    """
+    def __init__(self, name, help, labelnames):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, *labels):
+        """Sets the series identified by labels to value."""
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self):
+        """Returns the metric in Prometheus text format as a list of lines."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    """
+    A distribution of observed values per label set, counted into cumulative buckets.
+    Attributes:
+        name (str): Metric name.
+        help (str): Description shown in the exposition output.
+        labelnames (tuple): Names of the labels identifying each series.
+        buckets (tuple): Sorted bucket upper bounds.
+    """
+    def __init__(self, name, help, labelnames, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        """Records value in the series identified by labels."""
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts followed by the running sum and count
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        """Returns the metric in Prometheus text format as a list of lines."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    bucket_labels = _format_labels(self.labelnames + ("le",), labels + (repr(bound),))
+                    lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+                inf_labels = _format_labels(self.labelnames + ("le",), labels + ("+Inf",))
+                lines.append(f"{self.name}_bucket{inf_labels} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+
+def _format_labels(names, values):
+    """Formats label names and values as a Prometheus label set."""
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+REQUESTS_TOTAL = Counter(
+    "http_requests_total", "Total HTTP requests by endpoint, method and status code.", ("endpoint", "method", "status")
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Total time spent serving a request, including the simulated delay.", ("endpoint",)
+)
+REQUEST_DELAY = Histogram(
+    "http_request_delay_seconds", "Time a request spent in the simulated response delay.", ("endpoint",)
+)
+REQUEST_HANDLER = Histogram(
+    "http_request_handler_seconds", "Time a request spent in real handler work, excluding the simulated delay.", ("endpoint",)
+)
+DB_STATEMENTS_TOTAL = Counter(
+    "db_statements_total", "Total SQL statements executed by statement type.", ("operation",)
+)
+DB_STATEMENT_DURATION = Histogram(
+    "db_statement_duration_seconds", "Time spent executing SQL statements by statement type.", ("operation",)
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight", "Requests currently admitted per route group.", ("group",)
+)
+ADMISSION_QUEUED = Gauge(
+    "admission_queued", "Requests currently waiting for admission per route group.", ("group",)
+)
+ADMISSION_REJECTED_TOTAL = Counter(
+    "admission_rejected_total", "Requests rejected by admission control per route group and reason.", ("group", "reason")
+)
+SCHEDULER_QUEUED = Gauge(
+    "scheduler_queued", "Requests waiting for a scheduler slot per priority class.", ("priority",)
+)
+SCHEDULER_WAIT = Histogram(
+    "scheduler_wait_seconds", "Time requests waited for a scheduler slot per priority class.", ("priority",)
+)
+TRANSFORMS_RECEIVED = Counter(
+    "transforms_received_total", "Transform updates received from clients.", ()
+)
+TRANSFORMS_FLUSHED = Counter(
+    "transforms_flushed_total", "Coalesced per-object transform states handed downstream.", ()
+)
+TRANSFORM_STREAM_CONNECTIONS = Gauge(
+    "transform_stream_connections", "Open transform stream connections.", ()
+)
+IDEMPOTENT_REPLAYS_TOTAL = Counter(
+    "idempotent_replays_total", "Mutations answered from the idempotency store instead of being run again.", ("endpoint",)
+)
+
+METRICS = (
+    REQUESTS_TOTAL,
+    REQUEST_DURATION,
+    REQUEST_DELAY,
+    REQUEST_HANDLER,
+    DB_STATEMENTS_TOTAL,
+    DB_STATEMENT_DURATION,
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUED,
+    ADMISSION_REJECTED_TOTAL,
+    SCHEDULER_QUEUED,
+    SCHEDULER_WAIT,
+    TRANSFORMS_RECEIVED,
+    TRANSFORMS_FLUSHED,
+    TRANSFORM_STREAM_CONNECTIONS,
+    IDEMPOTENT_REPLAYS_TOTAL,
+)
+
+_engine_events_registered = False
+
+
+def init_metrics(app):
+    """
+    Installs the request hooks and SQL engine events that feed the metrics.
+    Requests are recorded when they are torn down, so that requests whose handler raised are counted as 500s.
+
+    Parameters:
+    - app (Flask): The Flask application instance to instrument.
+
+    Returns:
+    - None.
+    """
+    global _engine_events_registered
+
+    app.before_request(_start_request_timer)
+    app.after_request(_note_status)
+    app.teardown_request(_record_request)
+
+    if not _engine_events_registered:
+        # Listening on the Engine class covers every engine the process creates
+        event.listen(Engine, "before_cursor_execute", _start_statement_timer)
+        event.listen(Engine, "after_cursor_execute", _record_statement)
+        _engine_events_registered = True
+
+
+def record_delay(seconds):
+    """
+    Adds simulated delay time to the current request so it can be reported apart from handler time.
+
+    Parameters:
+    - seconds (float): The time spent in the simulated delay.
+
+    Returns:
+    - None.
+    """
+    g.metrics_delay = g.get("metrics_delay", 0.0) + seconds
+
+
+def render_metrics():
+    """
+    Renders every metric in the Prometheus text exposition format.
+
+    Parameters:
+    - None.
+
+    Returns:
+    - The exposition text (str).
+    """
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _start_request_timer():
+    g.metrics_start = time.perf_counter()
+
+
+def _note_status(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+def _record_request(exc):
+    start = g.pop("metrics_start", None)
+    if start is None:
+        return
+
+    elapsed = time.perf_counter() - start
+    delay = g.get("metrics_delay", 0.0)
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    status = g.get("metrics_status", 500)  # No response was made when the handler's error propagated
+
+    REQUESTS_TOTAL.inc(endpoint, request.method, str(status))
+    REQUEST_DURATION.observe(elapsed, endpoint)
+    REQUEST_DELAY.observe(delay, endpoint)
+    REQUEST_HANDLER.observe(max(elapsed - delay, 0.0), endpoint)
+
+
+def _start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the statement's execution context, which a failed statement discards along with its start time
+    if context is not None:
+        context.metrics_statement_start = time.perf_counter()
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "metrics_statement_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+    DB_STATEMENTS_TOTAL.inc(operation)
+    DB_STATEMENT_DURATION.observe(elapsed, operation)
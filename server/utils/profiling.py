@@ -0,0 +1,197 @@
+import cProfile
+import os
+import random
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import deque
+from flask import current_app, g, request
+
+# tracemalloc traces the whole process, so only one measurement runs at a time
+_memory_lock = threading.Lock()
+
+
+def init_profiling(app):
+    """
+    Installs the request hooks that profile selected requests, with cProfile when PROFILING_ENABLED is set and
+    with tracemalloc when MEMORY_PROFILING_ENABLED is set.
+    Nothing is installed when profiling is disabled, so requests pay no overhead.
+
+    Parameters:
+    - app (Flask): The Flask application instance to profile.
+
+    Returns:
+    - None.
+    """
+    if app.config.get("MEMORY_PROFILING_ENABLED"):
+        app.extensions["memory_profiles"] = deque(maxlen=app.config.get("MEMORY_PROFILING_MAX_REPORTS", 100))
+        app.before_request(_start_memory_profile)
+        app.after_request(_stop_memory_profile)
+        app.teardown_request(_abort_memory_profile)
+
+    if not app.config.get("PROFILING_ENABLED"):
+        return
+
+    os.makedirs(app.config["PROFILING_DIR"], exist_ok=True)
+    app.before_request(_start_profile)
+    app.after_request(_stop_profile)
+    app.teardown_request(_abort_profile)
+
+
+def list_profiles(directory):
+    """
+    Lists the stored profiles, newest first.
+
+    Parameters:
+    - directory (str): The directory holding the profiles.
+
+    Returns:
+    - A list of dictionaries with the name, size in bytes and modification time of each profile.
+    """
+    if not os.path.isdir(directory):
+        return []
+
+    profiles = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(".pstats"):
+                stat = entry.stat()
+                profiles.append({"name": entry.name, "size": stat.st_size, "mtime": stat.st_mtime})
+    profiles.sort(key=lambda profile: profile["mtime"], reverse=True)
+    return profiles
+
+
+def measure_allocations(fn, top=10):
+    """
+    Calls fn under tracemalloc and reports the memory it allocated.
+    The top allocation sites are those of the memory still held when fn returns, including its result, which
+    shows what the result and any caches it filled are made of.
+
+    Parameters:
+    - fn (callable): The function to measure, called without arguments.
+    - top (int): Number of allocation sites reported.
+
+    Returns:
+    - A tuple (result, report) with fn's return value and a dictionary with the peak bytes allocated during the
+      call, the bytes still held when it returned and the top allocation sites by size, or None as report if
+      another measurement is running.
+    """
+    if not _memory_lock.acquire(blocking=False):
+        return fn(), None
+    try:
+        tracemalloc.start()
+        try:
+            result = fn()
+            return result, _memory_report(top)
+        finally:
+            tracemalloc.stop()
+    finally:
+        _memory_lock.release()
+
+
+def _memory_report(top):
+    retained, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"))
+    )
+    sites = []
+    for stat in snapshot.statistics("lineno")[:top]:
+        frame = stat.traceback[0]
+        filename = os.path.join(*frame.filename.split(os.sep)[-2:])  # Parent directory and file
+        sites.append({"site": f"{filename}:{frame.lineno}", "size_bytes": stat.size, "count": stat.count})
+    return {"peak_bytes": peak, "retained_bytes": retained, "top_allocations": sites}
+
+
+def list_memory_profiles():
+    """
+    Lists the memory profiles of the current app's recent requests, newest first.
+
+    Parameters:
+    - None.
+
+    Returns:
+    - A list of dictionaries with the request, its time and its memory report.
+    """
+    return list(reversed(current_app.extensions.get("memory_profiles", ())))
+
+
+def _should_profile():
+    if request.headers.get(current_app.config["PROFILING_HEADER"]):
+        return True
+    rate = current_app.config.get("PROFILING_SAMPLE_RATE", 0)
+    return rate > 0 and random.random() < rate
+
+
+def _start_profile():
+    if request.blueprint == "profiles" or not _should_profile():
+        return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return  # Another profiler is already active in this process
+    g.profiler = profiler
+
+
+def _stop_profile(response):
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return response
+
+    profiler.disable()
+    directory = current_app.config["PROFILING_DIR"]
+    endpoint = (request.endpoint or "unmatched").replace(".", "-")
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint}-{uuid.uuid4().hex[:8]}.pstats"
+    profiler.dump_stats(os.path.join(directory, name))
+    response.headers["X-Profile-Name"] = name
+    _prune_profiles(directory, current_app.config["PROFILING_MAX_FILES"])
+    return response
+
+
+def _abort_profile(exc):
+    # The request failed before its profile was stored
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+
+
+def _prune_profiles(directory, max_files):
+    for profile in list_profiles(directory)[max_files:]:
+        try:
+            os.remove(os.path.join(directory, profile["name"]))
+        except OSError:
+            pass  # Already removed by a concurrent request
+
+
+def _start_memory_profile():
+    if request.blueprint == "profiles" or not request.headers.get(current_app.config["MEMORY_PROFILING_HEADER"]):
+        return
+    if not _memory_lock.acquire(blocking=False):
+        return  # Another request is being measured
+    tracemalloc.start()
+    g.memory_profile = True
+
+
+def _stop_memory_profile(response):
+    if not g.pop("memory_profile", False):
+        return response
+
+    try:
+        report = _memory_report(current_app.config.get("MEMORY_PROFILING_TOP", 10))
+    finally:
+        tracemalloc.stop()
+        _memory_lock.release()
+    current_app.extensions["memory_profiles"].append(
+        {"method": request.method, "path": request.full_path.rstrip("?"), "time": time.time(), **report}
+    )
+    response.headers["X-Memory-Peak-Bytes"] = str(report["peak_bytes"])
+    return response
+
+
+def _abort_memory_profile(exc):
+    # The request failed before its report was taken
+    if g.pop("memory_profile", False):
+        tracemalloc.stop()
+        _memory_lock.release()
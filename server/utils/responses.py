@@ -1,35 +1,133 @@
-from flask import jsonify
-import logging
+import gzip
+import json
+import zlib
+from flask import Response, current_app, request
+from utils.singleflight import SingleFlight
 
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the standard library encoder
+    orjson = None
+
+# Codings offered to clients, in order of preference
+COMPRESSION_CODINGS = ("gzip", "deflate")
+
+# Concurrent responses built from the same data object share one serialized body
+_bodies = SingleFlight()
+
+def dumps(data):
+    """
+    Serializes data to compact JSON, with orjson when it is installed.
+
+    Parameters:
+    - data (any): The JSON-serializable data.
+
+    Returns:
+    - The UTF-8 encoded JSON document (bytes).
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits, which the standard library encoder handles
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def json_response(data, status_code=200):
+    """
+    Creates a compact JSON response.
+
+    Parameters:
+    - data (any): The JSON-serializable body.
+    - status_code (int): HTTP status code (default 200).
+
+    Returns:
+    - The Flask response.
+    """
+    return Response(dumps(data), status=status_code, mimetype="application/json")
 
 def success_response(message, data=None, status_code=200):
     """
     Creates a success response with a message and optional data.
-    
+
     Parameters:
     - message (str): The success message.
     - data (any): Optional data to include in the response.
     - status_code (int): HTTP status code (default 200).
-    
+
     Returns:
     - JSON response and status code.
     """
     response = {"message": message}
     if data or data==[]:
         response["data"] = data
-    return jsonify(response), status_code
+    return json_response(response, status_code), status_code
+
+def shared_success_response(message, data, status_code=200):
+    """
+    Creates a success response like success_response, serializing the body once for concurrent callers responding
+    with the same data object, such as the result of a single-flight read handed to every waiting request.
+
+    Parameters:
+    - message (str): The success message.
+    - data (any): The data to include in the response, which must not be mutated.
+    - status_code (int): HTTP status code (default 200).
+
+    Returns:
+    - JSON response and status code.
+    """
+    # Keyed by identity: the flight holds data until it finishes, so no other live object can share its id
+    body = _bodies.do((id(data), message, status_code), lambda: dumps({"message": message, "data": data}))
+    return Response(body, status=status_code, mimetype="application/json"), status_code
 
 def error_response(message, status_code=400):
     """
     Creates an error response with a message.
-    
+
     Parameters:
     - message (str): The error message.
     - status_code (int): HTTP status code (default 400).
-    
+
     Returns:
     - JSON error response and status code.
     """
-    return jsonify({"error": message}), status_code
+    return json_response({"error": message}, status_code), status_code
+
+def init_compression(app):
+    """
+    Compresses responses of at least COMPRESSION_MIN_BYTES with gzip or deflate, as negotiated through the
+    request's Accept-Encoding header. Streamed responses, such as exports, are sent as they are.
+
+    Parameters:
+    - app (Flask): The Flask application instance.
+
+    Returns:
+    - None.
+    """
+    app.after_request(_compress)
+
+def _compress(response):
+    config = current_app.config
+    response.vary.add("Accept-Encoding")
+    if (
+        response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in config.get("COMPRESSION_MIMETYPES", ())
+        or response.content_length is None
+        or response.content_length < config.get("COMPRESSION_MIN_BYTES", 1024)
+    ):
+        return response
+
+    coding = request.accept_encodings.best_match(COMPRESSION_CODINGS)
+    if coding is None:
+        return response
+
+    level = config.get("COMPRESSION_LEVEL", 6)
+    body = response.get_data()
+    if coding == "gzip":
+        compressed = gzip.compress(body, compresslevel=level, mtime=0)
+    else:
+        compressed = zlib.compress(body, level)  # HTTP deflate is the zlib format
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = coding
+    return response
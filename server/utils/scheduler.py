@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import deque
+from flask import current_app, g, request
+from utils.metrics import SCHEDULER_QUEUED, SCHEDULER_WAIT
+from utils.responses import error_response
+
+
+class _Ticket:
+    """
+    A request waiting for a slot, ordered by its weighted fair queuing finish tag.
+    """
+    def __init__(self, finish):
+        self.finish = finish
+        self.granted = False
+        self.event = threading.Event()
+
+
+class PriorityScheduler:
+    """
+    Shares a fixed number of request slots between priority classes using weighted fair queuing.
+    When slots are busy, requests queue per class; every freed slot goes to the queued request with the
+    smallest virtual finish tag, so a class with weight w gets w times the slots of a class with weight 1
+    while both are backlogged, and an idle class never blocks a busy one.
+    Attributes:
+        limit (int): Number of requests that run at once across all classes.
+        weights (dict): Weight of each priority class.
+    """
+    def __init__(self, limit, weights):
+        self.limit = limit
+        self.weights = weights
+        self.active = 0
+        self._queues = {name: deque() for name in weights}
+        self._last_finish = {name: 0.0 for name in weights}
+        self._virtual_time = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, priority, timeout):
+        """
+        Waits for a slot for a request of the given priority class.
+
+        Parameters:
+        - priority (str): The priority class of the request.
+        - timeout (float): Maximum time in seconds to wait for a slot.
+
+        Returns:
+        - True if a slot was granted, False if the wait timed out.
+        """
+        with self._lock:
+            if self.active < self.limit and not any(self._queues.values()):
+                self.active += 1
+                return True
+
+            finish = max(self._virtual_time, self._last_finish[priority]) + 1.0 / self.weights[priority]
+            self._last_finish[priority] = finish
+            ticket = _Ticket(finish)
+            self._queues[priority].append(ticket)
+            SCHEDULER_QUEUED.set(len(self._queues[priority]), priority)
+
+        if ticket.event.wait(timeout):
+            return True
+
+        with self._lock:
+            if ticket.granted:
+                return True  # Granted between the timeout and taking the lock
+            self._queues[priority].remove(ticket)
+            SCHEDULER_QUEUED.set(len(self._queues[priority]), priority)
+            return False
+
+    def release(self):
+        """Frees a slot, handing it straight to the next queued request if there is one."""
+        with self._lock:
+            heads = [(queue[0].finish, name) for name, queue in self._queues.items() if queue]
+            if not heads:
+                self.active -= 1
+                return
+
+            _, name = min(heads)
+            ticket = self._queues[name].popleft()
+            SCHEDULER_QUEUED.set(len(self._queues[name]), name)
+            self._virtual_time = ticket.finish
+            ticket.granted = True
+            ticket.event.set()
+
+
+def init_scheduler(app):
+    """
+    Installs the priority scheduler in front of the routes listed in PRIORITY_ROUTE_CLASSES.
+    A request's class comes from its PRIORITY_HEADER when that names a known class, otherwise from its route.
+
+    Parameters:
+    - app (Flask): The Flask application instance to schedule requests for.
+
+    Returns:
+    - None.
+    """
+    app.extensions["scheduler"] = PriorityScheduler(
+        app.config.get("SCHEDULER_CONCURRENCY", 32), app.config.get("PRIORITY_CLASSES", {"default": 1})
+    )
+    app.before_request(_schedule)
+    app.teardown_request(_release)
+
+
+def _request_priority():
+    rule = request.url_rule.rule if request.url_rule else None
+    route_priority = current_app.config.get("PRIORITY_ROUTE_CLASSES", {}).get(rule)
+    if route_priority is None:
+        return None
+    header = request.headers.get(current_app.config.get("PRIORITY_HEADER", "X-Priority"), "").lower()
+    return header if header in current_app.config.get("PRIORITY_CLASSES", {}) else route_priority
+
+
+def _schedule():
+    priority = _request_priority()
+    if priority is None:
+        return None
+
+    scheduler = current_app.extensions["scheduler"]
+    start = time.perf_counter()
+    granted = scheduler.acquire(priority, current_app.config.get("ADMISSION_QUEUE_TIMEOUT", 30))
+    SCHEDULER_WAIT.observe(time.perf_counter() - start, priority)
+    if granted:
+        g.scheduler = scheduler
+        return None
+
+    response, status_code = error_response("Server is busy, retry later", 503)
+    response.headers["Retry-After"] = str(max(1, int(current_app.config.get("RESPONSE_DELAY_SECONDS", 10))))
+    return response, status_code
+
+
+def _release(exc):
+    scheduler = g.pop("scheduler", None)
+    if scheduler is not None:
+        scheduler.release()
@@ -0,0 +1,56 @@
+import threading
+
+
+class _Call:
+    """
+    An in-flight computation that concurrent callers wait on.
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into a single execution.
+    The first caller for a key runs the function; callers arriving while it runs wait for it
+    and receive the same result object, so they must treat it as read-only.
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """
+        Runs fn, or waits for the in-flight run for key, and returns its result.
+
+        Parameters:
+        - key (hashable): Identifies calls that may share a result.
+        - fn (callable): The function to run when no call for key is in flight.
+
+        Returns:
+        - The result of fn. Exceptions raised by fn are re-raised in every waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
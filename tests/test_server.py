@@ -1,7 +1,20 @@
+import json
 import pytest
-from app import app
+from app import create_app
+from config import Config
 from models.inventory import Inventory, db
 
+
+class TestConfig(Config):
+    """
+    Configuration for the tests: an in-memory database and no simulated delay.
+    """
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    RESPONSE_DELAY_SECONDS = 0
+
+
+app = create_app(TestConfig)
+
 @pytest.fixture
 def client():
     """
@@ -120,3 +133,864 @@ def test_update_quantity_item_not_exists(client):
     response = client.put('/update-quantity', json={"name": "Nonexistent Item", "quantity": 10})
     assert response.status_code == 404
     assert response.json["error"] == "Item not found"
+
+def test_search_items_route(client):
+    """
+    Tests the /search-items endpoint with prefix and fuzzy matching.
+    Parameters:
+        client: Flask test client.
+    Returns:
+        None
+    """
+    client.post('/add-item', json={"name": "Steel Bolt", "quantity": 10})
+    client.post('/add-item', json={"name": "Steel Nut", "quantity": 5})
+
+    response = client.get('/search-items', query_string={"q": "Steel B"})
+    assert response.status_code == 200
+    assert [item["name"] for item in response.json["data"]] == ["Steel Bolt"]
+
+    response = client.get('/search-items', query_string={"q": "stel nut", "mode": "fuzzy"})
+    assert response.status_code == 200
+    assert response.json["data"][0]["name"] == "Steel Nut"
+
+    response = client.get('/search-items', query_string={"q": "st", "mode": "fuzzy"})
+    assert [item["name"] for item in response.json["data"]] == ["Steel Bolt", "Steel Nut"]
+
+    # Both names hold every trigram of the query, the one containing it ranks first
+    client.post('/add-item', json={"name": "Rod-777", "quantity": 1})
+    client.post('/add-item', json={"name": "Rod-7777", "quantity": 1})
+    response = client.get('/search-items', query_string={"q": "od-7777", "mode": "fuzzy"})
+    assert [item["name"] for item in response.json["data"]] == ["Rod-7777", "Rod-777"]
+
+    # Names holding every trigram that were stored first do not crowd out the one named as the query
+    for name in ["Pin-1999", "Pin-19990", "Pin-19991", "Pin-199999"]:
+        client.post('/add-item', json={"name": name, "quantity": 1})
+    response = client.get('/search-items', query_string={"q": "pin-199999", "mode": "fuzzy", "limit": 2})
+    assert response.json["data"][0]["name"] == "Pin-199999"
+
+def test_metrics_route(client):
+    """
+    Tests that /metrics reports request counts, latency histograms and SQL statements.
+    Parameters:
+        client: Flask test client.
+    Returns:
+        None
+    """
+    client.get('/get-items')
+    response = client.get('/metrics')
+    body = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert 'http_requests_total{endpoint="/get-items",method="GET",status="200"}' in body
+    assert 'http_request_delay_seconds_count{endpoint="/get-items"}' in body
+    assert 'http_request_handler_seconds_count{endpoint="/get-items"}' in body
+    assert 'db_statements_total{operation="SELECT"}' in body
+
+def test_metrics_count_requests_whose_handler_raised():
+    """
+    Tests that a request whose handler raised is recorded as a 500 in the request metrics.
+    Parameters:
+        None
+    Returns:
+        None
+    """
+    metrics_app = create_app(TestConfig)
+    metrics_app.add_url_rule("/raise", "raise", lambda: 1 / 0)
+    metrics_app.config["PROPAGATE_EXCEPTIONS"] = True  # As in debug mode, the error skips after_request hooks
+    with pytest.raises(ZeroDivisionError):
+        metrics_app.test_client().get("/raise")
+
+    body = metrics_app.test_client().get("/metrics").get_data(as_text=True)
+    assert 'http_requests_total{endpoint="/raise",method="GET",status="500"}' in body
+    assert 'http_request_duration_seconds_count{endpoint="/raise"}' in body
+
+def test_profiling_records_and_serves_profiles(tmp_path):
+    """
+    Tests that requests sent with the profiling header leave a pstats file that /profiles lists and serves.
+    Parameters:
+        tmp_path: Temporary directory for the profiles.
+    Returns:
+        None
+    """
+    import pstats
+
+    class ProfilingConfig(TestConfig):
+        PROFILING_ENABLED = True
+        PROFILING_DIR = str(tmp_path)
+
+    profiling_client = create_app(ProfilingConfig).test_client()
+    response = profiling_client.get('/get-items', headers={"X-Profile": "1"})
+    name = response.headers["X-Profile-Name"]
+    assert name.endswith(".pstats") and (tmp_path / name).is_file()
+    assert "X-Profile-Name" not in profiling_client.get('/get-items').headers
+
+    listed = profiling_client.get('/profiles').json["data"]
+    assert [profile["name"] for profile in listed] == [name]
+
+    response = profiling_client.get(f'/profiles/{name}')
+    assert response.status_code == 200
+    assert response.data == (tmp_path / name).read_bytes()
+    assert pstats.Stats(str(tmp_path / name)).total_calls > 0
+    assert profiling_client.get('/profiles/missing.pstats').status_code == 404
+    assert app.test_client().get('/profiles').status_code == 404  # Disabled in the shared test app
+
+def test_profiling_stops_when_a_handler_raises(tmp_path):
+    """
+    Tests that a profiled request whose handler raises leaves no profiler enabled on its thread.
+    Parameters:
+        tmp_path: Temporary directory for the profiles.
+    Returns:
+        None
+    """
+    import cProfile
+    import sys
+
+    class ProfilingConfig(TestConfig):
+        PROFILING_ENABLED = True
+        PROFILING_DIR = str(tmp_path)
+
+    profiling_app = create_app(ProfilingConfig)
+    profiling_app.add_url_rule("/raise", "raise", lambda: 1 / 0)
+    profiling_app.config["PROPAGATE_EXCEPTIONS"] = True  # As in debug mode, the error skips after_request hooks
+    with pytest.raises(ZeroDivisionError):
+        profiling_app.test_client().get("/raise", headers={"X-Profile": "1"})
+
+    assert sys.getprofile() is None  # Before Python 3.12, an enabled cProfile is the thread's profile function
+    profiler = cProfile.Profile()
+    profiler.enable()  # From Python 3.12, raises ValueError while another profiler is enabled
+    profiler.disable()
+
+def test_log_payloads_are_copied_and_capped():
+    """
+    Tests that queued log records keep the payload as it was when logged, and that large payloads are truncated.
+    Parameters:
+        None
+    Returns:
+        None
+    """
+    import logging
+    import queue
+    import sys
+    from utils.log import JsonFormatter, NonBlockingQueueHandler
+
+    records = queue.Queue()
+    handler = NonBlockingQueueHandler(records)
+    payload = {"name": "Cube", "tags": ["a"]}
+    handler.handle(logging.makeLogRecord({"msg": "Received", "payload": payload}))
+    payload["name"] = "Changed"
+    payload["tags"].append("b")
+    record = records.get_nowait()
+    assert record.payload == {"name": "Cube", "tags": ["a"]}
+
+    entry = json.loads(JsonFormatter(max_payload_chars=50).format(record))
+    assert entry["payload"] == {"name": "Cube", "tags": ["a"]}
+    record.payload = {"items": list(range(100000))}
+    entry = json.loads(JsonFormatter(max_payload_chars=50).format(record))
+    assert entry["payload_truncated"] is True and len(entry["payload"]) == 50
+
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        handler.handle(logging.makeLogRecord({"msg": "Failed %s", "args": ("Cube",), "exc_info": sys.exc_info()}))
+    record = records.get_nowait()
+    assert record.exc_info is None and record.args is None  # Nothing holding live frames reaches the listener
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "Failed Cube" and "ZeroDivisionError" in entry["exception"]
+
+def test_logging_is_reconfigured_by_apps_with_other_settings():
+    """
+    Tests that configuring logging again with other LOG_* settings replaces the pipeline, and the same ones keep it.
+    Parameters:
+        None
+    Returns:
+        None
+    """
+    import logging
+    from types import SimpleNamespace
+    from utils.log import configure_logging
+
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    configure_logging(app)
+    assert root.handlers == handlers
+
+    try:
+        configure_logging(SimpleNamespace(config={**app.config, "LOG_LEVEL": "WARNING"}))
+        assert root.level == logging.WARNING
+        assert root.handlers != handlers
+    finally:
+        configure_logging(app)
+    assert root.level == logging.getLevelName(app.config["LOG_LEVEL"])
+
+def test_single_flight_shares_concurrent_calls():
+    """
+    Tests that concurrent calls with the same key run the function once and share its result.
+    Parameters:
+        None
+    Returns:
+        None
+    """
+    import threading
+    import time
+    from utils.singleflight import SingleFlight
+
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return ["shared"]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", compute))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)  # Let every thread join the in-flight call
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 5
+    assert all(result is results[0] for result in results)
+    assert len(calls) == 1
+    assert flight.do("key", lambda: "fresh") == "fresh"
+
+def test_shared_responses_serialize_shared_results_once(monkeypatch):
+    """
+    Tests that concurrent responses built from the same result object share one serialized body.
+    Parameters:
+        monkeypatch: Pytest fixture used to count serializations.
+    Returns:
+        None
+    """
+    import threading
+    import time
+    from utils import responses
+
+    release = threading.Event()
+    encoded = []
+
+    def slow_dumps(data):
+        encoded.append(data)
+        release.wait(5)
+        return json.dumps(data).encode()
+
+    monkeypatch.setattr(responses, "dumps", slow_dumps)
+    items = [{"name": "Shared", "quantity": 1}]
+    bodies = []
+
+    def respond():
+        with app.test_request_context():
+            bodies.append(responses.shared_success_response("Items retrieved successfully", items)[0].get_data())
+
+    threads = [threading.Thread(target=respond) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)  # Let every thread join the in-flight serialization
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(encoded) == 1
+    assert bodies == [bodies[0]] * 5 and json.loads(bodies[0])["data"] == items
+
+def test_admission_gate_rejects_when_queue_is_full():
+    """
+    Tests that an admission gate rejects requests beyond its limit and queue, and admits again after a release.
+    Parameters:
+        None
+    Returns:
+        None
+    """
+    from utils.admission import AdmissionGate
+
+    gate = AdmissionGate("test", limit=1, queue_size=0, timeout=0.1)
+    assert gate.acquire() is None
+    assert gate.acquire() == "queue_full"
+    gate.release()
+    assert gate.acquire() is None
+    gate.release()
+
+def test_priority_scheduler_serves_interactive_first():
+    """
+    Tests that a freed slot goes to a queued interactive request ahead of earlier queued bulk requests.
+    Parameters:
+        None
+    Returns:
+        None
+    """
+    import threading
+    import time
+    from utils.scheduler import PriorityScheduler
+
+    scheduler = PriorityScheduler(1, {"interactive": 8, "bulk": 1})
+    assert scheduler.acquire("bulk", 1)
+
+    order = []
+
+    def run(priority):
+        assert scheduler.acquire(priority, 5)
+        order.append(priority)
+        scheduler.release()
+
+    threads = []
+    for priority in ("bulk", "bulk", "interactive"):
+        thread = threading.Thread(target=run, args=(priority,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.05)  # Queue the requests in a known order
+
+    scheduler.release()
+    for thread in threads:
+        thread.join()
+
+    assert order[0] == "interactive"
+    assert scheduler.active == 0
+
+def test_import_and_export_items_routes(client):
+    """
+    Tests that /import-items upserts CSV rows in chunks, skipping invalid ones, and /export-items streams them back.
+    Parameters:
+        client: Flask test client.
+    Returns:
+        None
+    """
+    client.post('/add-item', json={"name": "Item 1", "quantity": 1})
+    body = "name,quantity\nItem 1,10\nItem 2,20\nItem 3,abc\nItem 4,40\n"
+    response = client.post('/import-items?format=csv&chunk_size=2', data=body, content_type="text/csv")
+    assert response.status_code == 200
+    assert response.json["data"]["imported"] == 3
+    assert response.json["data"]["skipped"] == 1
+    assert response.json["data"]["chunks"] == 2
+
+    response = client.get('/export-items?format=ndjson')
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert {"name": "Item 1", "quantity": 10} in lines
+    assert len(lines) == 3
+
+    response = client.get('/search-items', query_string={"q": "Item 4", "mode": "fuzzy"})
+    assert response.json["data"][0]["name"] == "Item 4"
+
+def test_writes_during_an_import_are_search_indexed(tmp_path):
+    """
+    Tests that items written between import chunks are searchable at once, with the index triggers in place.
+    Parameters:
+        tmp_path: A temporary directory holding the database.
+    Returns:
+        None
+    """
+    from database import _search_index_missing
+    from services.inventory import add_item, import_items, search_items
+
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'inventory.db'}"
+
+    def first_match(query):
+        return [item["name"] for item in search_items(query, "fuzzy")[1]][:1]
+
+    def progress(imported):
+        with db.engine.connect() as connection:
+            assert not _search_index_missing(connection)
+        assert add_item(f"Late Widget {imported}", 1)[0]  # Through the write pipeline, as by a concurrent request
+        assert first_match(f"Late Widget {imported}") == [f"Late Widget {imported}"]
+        assert first_match(f"Bulk Bolt {imported - 1}") == [f"Bulk Bolt {imported - 1}"]
+
+    import_app = create_app(FileConfig)
+    with import_app.app_context():
+        success, result = import_items(((i, f"Bulk Bolt {i}", i, None) for i in range(6)), 2, progress)
+        assert success and result["chunks"] == 3
+        assert len(search_items("Bulk Bolt", "fuzzy")[1]) == 6
+        db.engine.dispose()
+
+def test_concurrent_adds_are_group_committed_with_per_request_results():
+    """
+    Tests that concurrent adds of the same item through the write pipeline succeed exactly once.
+    Parameters:
+        None
+    Returns:
+        None
+    """
+    import threading
+    from services.inventory import add_item
+
+    results = []
+
+    def add():
+        with app.app_context():
+            results.append(add_item("Shared Item", 1))
+
+    threads = [threading.Thread(target=add) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [success for success, _ in results].count(True) == 1
+    assert all(result == "Item already exists" for success, result in results if not success)
+
+def test_sharded_storage_routes_and_merges(tmp_path):
+    """
+    Tests that a sharded app stores items across shard files and merges them on reads.
+    Parameters:
+        tmp_path: Temporary directory for the shard databases.
+    Returns:
+        None
+    """
+    from database import shard_engines, shard_index
+
+    class ShardedConfig(TestConfig):
+        SHARD_COUNT = 3
+        SHARD_DATABASE_URI_TEMPLATE = f"sqlite:///{tmp_path}/shard-{{shard}}.db"
+
+    sharded_app = create_app(ShardedConfig)
+    client = sharded_app.test_client()
+    names = [f"Item {i}" for i in range(12)]
+    for name in names:
+        assert client.post('/add-item', json={"name": name, "quantity": 1}).status_code == 201
+    assert client.put('/update-quantity', json={"name": "Item 5", "quantity": 7}).status_code == 200
+    assert client.delete('/remove-item', json={"name": "Item 6"}).status_code == 200
+
+    response = client.get('/get-items')
+    assert sorted(item["name"] for item in response.json["data"]) == sorted(set(names) - {"Item 6"})
+    assert {"name": "Item 5", "quantity": 7} in response.json["data"]
+
+    with sharded_app.app_context():
+        engines = shard_engines()
+        assert len({str(engine.url) for engine in engines}) == 3
+        for i, engine in enumerate(engines):
+            with engine.connect() as connection:
+                stored = [row[0] for row in connection.exec_driver_sql("SELECT name FROM inventory")]
+            assert all(shard_index(name, 3) == i for name in stored)
+
+def test_async_job_mode(client):
+    """
+    Tests that a 'Prefer: respond-async' request is accepted with 202 and its result can be long-polled.
+    Parameters:
+        client: Flask test client.
+    Returns:
+        None
+    """
+    response = client.post('/add-item', json={"name": "Job Item", "quantity": 3}, headers={"Prefer": "respond-async"})
+    assert response.status_code == 202
+    job_id = response.json["data"]["job_id"]
+
+    response = client.get(f'/jobs/{job_id}', query_string={"wait": 5})
+    assert response.status_code == 200
+    assert response.json["data"]["status"] == "done"
+    assert response.json["data"]["status_code"] == 201
+    assert response.json["data"]["result"]["data"] == {"name": "Job Item", "quantity": 3}
+
+    response = client.get('/jobs', query_string={"ids": f"{job_id},missing"})
+    assert [job["status"] for job in response.json["data"]] == ["done", "unknown"]
+    assert client.get('/jobs/missing').status_code == 404
+
+def test_jobs_are_shared_between_worker_processes(tmp_path):
+    """
+    Tests that a job accepted by one worker's app can be long-polled through another app on the same database.
+    Parameters:
+        tmp_path: A temporary directory holding the database.
+    Returns:
+        None
+    """
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'inventory.db'}"
+        RESPONSE_DELAY_SECONDS = 0.2
+
+    accepting, polling = create_app(FileConfig).test_client(), create_app(FileConfig).test_client()
+    response = accepting.post('/add-item', json={"name": "Shared", "quantity": 1}, headers={"Prefer": "respond-async"})
+    job_id = response.json["data"]["job_id"]
+
+    response = polling.get('/jobs', query_string={"ids": job_id})
+    assert response.json["data"][0]["status"] in ("pending", "running")
+    response = polling.get(f'/jobs/{job_id}', query_string={"wait": 5})
+    assert response.json["data"]["status"] == "done"
+    assert response.json["data"]["status_code"] == 201
+
+def test_abandoned_jobs_fail_and_free_their_slot(tmp_path):
+    """
+    Tests that a job left pending past JOB_PENDING_TTL_SECONDS, as by a killed worker, is failed and evicted.
+    Parameters:
+        tmp_path: A temporary directory holding the database.
+    Returns:
+        None
+    """
+    from sqlalchemy import update
+    from models.jobs import Job
+
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'inventory.db'}"
+        JOB_MAX_JOBS = 1
+
+    job_app = create_app(FileConfig)
+    job_client = job_app.test_client()
+    with job_app.app_context():
+        stale_id = job_app.extensions["jobs"]["registry"].add("POST", "/add-item")
+        db.session.execute(update(Job).where(Job.id == stale_id).values(created=Job.created - 3600))
+        db.session.commit()
+
+    response = job_client.get(f'/jobs/{stale_id}', query_string={"wait": 5})
+    assert response.json["data"]["status"] == "failed"
+    assert response.json["data"]["status_code"] == 500
+
+    response = job_client.post('/add-item', json={"name": "After", "quantity": 1}, headers={"Prefer": "respond-async"})
+    assert response.status_code == 202
+    job_id = response.json["data"]["job_id"]
+    assert job_client.get(f'/jobs/{job_id}', query_string={"wait": 5}).json["data"]["status"] == "done"
+    assert job_client.get(f'/jobs/{stale_id}').status_code == 404
+
+def test_transform_coalescer_keeps_latest_state_per_object():
+    """
+    Tests that transform updates within a tick reach the handler once per object, merged with the latest values.
+    Parameters:
+        None
+    Returns:
+        None
+    """
+    from services.transforms import TransformCoalescer
+
+    handled = []
+    coalescer = TransformCoalescer(3600, lambda name, state, route: handled.append((name, state)))
+    coalescer.submit("Cube", {"position": {"x": 1}})
+    coalescer.submit("Cube", {"position": {"x": 2}, "scale": {"x": 1}})
+    coalescer.submit("Cube", {"rotation": {"x": 3}})
+    coalescer.submit("Sphere", {"position": {"x": 4}})
+
+    assert coalescer.flush() == 2
+    assert dict(handled) == {
+        "Cube": {"position": {"x": 2}, "scale": {"x": 1}, "rotation": {"x": 3}},
+        "Sphere": {"position": {"x": 4}},
+    }
+    assert coalescer.flush() == 0
+
+def test_transform_routes_log_under_their_own_route(client, monkeypatch):
+    """
+    Tests that coalesced updates are logged under the route that received them, and that updates without a name
+    or without components are logged at once instead of being merged.
+    Parameters:
+        client: The test client to simulate requests.
+        monkeypatch: Pytest fixture used to capture the request logs.
+    Returns:
+        None
+    """
+    import services.transforms
+
+    logged = []
+    monkeypatch.setattr(
+        services.transforms, "log_request", lambda logger, route, payload: logged.append((route, payload))
+    )
+    client.post("/translation", json={"position": {"x": 1}})
+    client.post("/transform", json={"name": "Cube", "type": "MESH"})
+    assert logged == [
+        ("/translation", {"name": None, "position": {"x": 1}}),
+        ("/transform", {"name": "Cube", "type": "MESH"}),
+    ]
+
+    logged.clear()
+    client.post("/scale", json={"name": "Cone", "scale": {"x": 2}})
+    app.extensions["transform_coalescer"].flush()
+    assert logged == [("/scale", {"name": "Cone", "scale": {"x": 2}})]
+    assert "" not in client.get("/transforms").json["data"]
+
+def test_transform_matrices_batch(client):
+    """
+    Tests that /transform-matrices returns world matrices, inverses and bounds for a batch of transforms.
+    Parameters:
+        client: The test client to simulate requests.
+    Returns:
+        None
+    """
+    import math
+
+    response = client.post("/transform-matrices", json={"objects": [
+        {"position": {"x": 1, "y": 2, "z": 3}, "rotation": {"z": math.pi / 2}, "scale": {"x": 2, "y": 1, "z": 1}},
+        {"position": {"x": -5}, "scale": {"x": 0, "y": 1, "z": 1}},
+    ]})
+    assert response.status_code == 200
+    data = response.json["data"]
+    assert data["count"] == 2
+
+    matrix, inverse = data["matrices"][0], data["inverse_matrices"][0]
+    expected = [[0, -1, 0, 1], [2, 0, 0, 2], [0, 0, 1, 3], [0, 0, 0, 1]]
+    assert all(abs(matrix[i][j] - expected[i][j]) < 1e-9 for i in range(4) for j in range(4))
+    product = [[sum(matrix[i][k] * inverse[k][j] for k in range(4)) for j in range(4)] for i in range(4)]
+    assert all(abs(product[i][j] - (i == j)) < 1e-9 for i in range(4) for j in range(4))
+    assert [[round(v, 9) for v in corner] for corner in data["bounds"][0]] == [[0, 0, 2], [2, 4, 4]]
+
+    assert data["inverse_matrices"][1] is None  # Zero scale has no inverse
+    assert data["combined_bounds"] == [[-5, -1, -1], [2, 4, 4]]
+
+    response = client.post("/transform-matrices", json={"positions": [[0, 0, 0]], "scales": [[1, 1]]})
+    assert response.status_code == 400
+
+def test_transform_stream_applies_and_acks_frames(client):
+    """
+    Tests that update frames sent over the transform stream are coalesced like HTTP transforms and acked.
+    Parameters:
+        client: The test client to simulate requests.
+    Returns:
+        None
+    """
+    import socket
+    from services.transform_stream import encode_updates, start_transform_stream, FRAME_HEADER, ACK
+
+    listener = socket.create_server(("127.0.0.1", 0))
+    server = start_transform_stream(app, listener)
+    try:
+        with socket.create_connection(listener.getsockname()) as connection:
+            frames = [
+                encode_updates(1, [("Cube", {"position": {"x": 1, "y": 2, "z": 3}})]),
+                encode_updates(2, [("Cube", {"rotation": {"x": 0.5}}), ("Lamp", {"scale": {"x": 2, "y": 2, "z": 2}})]),
+                encode_updates(3, [("", {"position": {"x": 9, "y": 9, "z": 9}}), ("Empty", {})]),  # Only logged
+            ]
+            connection.sendall(b"".join(frames))
+
+            acked, applied = 0, 0
+            while acked < 3:
+                connection.recv(FRAME_HEADER.size, socket.MSG_WAITALL)
+                _, acked, count = ACK.unpack(connection.recv(ACK.size, socket.MSG_WAITALL))
+                applied += count
+            assert applied == 3
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    app.extensions["transform_coalescer"].flush()
+    transforms = client.get("/transforms").json["data"]
+    assert transforms["Cube"]["position"] == {"x": 1, "y": 2, "z": 3}
+    assert transforms["Cube"]["rotation"] == {"x": 0.5, "y": 0, "z": 0}
+    assert transforms["Lamp"]["scale"] == {"x": 2, "y": 2, "z": 2}
+    assert "" not in transforms and "Empty" not in transforms
+
+def test_transforms_are_shared_between_worker_processes(tmp_path):
+    """
+    Tests that transforms coalesced by different worker apps on the same database are merged and served by each.
+    Parameters:
+        tmp_path: A temporary directory holding the database.
+    Returns:
+        None
+    """
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'inventory.db'}"
+
+    first, second = create_app(FileConfig), create_app(FileConfig)
+    first.test_client().post("/translation", json={"name": "Cube", "position": {"x": 1}})
+    second.test_client().post("/rotation", json={"name": "Cube", "rotation": {"z": 2}})
+    first.extensions["transform_coalescer"].flush()
+    second.extensions["transform_coalescer"].flush()
+
+    for worker in (first, second):
+        transforms = worker.test_client().get("/transforms").json["data"]
+        assert transforms == {"Cube": {"position": {"x": 1}, "rotation": {"z": 2}}}
+
+def test_responses_are_compressed_when_accepted(client):
+    """
+    Tests that large JSON responses are gzip or deflate compressed as negotiated, and small ones are not.
+    Parameters:
+        client: The test client to simulate requests.
+    Returns:
+        None
+    """
+    import gzip
+    import zlib
+
+    body = "\n".join(["name,quantity"] + [f"item{i},{i}" for i in range(200)])
+    client.post("/import-items?format=csv", data=body, content_type="text/csv")
+
+    response = client.get("/get-items", headers={"Accept-Encoding": "gzip, deflate"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(json.loads(gzip.decompress(response.data))["data"]) == 200
+
+    response = client.get("/get-items", headers={"Accept-Encoding": "deflate, gzip;q=0"})
+    assert response.headers["Content-Encoding"] == "deflate"
+    assert len(json.loads(zlib.decompress(response.data))["data"]) == 200
+
+    response = client.get("/get-items")
+    assert "Content-Encoding" not in response.headers
+    assert len(response.json["data"]) == 200
+
+    response = client.get("/search-items?q=item199", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers  # Below COMPRESSION_MIN_BYTES
+
+    response = client.get("/export-items?format=csv", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers  # Streamed
+    assert len(response.get_data(as_text=True).splitlines()) == 201
+
+def test_file_path_resolves_from_incremental_index(client, tmp_path):
+    """
+    Tests that /file-path resolves files and project folders from the asset index and picks up changes.
+    Parameters:
+        client: The test client to simulate requests.
+        tmp_path: A temporary directory holding the project roots.
+    Returns:
+        None
+    """
+    import hashlib
+    import os
+
+    # Without project roots, the placeholder paths are returned as before
+    assert client.get("/file-path").json["data"]["file_path"] == "/path/to/dcc/file"
+    assert client.get("/file-path?projectpath=true").json["data"]["file_path"] == "/path/to/project/folder"
+
+    (tmp_path / "film" / "shots").mkdir(parents=True)
+    (tmp_path / "game").mkdir()
+    (tmp_path / "film" / "shots" / "shot010.blend").write_bytes(b"shot")
+    (tmp_path / "game" / "shot010.blend").write_bytes(b"other")
+    app.config["PROJECT_ROOTS"] = {"film": str(tmp_path / "film"), "game": str(tmp_path / "game")}
+    app.config["ASSET_INDEX_REFRESH_SECONDS"] = 0
+    app.extensions.pop("asset_index", None)
+    try:
+        response = client.get("/file-path?name=shot010.blend&project=film")
+        assert response.status_code == 200
+        data = response.json["data"]
+        assert data["file_path"] == str(tmp_path / "film" / "shots" / "shot010.blend")
+        assert data["size"] == 4 and data["hash"] == hashlib.sha256(b"shot").hexdigest()
+        assert client.get("/file-path?name=shot010.blend").json["data"]["matches"] == 2
+
+        (tmp_path / "film" / "shots" / "shot010.blend").write_bytes(b"changed")
+        (tmp_path / "film" / "shots" / "shot020.blend").write_bytes(b"new")
+        os.utime(tmp_path / "film" / "shots", ns=(0, 0))  # Make the directory change visible to coarse mtimes
+        data = client.get("/file-path?name=shot010.blend&project=film").json["data"]
+        assert data["size"] == 7 and data["hash"] == hashlib.sha256(b"changed").hexdigest()
+        assert client.get("/file-path?name=shot020.blend").status_code == 200
+
+        assert client.get("/file-path?name=missing.blend").status_code == 404
+        response = client.get("/file-path?projectpath=true&project=game")
+        assert response.json["data"]["file_path"] == str(tmp_path / "game")
+    finally:
+        app.config["PROJECT_ROOTS"] = {}
+        app.extensions.pop("asset_index", None)
+
+def test_schema_migrates_once_and_repairs_search_index(tmp_path):
+    """
+    Tests that the schema is migrated on first start only, and that later starts restore dropped index triggers.
+    Parameters:
+        tmp_path: A temporary directory holding the database.
+    Returns:
+        None
+    """
+    from sqlalchemy import text
+    from database import SCHEMA_VERSION, create_schema
+    from models.inventory import SEARCH_INDEX_TRIGGERS
+
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'inventory.db'}"
+
+    file_app = create_app(FileConfig)
+    with file_app.app_context():
+        engine = db.engine
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA user_version")).scalar() == SCHEMA_VERSION
+
+        with engine.begin() as connection:
+            for trigger in SEARCH_INDEX_TRIGGERS:
+                connection.execute(text(f"DROP TRIGGER {trigger}"))
+        create_schema(file_app)
+        with engine.connect() as connection:
+            triggers = connection.execute(text("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger'")).scalar()
+        assert triggers == 3
+        engine.dispose()
+
+def test_idempotency_key_replays_mutation_response(client):
+    """
+    Tests that retried mutations with the same Idempotency-Key get the stored response without running again.
+    Parameters:
+        client: The test client to simulate requests.
+    Returns:
+        None
+    """
+    import threading
+
+    headers = {"Idempotency-Key": "add-widget-1"}
+    first = client.post("/add-item", json={"name": "Widget", "quantity": 5}, headers=headers)
+    retry = client.post("/add-item", json={"name": "Widget", "quantity": 5}, headers=headers)
+    assert first.status_code == retry.status_code == 201
+    assert retry.json == first.json and retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+
+    response = client.post("/add-item", json={"name": "Widget", "quantity": 6}, headers=headers)
+    assert response.status_code == 422
+    assert client.post("/add-item", json={"name": "Widget", "quantity": 5}).status_code == 400  # No key, runs again
+
+    # A double click arriving while the first request is still in its delay waits for its response
+    app.config["RESPONSE_DELAY_SECONDS"] = 0.3
+    try:
+        results = []
+        headers = {"Idempotency-Key": "update-widget-1"}
+        threads = [
+            threading.Thread(target=lambda: results.append(app.test_client().put(
+                "/update-quantity", json={"name": "Widget", "quantity": 9}, headers=headers
+            )))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        app.config["RESPONSE_DELAY_SECONDS"] = 0
+    assert [r.status_code for r in results] == [200, 200]
+    assert sorted(r.headers.get("Idempotent-Replayed", "false") for r in results) == ["false", "true"]
+
+def test_idempotency_keys_are_shared_between_worker_processes(tmp_path):
+    """
+    Tests that a retry reaching another worker's app on the same database replays the stored response.
+    Parameters:
+        tmp_path: A temporary directory holding the database.
+    Returns:
+        None
+    """
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'inventory.db'}"
+
+    headers = {"Idempotency-Key": "add-shared-1"}
+    responses = [
+        create_app(FileConfig).test_client().post("/add-item", json={"name": "Shared", "quantity": 1}, headers=headers)
+        for _ in range(3)
+    ]
+    assert [response.status_code for response in responses] == [201, 201, 201]
+    assert [response.headers.get("Idempotent-Replayed") for response in responses] == [None, "true", "true"]
+
+def test_idempotency_replays_on_the_same_worker_skip_the_database(client, monkeypatch):
+    """
+    Tests that a retry reaching the worker that completed the key is replayed from memory, without the database.
+    Parameters:
+        client: The test client to simulate requests.
+        monkeypatch: Pytest fixture used to cut the store off from the database.
+    Returns:
+        None
+    """
+    headers = {"Idempotency-Key": "add-local-1"}
+    first = client.post("/add-item", json={"name": "Local", "quantity": 1}, headers=headers)
+    store = app.extensions["idempotency"]
+    monkeypatch.setattr(store, "_engine", lambda: pytest.fail("A local replay queried the database"))
+
+    retry = client.post("/add-item", json={"name": "Local", "quantity": 1}, headers=headers)
+    assert retry.status_code == first.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert client.post("/add-item", json={"name": "Local", "quantity": 2}, headers=headers).status_code == 422
+
+def test_memory_profiling_reports_requests():
+    """
+    Tests that requests sent with the memory profiling header get a tracemalloc report listed on /profiles/memory.
+    Parameters:
+        None
+    Returns:
+        None
+    """
+    class MemoryConfig(TestConfig):
+        MEMORY_PROFILING_ENABLED = True
+
+    memory_app = create_app(MemoryConfig)
+    memory_client = memory_app.test_client()
+    memory_client.post("/add-item", json={"name": "Widget", "quantity": 1})
+
+    response = memory_client.get("/get-items", headers={"X-Memory-Profile": "1"})
+    assert int(response.headers["X-Memory-Peak-Bytes"]) > 0
+    assert "X-Memory-Peak-Bytes" not in memory_client.get("/get-items").headers
+
+    reports = memory_client.get("/profiles/memory").json["data"]
+    assert len(reports) == 1 and reports[0]["path"] == "/get-items"
+    assert reports[0]["peak_bytes"] >= reports[0]["retained_bytes"] and reports[0]["top_allocations"]
+    assert app.test_client().get("/profiles/memory").status_code == 404  # Disabled in the shared test app